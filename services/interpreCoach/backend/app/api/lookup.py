@@ -0,0 +1,54 @@
+import asyncio
+from typing import List
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+
+from app.services.terminology import terminology_service
+from app.services.vector_index import semantic_lookup
+
+router = APIRouter(prefix="/api/lookup", tags=["lookup"])
+
+
+class LookupRequest(BaseModel):
+    texts: List[str] = Field(..., min_length=1, max_length=256)
+    k: int = Field(5, ge=1, le=50)
+
+
+@router.post("")
+async def semantic_term_lookup(request: LookupRequest):
+    """
+    Nearest terminology entries for each text, in one batched search.
+
+    Matches spelling variants and partial transcriptions that the exact
+    term index misses; returns one list per input text.
+    """
+    if semantic_lookup.index is None:
+        raise HTTPException(status_code=503, detail="Semantic index not loaded")
+    # Hashing up to 256 texts and the search are CPU-bound; keep them off the
+    # loop that also serves /ws/audio
+    found = await asyncio.to_thread(semantic_lookup.lookup, request.texts, request.k)
+    terms = terminology_service.index.terms
+    results = []
+    for neighbors in found:
+        matches = []
+        for neighbor in neighbors:
+            term = terms.get(neighbor.id)
+            if term is None:
+                continue  # deleted since the index was built
+            matches.append({
+                "id": term.id,
+                "term": term.term,
+                "translation": term.translation,
+                "score": round(neighbor.score, 4),
+            })
+        results.append(matches)
+    return {"results": results}
+
+
+@router.get("/stats")
+async def semantic_lookup_stats():
+    index = semantic_lookup.index
+    if index is None:
+        return {"loaded": False}
+    return {"loaded": True, "vectors": len(index), "nprobe": index.nprobe, **index.meta}
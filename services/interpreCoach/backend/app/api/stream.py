@@ -0,0 +1,104 @@
+import asyncio
+import base64
+import json
+import logging
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+
+from app.services.session_state import session_store
+from app.services.stream_session import AudioStreamSession, stream_registry
+from app.services.terminology import terminology_service
+from app.services.transcription import get_transcriber
+from app.services.wire_protocol import Frame, UnsupportedProtocolError, negotiate
+
+router = APIRouter(tags=["stream"])
+logger = logging.getLogger(__name__)
+
+transcriber = get_transcriber()
+
+
+@router.websocket("/ws/audio/{client_id}")
+async def audio_stream(websocket: WebSocket, client_id: str):
+    """
+    Real-time audio from the browser extension.
+
+    Binary frames are mono 16-bit little-endian PCM at AUDIO_SAMPLE_RATE;
+    text frames may carry the same audio as {"audio": "<base64>"} or
+    {"type": "stop"} to end the stream. Each transcript update is answered
+    with {"transcript", "is_final", "suggestions", "audio_ms"}; `suggestions`
+    only lists terms not yet sent on this connection. Clients may negotiate
+    the compact delta encoding instead (see app/services/wire_protocol.py).
+
+    Reconnecting with the same client_id resumes the previous stream
+    (positions, term dedup, delta refs) for SESSION_STATE_TTL_SECONDS;
+    pass ?resume=0 to start over.
+    """
+    try:
+        protocol, subprotocol = negotiate(websocket.scope.get("subprotocols", []), websocket.query_params)
+    except UnsupportedProtocolError as e:
+        logger.warning(f"Rejecting audio stream {client_id}: {e}")
+        await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA, reason=str(e))
+        return
+    state, resumed = await session_store.open(client_id, resume=websocket.query_params.get("resume") != "0")
+    await websocket.accept(subprotocol=subprotocol)
+
+    async def send(frame: Frame) -> None:
+        if isinstance(frame, bytes):
+            await websocket.send_bytes(frame)
+        else:
+            await websocket.send_text(frame)
+
+    session = AudioStreamSession(client_id, transcriber, terminology_service, send, protocol, state, session_store)
+    consumer = None
+    try:
+        stream_registry.add(session)
+        if resumed:
+            await session.resume()
+        consumer = asyncio.create_task(session.run())
+        while not consumer.done():
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes") is not None:
+                await session.write(message["bytes"])
+                continue
+            payload = json.loads(message.get("text") or "{}")
+            if payload.get("type") == "stop":
+                break
+            if "audio" in payload:
+                await session.write(base64.b64decode(payload["audio"]))
+        session.close_input()
+        await consumer
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Audio stream {client_id} failed: {e}")
+    finally:
+        session.close_input()
+        if consumer is not None and not consumer.done():
+            consumer.cancel()
+            await asyncio.gather(consumer, return_exceptions=True)
+        try:
+            # finish() only runs on a clean stop; this also covers errors and cancellation
+            await session.stt.close()
+        except Exception as e:
+            logger.warning(f"Closing recognizer for {client_id} failed: {e}")
+        stream_registry.remove(session)
+        await session.checkpoint(force=True)
+        session_store.closed(client_id)
+    try:
+        await websocket.close()
+    except RuntimeError:
+        pass  # already closed by the client
+
+
+@router.get("/api/stream/stats")
+async def stream_stats():
+    """Active sessions, the worst recognizer lag and session-state activity."""
+    return {**stream_registry.stats(), "state": session_store.stats()}
+
+
+@router.get("/api/terminology/stats")
+async def terminology_stats():
+    """Size and freshness of the in-memory terminology index."""
+    return terminology_service.index.stats()
@@ -0,0 +1,47 @@
+from pydantic_settings import BaseSettings
+
+class Settings(BaseSettings):
+    # Supabase (terminology source)
+    SUPABASE_URL: str = ""
+    SUPABASE_SERVICE_ROLE_KEY: str = ""
+
+    # Terminology index (loaded at startup, refreshed incrementally)
+    TERMINOLOGY_REFRESH_SECONDS: float = 30.0  # Delta pull interval
+    TERMINOLOGY_RECONCILE_SECONDS: float = 3600.0  # Full id scan to catch deletes
+    TERMINOLOGY_COMPACT_THRESHOLD: int = 2000  # Pending changes before the automaton is rebuilt
+
+    # Semantic lookup (IVF index built offline, memory-mapped by every worker)
+    VECTOR_INDEX_PATH: str = "data/term_vectors"
+    VECTOR_INDEX_DIM: int = 256
+    VECTOR_INDEX_NPROBE: int = 8  # Lists scanned per query; higher = better recall, slower
+    VECTOR_INDEX_MIN_SCORE: float = 0.35
+
+    # Speech-to-Text
+    TRANSCRIBER: str = "deepgram"  # "deepgram" or "fake" (deterministic, offline; explicit opt-in)
+    DEEPGRAM_API_KEY: str = ""
+    FAKE_STT_CPU_MS: float = 0.0  # Simulated recognizer compute per window (load tests)
+
+    # Real-time audio stream (/ws/audio/{client_id})
+    AUDIO_SAMPLE_RATE: int = 16000  # Extension sends mono 16-bit little-endian PCM
+    STREAM_WINDOW_MS: int = 500
+    STREAM_HOP_MS: int = 250  # < window => overlapping windows
+    STREAM_RING_SECONDS: float = 10.0
+    STREAM_MAX_LAG_MS: int = 2000  # STT further behind than this drops stale audio
+    STREAM_OVERFLOW_POLICY: str = "drop"  # "drop" stale audio or "block" the socket reader
+
+    # Session state for reconnect-resume (see app/services/session_state.py)
+    SESSION_STATE_BACKEND: str = "memory"  # "memory" (sticky routing), "redis" (shared) or "fake"
+    REDIS_URL: str = ""
+    SESSION_STATE_TTL_SECONDS: int = 900  # How long a disconnected client can resume
+    SESSION_STATE_CHECKPOINT_SECONDS: float = 2.0
+
+    # Optional / Defaults
+    ENVIRONMENT: str = "development"
+    APP_NAME: str = "InterpreCoach Backend"
+
+    class Config:
+        env_file = ".env"
+        case_sensitive = True
+        extra = "ignore"
+
+settings = Settings()
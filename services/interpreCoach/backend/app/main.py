@@ -12,35 +12,17 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting interpreCoach backend...")
-    
-    # =========================================================================
-    # TODO: AGENT IMPLEMENTATION GUIDE - REAL-TIME ASSISTANT
-    # =========================================================================
-    # 1. WebSocket Endpoint (in `app/api/stream.py`):
-    #    - Route: WebSocket /ws/audio/{client_id}
-    #    - Protocol:
-    #      a. Accept WebSocket connection.
-    #      b. Receive binary audio chunks (or base64 encoded JSON) from Browser Extension.
-    #      c. Buffer chunks if necessary (e.g. 500ms window).
-    #      d. Send to Google Speech-to-Text (Streaming) OR Whisper (Local/API).
-    #      e. On Transcript:
-    #         - Extract keywords (using spaCy or simple Regex/Lookup).
-    #         - Query Supabase `terminology` table for matches.
-    #      f. Send JSON back to Client:
-    #         {
-    #           "transcript": "Partial sentence...",
-    #           "suggestions": [
-    #             { "term": "Myocarditis", "translation": "Inflammación del corazón", "context": "..." }
-    #           ]
-    #         }
-    #
-    # 2. Terminology Lookup (in `app/api/lookup.py`):
-    #    - Implement fast semantic search using pgvector (if setup) or ILIKE queries on Supabase.
-    # =========================================================================
+    from app.services.terminology import terminology_service
+    await terminology_service.start()
+    from app.services.vector_index import semantic_lookup
+    semantic_lookup.open()
 
     yield
     # Shutdown
     logger.info("Shutting down interpreCoach backend...")
+    await terminology_service.close()
+    from app.services.session_state import session_store
+    await session_store.close()
 
 # Create FastAPI app
 app = FastAPI(
@@ -80,7 +62,8 @@ async def health_check():
         "service": "interprecoach-backend"
     }
 
-# TODO: Import and include API routers
-# from app.api import streaming, lookup
-# app.include_router(streaming.router, prefix="/api")
-# app.include_router(lookup.router, prefix="/api")
+# API Routers
+from app.api import lookup, stream
+# WebSocket path is fixed by the browser extension: /ws/audio/{client_id}
+app.include_router(stream.router)
+app.include_router(lookup.router)
@@ -0,0 +1,145 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+
+@dataclass
+class AudioWindow:
+    """
+    One analysis window of 16-bit PCM.
+
+    `samples` is a view into a buffer owned by the Framer and is overwritten
+    by the next window; copy it if it must outlive the current step.
+    `start`/`end` are absolute sample positions in the stream and
+    `samples[new_from:]` is audio that no earlier window contained.
+    """
+    samples: np.ndarray
+    start: int
+    new_from: int
+
+    @property
+    def end(self) -> int:
+        return self.start + len(self.samples)
+
+
+class RingBuffer:
+    """
+    Fixed-capacity ring of int16 samples, preallocated once per connection.
+
+    Incoming chunks are viewed with np.frombuffer and copied straight into
+    the ring (at most two slice copies), never concatenated. Positions are
+    absolute sample counts since the start of the stream; once more than
+    `capacity` samples are unread, the oldest are overwritten.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.int16)
+        self.written = 0
+        # Odd byte left over when a chunk splits a sample
+        self._carry: Optional[int] = None
+
+    @property
+    def oldest(self) -> int:
+        """Oldest sample position still held in the ring."""
+        return max(0, self.written - self.capacity)
+
+    def write(self, chunk: bytes) -> int:
+        """Append little-endian PCM16 bytes; returns the number of samples written."""
+        view = memoryview(chunk)
+        if self._carry is not None and len(view):
+            sample = np.frombuffer(bytes((self._carry, view[0])), dtype="<i2")
+            self._append(sample)
+            view = view[1:]
+            self._carry = None
+            count = 1
+        else:
+            count = 0
+        if len(view) % 2:
+            self._carry = view[-1]
+            view = view[:-1]
+        samples = np.frombuffer(view, dtype="<i2")
+        if len(samples) > self.capacity:
+            # Only the newest `capacity` samples can survive anyway
+            self.written += len(samples) - self.capacity
+            samples = samples[-self.capacity:]
+        self._append(samples)
+        return count + len(samples)
+
+    def _append(self, samples: np.ndarray) -> None:
+        n = len(samples)
+        offset = self.written % self.capacity
+        first = min(n, self.capacity - offset)
+        self._data[offset:offset + first] = samples[:first]
+        if first < n:
+            self._data[:n - first] = samples[first:]
+        self.written += n
+
+    def read_into(self, start: int, out: np.ndarray) -> None:
+        """Copy samples [start, start + len(out)) into `out`."""
+        n = len(out)
+        if start < self.oldest or start + n > self.written:
+            raise IndexError(f"samples {start}..{start + n} not in ring ({self.oldest}..{self.written})")
+        offset = start % self.capacity
+        first = min(n, self.capacity - offset)
+        out[:first] = self._data[offset:offset + first]
+        if first < n:
+            out[first:] = self._data[:n - first]
+
+
+class Framer:
+    """
+    Cuts a RingBuffer into `window`-sample frames every `hop` samples.
+
+    With hop < window consecutive frames overlap by `window - hop` samples,
+    which windowed recognizers use as context across frame boundaries.
+    """
+
+    def __init__(self, ring: RingBuffer, window: int, hop: int):
+        if not 0 < hop <= window <= ring.capacity:
+            raise ValueError("Framing requires 0 < hop <= window <= ring capacity")
+        self.ring = ring
+        self.window = window
+        self.hop = hop
+        self.position = 0
+        self._emitted = 0  # end of the newest audio already handed out
+        self._buffer = np.zeros(window, dtype=np.int16)
+        self.overruns = 0  # samples lost because the reader fell out of the ring
+        self.skipped = 0  # samples skipped deliberately via skip_to()
+
+    @property
+    def lag(self) -> int:
+        """Samples written but not yet covered by an emitted window."""
+        return self.ring.written - max(self.position, self._emitted)
+
+    def skip_to(self, position: int) -> None:
+        """Jump ahead (e.g. when downstream lags), dropping older audio."""
+        position = max(position, self.position)
+        self.skipped += max(0, position - max(self.position, self._emitted))
+        self.position = position
+
+    def next_window(self, flush: bool = False) -> Optional[AudioWindow]:
+        """
+        The next full window, or None if not enough audio has arrived.
+
+        With `flush`, a final short window with the remaining audio is
+        returned at end of stream.
+        """
+        if self.position < self.ring.oldest:
+            self.overruns += self.ring.oldest - self.position
+            self.position = self.ring.oldest
+        available = self.ring.written - self.position
+        if available >= self.window:
+            size = self.window
+        elif flush and self.ring.written > max(self.position, self._emitted):
+            size = available
+        else:
+            return None
+
+        out = self._buffer[:size]
+        self.ring.read_into(self.position, out)
+        window = AudioWindow(out, self.position, max(0, self._emitted - self.position))
+        self._emitted = window.end
+        self.position += self.hop if size == self.window else size
+        return window
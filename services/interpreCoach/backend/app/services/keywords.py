@@ -0,0 +1,91 @@
+from typing import Iterable, List, Protocol, Set, Tuple
+
+from app.services.terminology import TerminologyIndex, TermMatch, tokenize
+from app.services.transcription import TranscriptUpdate
+
+
+class IndexProvider(Protocol):
+    """Anything exposing the live index (it is swapped on compaction)."""
+
+    index: TerminologyIndex
+
+
+def common_prefix(a: str, b: str) -> int:
+    """Length of the longest common prefix, compared in C-sized slices."""
+    if b.startswith(a):
+        return len(a)
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[:middle] == b[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+class IncrementalExtractor:
+    """
+    Per-session term spotting over a stream of partial transcripts.
+
+    Streaming STT re-emits the growing utterance on every update. Instead
+    of re-tokenizing and re-matching all of it, the extractor keeps the
+    tokens of the prefix that is unchanged since the previous partial and
+    only tokenizes the new suffix. Matching resumes from the first
+    unresolved token. A match is committed only once it can no longer
+    grow into a longer term: the last `max_phrase_tokens` tokens are held
+    back until more words arrive or the utterance is final. Each term is
+    suggested at most once per session.
+    """
+
+    def __init__(self, source: IndexProvider, sent: Iterable[str] = ()):
+        self.source = source
+        self.sent: Set[str] = set(sent)  # seeded from a resumed session
+        self._reset(None)
+
+    def _reset(self, utterance_start) -> None:
+        self.utterance_start = utterance_start
+        self.text = ""
+        self.tokens: List[Tuple[str, int, int]] = []
+        self.scanned = 0  # tokens before this index are resolved
+
+    def update(self, update: TranscriptUpdate) -> List[TermMatch]:
+        """Terms newly found in this update (never returned before)."""
+        if update.start != self.utterance_start:
+            self._reset(update.start)
+        text = update.text
+        stable = common_prefix(self.text, text)
+        # Keep tokens followed by an unchanged separator; a token that
+        # touches the boundary may have grown ("hyper" -> "hypertension")
+        keep = len(self.tokens)
+        while keep and self.tokens[keep - 1][2] >= stable:
+            keep -= 1
+        del self.tokens[keep:]
+        self.scanned = min(self.scanned, keep)
+        resume = self.tokens[-1][2] if self.tokens else 0
+        self.tokens.extend(
+            (token, start + resume, end + resume) for token, start, end in tokenize(text[resume:])
+        )
+        self.text = text
+
+        index = self.source.index
+        # Partials: a match starting in the last max_phrase_tokens tokens could still grow
+        frontier = len(self.tokens) if update.is_final else len(self.tokens) - index.max_phrase_tokens
+        matches = []
+        if frontier > self.scanned:
+            next_free = self.scanned
+            for first, last, term_id in index.find([token for token, _, _ in self.tokens[self.scanned:]]):
+                first += self.scanned
+                last += self.scanned
+                if first < next_free or first >= frontier:
+                    continue
+                next_free = last + 1
+                term = index.terms.get(term_id)
+                if term is None or term.id in self.sent:
+                    continue
+                self.sent.add(term.id)
+                matches.append(TermMatch(term, self.tokens[first][1], self.tokens[last][2]))
+            self.scanned = max(next_free, frontier)
+        if update.is_final:
+            self._reset(None)
+        return matches
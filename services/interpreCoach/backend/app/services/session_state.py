@@ -0,0 +1,333 @@
+"""
+Per-client stream state that survives reconnects and worker hops.
+
+What a reconnecting extension needs from its previous connection:
+
+  audio_samples  stream position reached, so audio_ms keeps counting up
+  utterance      delta-protocol line counter
+  refs           delta-protocol term refs the client already holds
+  sent           term ids already suggested (never suggested again)
+
+Backends: "memory" (per process; enough when a load balancer routes each
+client_id to the same worker), "redis" (shared by all workers and
+instances) and "fake" (the Redis code path over an in-memory stand-in,
+for tests and local runs without a server).
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Protocol, Set, Tuple
+
+from app.config import settings
+
+try:
+    import redis.asyncio as redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SessionState:
+    client_id: str
+    audio_samples: int = 0
+    utterance: int = 0
+    protocol: str = ""
+    refs: Dict[str, int] = field(default_factory=dict)
+    sent: Set[str] = field(default_factory=set)
+    # Not yet written to the backend
+    new_refs: Dict[str, int] = field(default_factory=dict, repr=False)
+    new_sent: Set[str] = field(default_factory=set, repr=False)
+
+    def mark_sent(self, term_id: str) -> None:
+        if term_id not in self.sent:
+            self.sent.add(term_id)
+            self.new_sent.add(term_id)
+
+    def mark_ref(self, term_id: str, ref: int) -> None:
+        self.refs[term_id] = ref
+        self.new_refs[term_id] = ref
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self.new_sent or self.new_refs)
+
+    def flushed(self) -> None:
+        self.new_refs = {}
+        self.new_sent = set()
+
+
+class StateBackend(Protocol):
+    async def load(self, client_id: str) -> Optional[SessionState]: ...
+
+    async def save(self, state: SessionState) -> None:
+        """Write counters plus the pending (new_*) refs and sent ids."""
+        ...
+
+    async def delete(self, client_id: str) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+class MemoryStateBackend:
+    """Process-local; states expire `ttl_seconds` after their last save."""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._states: Dict[str, Tuple[float, SessionState]] = {}
+
+    async def load(self, client_id: str) -> Optional[SessionState]:
+        entry = self._states.get(client_id)
+        if entry is None:
+            return None
+        expires_at, state = entry
+        if expires_at < time.monotonic():
+            del self._states[client_id]
+            return None
+        return SessionState(
+            client_id, state.audio_samples, state.utterance, state.protocol, dict(state.refs), set(state.sent),
+        )
+
+    async def save(self, state: SessionState) -> None:
+        now = time.monotonic()
+        self._states[state.client_id] = (
+            now + self.ttl_seconds,
+            SessionState(state.client_id, state.audio_samples, state.utterance, state.protocol,
+                         dict(state.refs), set(state.sent)),
+        )
+        if len(self._states) % 1024 == 0:
+            # Occasional sweep so abandoned clients don't accumulate
+            self._states = {key: value for key, value in self._states.items() if value[0] >= now}
+
+    async def delete(self, client_id: str) -> None:
+        self._states.pop(client_id, None)
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisStateBackend:
+    """
+    Three keys per client, all expiring together:
+
+      {ns}:{id}        hash  audio_samples, utterance, protocol
+      {ns}:{id}:refs   hash  term id -> ref
+      {ns}:{id}:sent   set   term ids
+
+    Refs and sent ids only grow, so a save writes just the new entries;
+    each save is one pipelined round trip.
+    """
+
+    def __init__(self, client, ttl_seconds: int, namespace: str = "interprecoach:session"):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace
+
+    def _keys(self, client_id: str) -> Tuple[str, str, str]:
+        base = f"{self.namespace}:{client_id}"
+        return base, f"{base}:refs", f"{base}:sent"
+
+    async def load(self, client_id: str) -> Optional[SessionState]:
+        base, refs_key, sent_key = self._keys(client_id)
+        pipe = self.client.pipeline()
+        pipe.hgetall(base)
+        pipe.hgetall(refs_key)
+        pipe.smembers(sent_key)
+        fields, refs, sent = await pipe.execute()
+        if not fields:
+            return None
+        fields = {_text(key): _text(value) for key, value in fields.items()}
+        return SessionState(
+            client_id,
+            audio_samples=int(fields.get("audio_samples", 0)),
+            utterance=int(fields.get("utterance", 0)),
+            protocol=fields.get("protocol", ""),
+            refs={_text(key): int(value) for key, value in refs.items()},
+            sent={_text(value) for value in sent},
+        )
+
+    async def save(self, state: SessionState) -> None:
+        base, refs_key, sent_key = self._keys(state.client_id)
+        pipe = self.client.pipeline()
+        pipe.hset(base, mapping={
+            "audio_samples": state.audio_samples,
+            "utterance": state.utterance,
+            "protocol": state.protocol,
+        })
+        if state.new_refs:
+            pipe.hset(refs_key, mapping=state.new_refs)
+        if state.new_sent:
+            pipe.sadd(sent_key, *state.new_sent)
+        for key in (base, refs_key, sent_key):
+            pipe.expire(key, self.ttl_seconds)
+        await pipe.execute()
+
+    async def delete(self, client_id: str) -> None:
+        await self.client.delete(*self._keys(client_id))
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+class FakeRedis:
+    """
+    In-memory stand-in for the few redis.asyncio calls RedisStateBackend
+    makes (hash, set, expire, delete, pipeline); values come back as bytes
+    like the real client.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, object] = {}
+        self._expires: Dict[str, float] = {}
+
+    def _live(self, key: str):
+        expires_at = self._expires.get(key)
+        if expires_at is not None and expires_at < time.monotonic():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return self._data.get(key)
+
+    async def hset(self, key: str, mapping: dict) -> int:
+        data = self._live(key)
+        if data is None:
+            data = self._data[key] = {}
+        data.update({str(k).encode(): str(v).encode() for k, v in mapping.items()})
+        return len(mapping)
+
+    async def hgetall(self, key: str) -> dict:
+        return dict(self._live(key) or {})
+
+    async def sadd(self, key: str, *members) -> int:
+        data = self._live(key)
+        if data is None:
+            data = self._data[key] = set()
+        before = len(data)
+        data.update(str(member).encode() for member in members)
+        return len(data) - before
+
+    async def smembers(self, key: str) -> set:
+        return set(self._live(key) or ())
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        if self._live(key) is None:
+            return False
+        self._expires[key] = time.monotonic() + seconds
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        count = 0
+        for key in keys:
+            count += self._data.pop(key, None) is not None
+            self._expires.pop(key, None)
+        return count
+
+    def pipeline(self) -> "FakePipeline":
+        return FakePipeline(self)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class FakePipeline:
+    def __init__(self, client: FakeRedis):
+        self.client = client
+        self._calls: List[Tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str):
+        def queue(*args, **kwargs):
+            self._calls.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self) -> list:
+        calls, self._calls = self._calls, []
+        return [await getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in calls]
+
+
+class SessionStore:
+    """
+    Loads state on connect and checkpoints it while streaming.
+
+    New suggestions and term refs are saved as soon as they are sent, so
+    a resumed client is never sent a term twice. Position counters are
+    checkpointed at most every `checkpoint_seconds` and on disconnect.
+    Backend errors are logged and never break the stream; a failed save
+    is retried with the next checkpoint.
+    """
+
+    def __init__(self, backend: StateBackend, checkpoint_seconds: float):
+        self.backend = backend
+        self.checkpoint_seconds = checkpoint_seconds
+        self._saved_at: Dict[str, float] = {}
+        self.resumed = 0
+        self.errors = 0
+
+    async def open(self, client_id: str, resume: bool = True) -> Tuple[SessionState, bool]:
+        """(state, resumed) for a connecting client."""
+        try:
+            if resume:
+                state = await self.backend.load(client_id)
+                if state is not None:
+                    self.resumed += 1
+                    return state, True
+            else:
+                await self.backend.delete(client_id)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Session state load for {client_id} failed: {e}")
+        return SessionState(client_id), False
+
+    async def checkpoint(self, state: SessionState, force: bool = False) -> None:
+        now = time.monotonic()
+        due = now - self._saved_at.get(state.client_id, 0.0) >= self.checkpoint_seconds
+        if not (force or state.dirty or due):
+            return
+        try:
+            await self.backend.save(state)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Session state save for {state.client_id} failed: {e}")
+            return
+        state.flushed()
+        self._saved_at[state.client_id] = now
+
+    def closed(self, client_id: str) -> None:
+        self._saved_at.pop(client_id, None)
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+    def stats(self) -> dict:
+        return {"backend": type(self.backend).__name__, "resumed": self.resumed, "errors": self.errors}
+
+
+def create_state_backend() -> StateBackend:
+    """
+    Backend selected by SESSION_STATE_BACKEND ("memory", "redis" or "fake").
+
+    Misconfiguration raises at import, so the server fails at startup
+    instead of quietly losing cross-worker resume.
+    """
+    ttl = settings.SESSION_STATE_TTL_SECONDS
+    backend = settings.SESSION_STATE_BACKEND
+    if backend == "redis":
+        if not settings.REDIS_URL:
+            raise RuntimeError("SESSION_STATE_BACKEND=redis needs REDIS_URL")
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("SESSION_STATE_BACKEND=redis needs the redis package (pip install redis)")
+        return RedisStateBackend(redis.from_url(settings.REDIS_URL), ttl)
+    if backend == "fake":
+        return RedisStateBackend(FakeRedis(), ttl)
+    if backend == "memory":
+        return MemoryStateBackend(ttl)
+    raise RuntimeError(f"Unknown SESSION_STATE_BACKEND: {backend!r}")
+
+
+session_store = SessionStore(create_state_backend(), settings.SESSION_STATE_CHECKPOINT_SECONDS)
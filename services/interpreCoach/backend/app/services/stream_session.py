@@ -0,0 +1,194 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, List, Optional
+
+from app.config import settings
+from app.services.audio_stream import Framer, RingBuffer
+from app.services.keywords import IncrementalExtractor, IndexProvider
+from app.services.session_state import SessionState, SessionStore
+from app.services.transcription import StreamingTranscriber, TranscriptUpdate
+from app.services.wire_protocol import Frame, FullProtocol, WireProtocol
+
+logger = logging.getLogger(__name__)
+
+Send = Callable[[Frame], Awaitable[None]]
+
+
+class AudioStreamSession:
+    """
+    One extension connection: socket reader -> ring buffer -> framer -> STT.
+
+    The socket reader only copies PCM into the ring and signals the
+    consumer, so receiving never waits on recognition. When the recognizer
+    falls more than `max_lag` samples behind, the consumer either skips to
+    the newest audio ("drop", keeps captions live) or the reader stops
+    pulling from the socket until the ring has room ("block", lossless;
+    TCP flow control pushes back on the client).
+    """
+
+    def __init__(
+        self,
+        client_id: str,
+        transcriber: StreamingTranscriber,
+        terminology: IndexProvider,
+        send: Send,
+        protocol: Optional[WireProtocol] = None,
+        state: Optional[SessionState] = None,
+        store: Optional[SessionStore] = None,
+        sample_rate: int = settings.AUDIO_SAMPLE_RATE,
+        window_ms: int = settings.STREAM_WINDOW_MS,
+        hop_ms: int = settings.STREAM_HOP_MS,
+        ring_seconds: float = settings.STREAM_RING_SECONDS,
+        max_lag_ms: int = settings.STREAM_MAX_LAG_MS,
+        overflow_policy: str = settings.STREAM_OVERFLOW_POLICY,
+    ):
+        self.client_id = client_id
+        self.sample_rate = sample_rate
+        self.ring = RingBuffer(int(ring_seconds * sample_rate))
+        self.framer = Framer(self.ring, sample_rate * window_ms // 1000, sample_rate * hop_ms // 1000)
+        self.max_lag = min(sample_rate * max_lag_ms // 1000, self.ring.capacity - self.framer.window)
+        self.overflow_policy = overflow_policy
+        self.stt = transcriber.open(sample_rate)
+        self.send = send
+        self.protocol = protocol or FullProtocol()
+        # Resumed sessions continue positions, refs and dedup where they left off
+        self.state = state or SessionState(client_id)
+        self.store = store
+        self.base = self.state.audio_samples
+        self._resume_notice = self.protocol.resume(self.state, self.base * 1000 // sample_rate)
+        self.state.protocol = self.protocol.name
+        self.keywords = IncrementalExtractor(terminology, self.state.sent)
+
+        self._data = asyncio.Event()
+        self._space = asyncio.Event()
+        self._space.set()
+        self._closed = False
+
+        # Metrics
+        self.windows = 0
+        self.updates = 0
+        self.stt_seconds = 0.0
+        self.bytes_sent = 0
+
+    # --- Producer side (socket reader) ---
+
+    async def write(self, chunk: bytes) -> None:
+        """Queue audio for the consumer; dropped once input is closed or the consumer has exited."""
+        if self.overflow_policy == "block":
+            # Only wait while the consumer has a full window to work on; with
+            # less than that it is itself waiting for data, so the chunk must
+            # go in (even one larger than max_lag) or neither side moves
+            while (
+                not self._closed
+                and self.framer.lag >= self.framer.window
+                and self.framer.lag + len(chunk) // 2 > self.max_lag
+            ):
+                self._space.clear()
+                await self._space.wait()
+        if self._closed:
+            return
+        self.ring.write(chunk)
+        self._data.set()
+
+    async def resume(self) -> None:
+        """Tell a reconnected client where its stream continues."""
+        await self.send(self._resume_notice)
+
+    async def checkpoint(self, force: bool = False) -> None:
+        if self.store is None:
+            return
+        self.state.audio_samples = self.base + self.ring.written
+        await self.store.checkpoint(self.state, force)
+
+    def close_input(self) -> None:
+        self._closed = True
+        self._data.set()
+        self._space.set()
+
+    # --- Consumer side ---
+
+    async def run(self) -> None:
+        """Recognize windows until input is closed and drained."""
+        try:
+            await self._consume()
+        finally:
+            # Never leave the reader waiting on a consumer that is gone
+            self._closed = True
+            self._space.set()
+
+    async def _consume(self) -> None:
+        while True:
+            if self.overflow_policy == "drop" and self.framer.lag > self.max_lag:
+                # Recognition is behind: jump to the newest audio
+                self.framer.skip_to(self.ring.written - self.framer.window)
+
+            window = self.framer.next_window(flush=self._closed)
+            if window is None:
+                if self._closed:
+                    break
+                self._data.clear()
+                await self._data.wait()
+                continue
+
+            started = time.perf_counter()
+            updates = await self.stt.feed(window)
+            self.stt_seconds += time.perf_counter() - started
+            self.windows += 1
+            self._space.set()
+            await self._emit(updates)
+            if updates:
+                await self.checkpoint()
+
+        await self._emit(await self.stt.finish())
+
+    async def _emit(self, updates: List[TranscriptUpdate]) -> None:
+        for update in updates:
+            self.updates += 1
+            matches = self.keywords.update(update)
+            for match in matches:
+                self.state.mark_sent(match.term.id)
+            # audio_ms: stream position of the newest audio reflected in this message
+            frame = self.protocol.encode(update, matches, (self.base + update.end) * 1000 // self.sample_rate)
+            self.protocol.sync(self.state)
+            self.bytes_sent += len(frame.encode()) if isinstance(frame, str) else len(frame)
+            await self.send(frame)
+
+    def stats(self) -> dict:
+        return {
+            "client_id": self.client_id,
+            "received_ms": (self.base + self.ring.written) * 1000 // self.sample_rate,
+            "windows": self.windows,
+            "updates": self.updates,
+            "lag_ms": self.framer.lag * 1000 // self.sample_rate,
+            "dropped_ms": (self.framer.skipped + self.framer.overruns) * 1000 // self.sample_rate,
+            "stt_seconds": round(self.stt_seconds, 3),
+            "protocol": self.protocol.name,
+            "bytes_sent": self.bytes_sent,
+        }
+
+
+class StreamRegistry:
+    """Live sessions, for stats."""
+
+    def __init__(self):
+        self.sessions: dict[str, AudioStreamSession] = {}
+        self.total = 0
+
+    def add(self, session: AudioStreamSession) -> None:
+        self.sessions[session.client_id] = session
+        self.total += 1
+
+    def remove(self, session: AudioStreamSession) -> None:
+        if self.sessions.get(session.client_id) is session:
+            del self.sessions[session.client_id]
+
+    def stats(self) -> dict:
+        return {
+            "active": len(self.sessions),
+            "total": self.total,
+            "lag_ms_max": max((s.framer.lag * 1000 // s.sample_rate for s in self.sessions.values()), default=0),
+        }
+
+
+stream_registry = StreamRegistry()
@@ -0,0 +1,13 @@
+from typing import Dict, Tuple
+
+# Small built-in glossary so the stream works without a terminology source
+DEFAULT_GLOSSARY: Dict[str, Tuple[str, str]] = {
+    "myocarditis": ("Myocarditis", "Miocarditis (inflamación del corazón)"),
+    "hypertension": ("Hypertension", "Hipertensión"),
+    "electrocardiogram": ("Electrocardiogram", "Electrocardiograma"),
+    "shortness of breath": ("Shortness of breath", "Falta de aire"),
+    "chest pain": ("Chest pain", "Dolor de pecho"),
+    "type two diabetes": ("Type 2 diabetes", "Diabetes tipo 2"),
+    "blood pressure": ("Blood pressure", "Presión arterial"),
+}
+
@@ -0,0 +1,569 @@
+import asyncio
+import logging
+import re
+import unicodedata
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Protocol, Set, Tuple
+
+from app.config import settings
+from app.services.suggestions import DEFAULT_GLOSSARY
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[^\W_]+")
+
+
+# --- Normalization ---
+
+def normalize_token(token: str) -> str:
+    """Casefold, strip accents and apply a light plural stemmer."""
+    token = unicodedata.normalize("NFKD", token.casefold())
+    token = "".join(ch for ch in token if not unicodedata.combining(ch))
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 4 and token.endswith(("ches", "shes", "sses", "xes", "zes")):
+        return token[:-2]
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[Tuple[str, int, int]]:
+    """(normalized token, start, end) for every word in `text`."""
+    return [(normalize_token(m.group()), m.start(), m.end()) for m in _TOKEN.finditer(text)]
+
+
+def normalize(text: str) -> str:
+    return " ".join(token for token, _, _ in tokenize(text))
+
+
+# --- Terms ---
+
+@dataclass(frozen=True)
+class Term:
+    id: str
+    term: str
+    language: str
+    translation: str
+    context: str = ""
+    generic_name: str = ""
+    brand_name: str = ""
+    aliases: Tuple[str, ...] = ()
+    updated_at: str = ""
+
+    @classmethod
+    def from_row(cls, row: dict) -> "Term":
+        return cls(
+            id=str(row["id"]),
+            term=row["term"],
+            language=row.get("language") or "",
+            translation=row.get("translation") or "",
+            context=row.get("context") or "",
+            generic_name=row.get("generic_name") or "",
+            brand_name=row.get("brand_name") or "",
+            aliases=tuple(row.get("aliases") or ()),
+            updated_at=str(row.get("updated_at") or ""),
+        )
+
+    def surface_forms(self) -> Set[str]:
+        """Every phrase that should trigger this term, normalized."""
+        forms = {self.term, self.generic_name, self.brand_name, *self.aliases}
+        return {normalize(form) for form in forms if form} - {""}
+
+
+@dataclass
+class TermMatch:
+    term: Term
+    start: int  # character offsets in the matched text
+    end: int
+
+
+def suggestion(term: Term, text: str, start: int, end: int) -> dict:
+    """Client payload for `term` found at text[start:end]."""
+    return {
+        "id": term.id,
+        "term": term.term,
+        "language": term.language,
+        "translation": term.translation,
+        "context": term.context or text[max(0, start - 30):end + 30].strip(),
+    }
+
+
+# --- Aho-Corasick over tokens ---
+
+class TokenAutomaton:
+    """
+    Immutable Aho-Corasick automaton whose alphabet is normalized tokens.
+
+    Matching on tokens instead of characters gives word-boundary matches
+    for free and keeps the automaton small. Transitions live in one flat
+    dict keyed by (state << 32 | token_id); failure links, dictionary
+    suffix links and depths are typed arrays.
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, str]]):
+        """`patterns` are (normalized phrase, term_id) pairs."""
+        self.vocab: Dict[str, int] = {}
+        self.goto: Dict[int, int] = {}
+        self.emit: Dict[int, Tuple[str, ...]] = {}
+        children: List[List[int]] = [[]]
+        depth = array("H", [0])
+
+        for phrase, term_id in patterns:
+            state = 0
+            for token in phrase.split():
+                token_id = self.vocab.setdefault(token, len(self.vocab))
+                key = state << 32 | token_id
+                nxt = self.goto.get(key)
+                if nxt is None:
+                    nxt = len(children)
+                    self.goto[key] = nxt
+                    children[state].append(token_id)
+                    children.append([])
+                    depth.append(depth[state] + 1)
+                state = nxt
+            if state and term_id not in self.emit.get(state, ()):
+                self.emit[state] = self.emit.get(state, ()) + (term_id,)
+
+        size = len(children)
+        self.fail = array("i", [0]) * size
+        self.out = array("i", [-1]) * size  # nearest emitting state on the failure chain
+        self.depth = depth
+
+        queue = deque()
+        for token_id in children[0]:
+            queue.append(self.goto[token_id])
+        while queue:
+            state = queue.popleft()
+            for token_id in children[state]:
+                child = self.goto[state << 32 | token_id]
+                fallback = self.fail[state]
+                while fallback and (fallback << 32 | token_id) not in self.goto:
+                    fallback = self.fail[fallback]
+                target = self.goto.get(fallback << 32 | token_id, 0)
+                self.fail[child] = target if target != child else 0
+                self.out[child] = target if target in self.emit else self.out[target]
+                queue.append(child)
+
+    @property
+    def states(self) -> int:
+        return len(self.fail)
+
+    def find(self, tokens: List[str]) -> List[Tuple[int, int, str]]:
+        """(first_token, last_token, term_id) for every occurrence."""
+        goto, fail, out, emit, vocab = self.goto, self.fail, self.out, self.emit, self.vocab
+        hits = []
+        state = 0
+        for index, token in enumerate(tokens):
+            token_id = vocab.get(token)
+            if token_id is None:
+                state = 0
+                continue
+            while state and (state << 32 | token_id) not in goto:
+                state = fail[state]
+            state = goto.get(state << 32 | token_id, 0)
+            hit = state if state in emit else out[state]
+            while hit > 0:
+                first = index - self.depth[hit] + 1
+                for term_id in emit[hit]:
+                    hits.append((first, index, term_id))
+                hit = out[hit]
+        return hits
+
+
+# --- Index ---
+
+class TerminologyIndex:
+    """
+    In-process terminology lookup with incremental updates.
+
+    Terms live in a large `main` automaton plus a small `delta` automaton
+    holding recent changes; changed or deleted ids are tombstoned out of
+    `main` until the next compaction folds everything into a new `main`.
+    A change therefore only rebuilds the (small) delta, never the full
+    automaton. A normalized-phrase hash index serves exact lookups.
+    """
+
+    def __init__(self, compact_threshold: int = 2000):
+        self.compact_threshold = compact_threshold
+        self.terms: Dict[str, Term] = {}
+        self.main = TokenAutomaton(())
+        self.main_ids: Set[str] = set()
+        self.delta = TokenAutomaton(())
+        self.delta_ids: Set[str] = set()
+        self.tombstones: Set[str] = set()
+        self.phrases: Dict[str, Tuple[str, ...]] = {}
+        self.max_phrase_tokens = 1  # longest pattern, in tokens
+        self.cursor = ""  # newest updated_at applied
+        self.generation = 0
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    # --- Writes ---
+
+    def load(self, terms: Iterable[Term]) -> None:
+        """Replace the whole index (startup / full resync)."""
+        self.terms = {term.id: term for term in terms}
+        self._rebuild_main()
+
+    def apply(self, changed: Iterable[Term] = (), deleted: Iterable[str] = ()) -> None:
+        """Upsert `changed` and drop `deleted` ids without a full rebuild."""
+        touched = False
+        for term in changed:
+            old = self.terms.get(term.id)
+            self.terms[term.id] = term
+            if old is not None:
+                self._unindex_phrases(old)
+            self._index_phrases(term)
+            if term.id in self.main_ids:
+                self.tombstones.add(term.id)
+            self.delta_ids.add(term.id)
+            self.cursor = max(self.cursor, term.updated_at)
+            touched = True
+        for term_id in deleted:
+            old = self.terms.pop(term_id, None)
+            if old is None:
+                continue
+            self._unindex_phrases(old)
+            if term_id in self.main_ids:
+                self.tombstones.add(term_id)
+            self.delta_ids.discard(term_id)
+            touched = True
+        if touched:
+            self.delta = TokenAutomaton(self._patterns(self.delta_ids))
+            self.generation += 1
+
+    @property
+    def needs_compaction(self) -> bool:
+        return len(self.delta_ids) + len(self.tombstones) >= self.compact_threshold
+
+    def compacted(self) -> "TerminologyIndex":
+        """A fresh index with everything in `main` (safe to build off-loop)."""
+        index = TerminologyIndex(self.compact_threshold)
+        index.terms = dict(self.terms)
+        index.cursor = self.cursor
+        index._rebuild_main()
+        index.generation = self.generation + 1
+        return index
+
+    def _rebuild_main(self) -> None:
+        self.main = TokenAutomaton(self._patterns(self.terms))
+        self.main_ids = set(self.terms)
+        self.delta = TokenAutomaton(())
+        self.delta_ids = set()
+        self.tombstones = set()
+        self.phrases = {}
+        self.max_phrase_tokens = 1
+        for term in self.terms.values():
+            self._index_phrases(term)
+            self.cursor = max(self.cursor, term.updated_at)
+
+    def _patterns(self, ids: Iterable[str]) -> Iterable[Tuple[str, str]]:
+        for term_id in ids:
+            for phrase in self.terms[term_id].surface_forms():
+                yield phrase, term_id
+
+    def _index_phrases(self, term: Term) -> None:
+        for phrase in term.surface_forms():
+            self.max_phrase_tokens = max(self.max_phrase_tokens, phrase.count(" ") + 1)
+            ids = self.phrases.get(phrase, ())
+            if term.id not in ids:
+                self.phrases[phrase] = ids + (term.id,)
+
+    def _unindex_phrases(self, term: Term) -> None:
+        for phrase in term.surface_forms():
+            ids = tuple(i for i in self.phrases.get(phrase, ()) if i != term.id)
+            if ids:
+                self.phrases[phrase] = ids
+            else:
+                self.phrases.pop(phrase, None)
+
+    # --- Reads ---
+
+    def lookup(self, phrase: str) -> List[Term]:
+        """Exact lookup of a phrase (case, accents and plurals ignored)."""
+        return [self.terms[term_id] for term_id in self.phrases.get(normalize(phrase), ())]
+
+    def find(self, words: List[str]) -> List[Tuple[int, int, str]]:
+        """(first, last, term_id) hits over normalized tokens, leftmost-longest first."""
+        hits = [
+            hit for hit in self.main.find(words)
+            if hit[2] not in self.tombstones
+        ]
+        if self.delta_ids:
+            hits += self.delta.find(words)
+        hits.sort(key=lambda hit: (hit[0], hit[0] - hit[1]))
+        return hits
+
+    def match(self, text: str) -> List[TermMatch]:
+        """Leftmost-longest, non-overlapping term occurrences in `text`."""
+        tokens = tokenize(text)
+        if not tokens:
+            return []
+        matches = []
+        next_free = 0
+        for first, last, term_id in self.find([token for token, _, _ in tokens]):
+            if first < next_free:
+                continue
+            term = self.terms.get(term_id)
+            if term is None:
+                continue
+            matches.append(TermMatch(term, tokens[first][1], tokens[last][2]))
+            next_free = last + 1
+        return matches
+
+    def suggest(self, text: str) -> List[dict]:
+        """Suggestion payloads for the terms mentioned in `text`."""
+        suggestions = []
+        seen = set()
+        for match in self.match(text):
+            if match.term.id in seen:
+                continue
+            seen.add(match.term.id)
+            suggestions.append(suggestion(match.term, text, match.start, match.end))
+        return suggestions
+
+    def stats(self) -> dict:
+        return {
+            "terms": len(self.terms),
+            "main_states": self.main.states,
+            "delta_terms": len(self.delta_ids),
+            "tombstones": len(self.tombstones),
+            "generation": self.generation,
+            "cursor": self.cursor,
+        }
+
+
+# --- Sources ---
+
+class TerminologySource(Protocol):
+    async def fetch_all(self) -> List[Term]: ...
+
+    async def fetch_since(self, cursor: str) -> List[Term]: ...
+
+    async def fetch_ids(self) -> Set[str]: ...
+
+    async def fetch_by_ids(self, ids: Iterable[str]) -> List[Term]: ...
+
+
+# Built-in glossary as terms; the glossary key is the spoken form
+DEFAULT_TERMS = [
+    Term(f"builtin-{key.replace(' ', '-')}", term, "en", translation, aliases=(key,))
+    for key, (term, translation) in DEFAULT_GLOSSARY.items()
+]
+
+
+class StaticTerminologySource:
+    """Fixed term list, for offline development and tests."""
+
+    def __init__(self, terms: List[Term] = DEFAULT_TERMS):
+        self.terms = terms
+
+    async def fetch_all(self) -> List[Term]:
+        return list(self.terms)
+
+    async def fetch_since(self, cursor: str) -> List[Term]:
+        return [term for term in self.terms if term.updated_at > cursor]
+
+    async def fetch_ids(self) -> Set[str]:
+        return {term.id for term in self.terms}
+
+    async def fetch_by_ids(self, ids: Iterable[str]) -> List[Term]:
+        wanted = set(ids)
+        return [term for term in self.terms if term.id in wanted]
+
+
+class SupabaseTerminologySource:
+    """
+    Pages through the `terminology` table ordered by updated_at.
+
+    The table has no soft-delete column, so deletions are found by
+    comparing the id list (fetch_ids) on a slower reconcile interval. The
+    same comparison picks up rows the delta pull missed (e.g. written with
+    an updated_at older than the cursor), which are then fetched by id.
+    """
+
+    COLUMNS = "id,term,language,translation,context,generic_name,brand_name,aliases,updated_at"
+
+    def __init__(self, url: str, key: str, page_size: int = 1000):
+        self.url = url
+        self.key = key
+        self.page_size = page_size
+        self._client = None
+
+    async def client(self):
+        if self._client is None:
+            from supabase import acreate_client
+
+            self._client = await acreate_client(self.url, self.key)
+        return self._client
+
+    async def fetch_all(self) -> List[Term]:
+        return await self.fetch_since("")
+
+    async def fetch_since(self, cursor: str) -> List[Term]:
+        """Rows with updated_at >= cursor, keyset-paged on (updated_at, id)."""
+        terms: List[Term] = []
+        client = await self.client()
+        last: Optional[Term] = None
+        while True:
+            query = client.table("terminology").select(self.COLUMNS).order("updated_at").order("id")
+            if last is not None:
+                # Tie-break on id: bulk imports share one updated_at
+                query = query.or_(
+                    f'updated_at.gt."{last.updated_at}",'
+                    f'and(updated_at.eq."{last.updated_at}",id.gt.{last.id})'
+                )
+            elif cursor:
+                query = query.gte("updated_at", cursor)
+            rows = (await query.limit(self.page_size).execute()).data
+            terms.extend(Term.from_row(row) for row in rows)
+            if len(rows) < self.page_size:
+                return terms
+            last = terms[-1]
+
+    async def fetch_ids(self) -> Set[str]:
+        ids: Set[str] = set()
+        offset = 0
+        client = await self.client()
+        while True:
+            rows = (
+                await client.table("terminology")
+                .select("id")
+                .order("id")
+                .range(offset, offset + self.page_size - 1)
+                .execute()
+            ).data
+            ids.update(str(row["id"]) for row in rows)
+            if len(rows) < self.page_size:
+                return ids
+            offset += self.page_size
+
+    async def fetch_by_ids(self, ids: Iterable[str], chunk_size: int = 200) -> List[Term]:
+        ids = list(ids)
+        terms: List[Term] = []
+        client = await self.client()
+        # Chunked so the id list stays within URL length limits
+        for start in range(0, len(ids), chunk_size):
+            rows = (
+                await client.table("terminology")
+                .select(self.COLUMNS)
+                .in_("id", ids[start:start + chunk_size])
+                .execute()
+            ).data
+            terms.extend(Term.from_row(row) for row in rows)
+        return terms
+
+
+# --- Service ---
+
+class TerminologyService:
+    """
+    Owns the live index: full load at startup, then periodic delta pulls.
+
+    Compaction runs in a worker thread on a snapshot; changes that arrive
+    meanwhile are re-applied to the new index before it is swapped in.
+    """
+
+    def __init__(
+        self,
+        source: TerminologySource,
+        refresh_seconds: float = 30.0,
+        reconcile_seconds: float = 3600.0,
+        compact_threshold: int = 2000,
+    ):
+        self.source = source
+        self.refresh_seconds = refresh_seconds
+        self.reconcile_seconds = reconcile_seconds
+        self.index = TerminologyIndex(compact_threshold)
+        self._task: Optional[asyncio.Task] = None
+        self._compacting = False
+        self._pending: List[Tuple[List[Term], List[str]]] = []
+
+    async def start(self) -> None:
+        terms = await self.source.fetch_all()
+        self.index.load(terms)
+        logger.info(f"Loaded {len(terms)} terminology entries")
+        self._task = asyncio.create_task(self._refresh_loop())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def apply(self, changed: List[Term] = (), deleted: List[str] = ()) -> None:
+        """Apply changes (from the delta pull or a change-feed callback)."""
+        changed, deleted = list(changed), list(deleted)
+        self.index.apply(changed, deleted)
+        if self._compacting:
+            self._pending.append((changed, deleted))
+        elif self.index.needs_compaction:
+            asyncio.get_running_loop().create_task(self._compact())
+
+    def suggest(self, text: str) -> List[dict]:
+        return self.index.suggest(text)
+
+    async def refresh(self, reconcile: bool = False) -> None:
+        # The cursor row itself comes back (>=); skip versions already applied
+        changed = [
+            term for term in await self.source.fetch_since(self.index.cursor)
+            if self.index.terms.get(term.id) != term
+        ]
+        deleted: List[str] = []
+        if reconcile:
+            live = await self.source.fetch_ids()
+            deleted = [term_id for term_id in self.index.terms if term_id not in live]
+            # Live rows the delta pull never returned
+            seen = {term.id for term in changed}
+            missing = [term_id for term_id in live if term_id not in self.index.terms and term_id not in seen]
+            if missing:
+                changed.extend(await self.source.fetch_by_ids(missing))
+        if changed or deleted:
+            self.apply(changed, deleted)
+            logger.info(f"Terminology delta: {len(changed)} changed, {len(deleted)} deleted")
+
+    async def _refresh_loop(self) -> None:
+        since_reconcile = 0.0
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            since_reconcile += self.refresh_seconds
+            reconcile = since_reconcile >= self.reconcile_seconds
+            if reconcile:
+                since_reconcile = 0.0
+            try:
+                await self.refresh(reconcile)
+            except Exception as e:
+                logger.warning(f"Terminology refresh failed: {e}")
+
+    async def _compact(self) -> None:
+        self._compacting = True
+        try:
+            fresh = await asyncio.to_thread(self.index.compacted)
+            for changed, deleted in self._pending:
+                fresh.apply(changed, deleted)
+            self.index = fresh
+        finally:
+            self._pending = []
+            self._compacting = False
+
+
+def create_terminology_service() -> TerminologyService:
+    """Supabase-backed when configured, otherwise the built-in term list."""
+    if settings.SUPABASE_URL and settings.SUPABASE_SERVICE_ROLE_KEY:
+        source: TerminologySource = SupabaseTerminologySource(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    else:
+        logger.warning("Supabase not configured; using built-in terminology.")
+        source = StaticTerminologySource()
+    return TerminologyService(
+        source,
+        refresh_seconds=settings.TERMINOLOGY_REFRESH_SECONDS,
+        reconcile_seconds=settings.TERMINOLOGY_RECONCILE_SECONDS,
+        compact_threshold=settings.TERMINOLOGY_COMPACT_THRESHOLD,
+    )
+
+
+terminology_service = create_terminology_service()
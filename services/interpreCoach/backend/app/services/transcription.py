@@ -0,0 +1,240 @@
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Protocol
+
+import numpy as np
+
+from app.config import settings
+from app.services.audio_stream import AudioWindow
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriberConfigError(RuntimeError):
+    """The configured speech-to-text backend can't be used."""
+
+
+@dataclass
+class TranscriptUpdate:
+    """
+    A partial or final transcript for the current utterance.
+
+    `end` is the absolute sample position of the newest audio the text
+    accounts for; clients use it to measure end-to-end latency.
+    """
+    text: str
+    is_final: bool
+    start: int
+    end: int
+
+
+class TranscriberSession(Protocol):
+    """Per-connection streaming recognizer state."""
+
+    async def feed(self, window: AudioWindow) -> List[TranscriptUpdate]: ...
+
+    async def finish(self) -> List[TranscriptUpdate]: ...
+
+    async def close(self) -> None:
+        """Release connections and tasks; called on every exit path, also after finish()."""
+        ...
+
+
+class StreamingTranscriber(Protocol):
+    def open(self, sample_rate: int) -> TranscriberSession: ...
+
+
+class FakeTranscriberSession:
+    def __init__(self, transcriber: "FakeTranscriber", sample_rate: int):
+        self.transcriber = transcriber
+        self.sample_rate = sample_rate
+        self.words: List[str] = []
+        self.utterance_start = 0
+        self.index = 0
+        self.windows = 0
+        self.last_end = 0
+
+    async def feed(self, window: AudioWindow) -> List[TranscriptUpdate]:
+        if self.transcriber.delay_seconds:
+            # Simulates recognizer compute time so backpressure can be exercised
+            await asyncio.sleep(self.transcriber.delay_seconds)
+        if self.transcriber.cpu_seconds:
+            # Simulates on-box recognizer compute (holds the worker's CPU)
+            deadline = time.process_time() + self.transcriber.cpu_seconds
+            while time.process_time() < deadline:
+                pass
+        new = window.samples[window.new_from:]
+        if not len(new):
+            return []
+        self.last_end = window.end
+        if not self.words:
+            self.utterance_start = window.start + window.new_from
+        rms = float(np.sqrt(np.mean(np.square(new, dtype=np.float64)))) / 32768.0
+        if rms >= self.transcriber.silence_rms:
+            for _ in range(self.transcriber.words_per_window):
+                self.words.append(self.transcriber.script[self.index % len(self.transcriber.script)])
+                self.index += 1
+        self.windows += 1
+        if not self.words:
+            return []
+        is_final = self.windows % self.transcriber.windows_per_utterance == 0
+        update = TranscriptUpdate(" ".join(self.words), is_final, self.utterance_start, window.end)
+        if is_final:
+            self.words = []
+        return [update]
+
+    async def finish(self) -> List[TranscriptUpdate]:
+        if not self.words:
+            return []
+        update = TranscriptUpdate(" ".join(self.words), True, self.utterance_start, self.last_end)
+        self.words = []
+        return [update]
+
+    async def close(self) -> None:
+        pass
+
+
+class FakeTranscriber:
+    """
+    Deterministic local stand-in for tests, load runs and offline development.
+
+    Each window containing new audible audio appends the next words of a
+    fixed medical script to the current utterance, which is re-emitted as a
+    growing partial and finalized every `windows_per_utterance` windows,
+    mirroring how streaming STT services behave.
+    """
+
+    SCRIPT = (
+        "the patient reports chest pain radiating to the left arm since yesterday "
+        "she has a history of hypertension and type two diabetes "
+        "the doctor suspects myocarditis and orders an electrocardiogram "
+        "blood pressure is elevated and the patient feels shortness of breath"
+    ).split()
+
+    def __init__(
+        self,
+        words_per_window: int = 2,
+        windows_per_utterance: int = 6,
+        silence_rms: float = 0.005,
+        delay_seconds: float = 0.0,
+        cpu_seconds: float = 0.0,
+        script: Optional[List[str]] = None,
+    ):
+        self.words_per_window = words_per_window
+        self.windows_per_utterance = windows_per_utterance
+        self.silence_rms = silence_rms
+        self.delay_seconds = delay_seconds
+        self.cpu_seconds = cpu_seconds
+        self.script = script or self.SCRIPT
+
+    def open(self, sample_rate: int) -> FakeTranscriberSession:
+        return FakeTranscriberSession(self, sample_rate)
+
+
+class DeepgramTranscriberSession:
+    """
+    Forwards only the new (non-overlapping) audio of each window to a
+    Deepgram live socket; results arrive asynchronously and are drained on
+    the next feed().
+    """
+
+    URL = (
+        "wss://api.deepgram.com/v1/listen?encoding=linear16&channels=1"
+        "&sample_rate={sample_rate}&interim_results=true&punctuate=true&model={model}"
+    )
+
+    def __init__(self, api_key: str, sample_rate: int, model: str):
+        self.api_key = api_key
+        self.sample_rate = sample_rate
+        self.model = model
+        self._socket = None
+        self._reader: Optional[asyncio.Task] = None
+        self._updates: List[TranscriptUpdate] = []
+        self._done = asyncio.Event()
+
+    async def _connect(self) -> None:
+        import websockets
+
+        self._socket = await websockets.connect(
+            self.URL.format(sample_rate=self.sample_rate, model=self.model),
+            additional_headers={"Authorization": f"Token {self.api_key}"},
+        )
+        self._reader = asyncio.create_task(self._read())
+
+    async def _read(self) -> None:
+        try:
+            async for message in self._socket:
+                result = json.loads(message)
+                if result.get("type") != "Results":
+                    continue
+                alternatives = result["channel"]["alternatives"]
+                text = alternatives[0]["transcript"] if alternatives else ""
+                if not text:
+                    continue
+                start = int(result["start"] * self.sample_rate)
+                end = int((result["start"] + result["duration"]) * self.sample_rate)
+                self._updates.append(TranscriptUpdate(text, bool(result.get("is_final")), start, end))
+        except Exception as e:
+            logger.warning(f"Deepgram stream closed: {e}")
+        finally:
+            self._done.set()
+
+    def _drain(self) -> List[TranscriptUpdate]:
+        updates, self._updates = self._updates, []
+        return updates
+
+    async def feed(self, window: AudioWindow) -> List[TranscriptUpdate]:
+        if self._socket is None:
+            await self._connect()
+        new = window.samples[window.new_from:]
+        if len(new):
+            await self._socket.send(new.astype("<i2", copy=False).tobytes())
+        return self._drain()
+
+    async def finish(self) -> List[TranscriptUpdate]:
+        if self._socket is None:
+            return []
+        await self._socket.send(json.dumps({"type": "CloseStream"}))
+        try:
+            await asyncio.wait_for(self._done.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            pass
+        await self._socket.close()
+        return self._drain()
+
+    async def close(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            await asyncio.gather(self._reader, return_exceptions=True)
+            self._reader = None
+        if self._socket is not None:
+            await self._socket.close()
+            self._socket = None
+
+
+class DeepgramTranscriber:
+    def __init__(self, api_key: str, model: str = "nova-2-medical"):
+        self.api_key = api_key
+        self.model = model
+
+    def open(self, sample_rate: int) -> DeepgramTranscriberSession:
+        return DeepgramTranscriberSession(self.api_key, sample_rate, self.model)
+
+
+def get_transcriber() -> StreamingTranscriber:
+    """
+    Transcriber selected by the TRANSCRIBER setting ("deepgram" or "fake").
+
+    Called at import of the stream router, so a misconfigured recognizer
+    stops the server at startup. The fake is only used on explicit opt-in.
+    """
+    if settings.TRANSCRIBER == "fake":
+        return FakeTranscriber(cpu_seconds=settings.FAKE_STT_CPU_MS / 1000)
+    if settings.TRANSCRIBER != "deepgram":
+        raise TranscriberConfigError(f"Unknown TRANSCRIBER: {settings.TRANSCRIBER!r}")
+    if not settings.DEEPGRAM_API_KEY:
+        raise TranscriberConfigError("TRANSCRIBER=deepgram needs DEEPGRAM_API_KEY (or set TRANSCRIBER=fake)")
+    return DeepgramTranscriber(settings.DEEPGRAM_API_KEY)
@@ -0,0 +1,319 @@
+"""
+Embedded approximate-nearest-neighbor search for semantic term lookup.
+
+An IVF (inverted file) index is built offline: vectors are clustered with
+k-means and stored contiguously per cluster in plain .npy files. At startup
+each worker opens them with np.load(mmap_mode="r"), so every uvicorn worker
+maps the same read-only pages from the OS page cache instead of holding
+its own copy, and nothing leaves the process on the live-call path.
+
+    # build from the terminology table (or the built-in glossary offline)
+    python -m app.services.vector_index build --out data/term_vectors
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Protocol, Sequence, Tuple
+
+import numpy as np
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+
+# --- Embedding ---
+
+class Embedder(Protocol):
+    dim: int
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """(len(texts), dim) float32, L2-normalized rows."""
+        ...
+
+
+class HashingEmbedder:
+    """
+    Character n-gram feature hashing: deterministic, offline and fast.
+
+    Catches spelling variants, inflections and partial transcriptions of
+    a term ("echocardiography" ~ "echocardiogram"); a learned sentence
+    embedder can be swapped in behind the same interface.
+    """
+
+    def __init__(self, dim: int = 256, ngrams: Tuple[int, ...] = (3, 4)):
+        self.dim = dim
+        self.ngrams = ngrams
+
+    def _features(self, text: str) -> Dict[int, float]:
+        text = unicodedata.normalize("NFKD", text.casefold())
+        text = "".join(ch for ch in text if not unicodedata.combining(ch))
+        features: Dict[int, float] = {}
+        for word in re.findall(r"[^\W_]+", text):
+            padded = f" {word} "
+            for n in self.ngrams:
+                for i in range(max(1, len(padded) - n + 1)):
+                    digest = hashlib.blake2b(padded[i:i + n].encode(), digest_size=8).digest()
+                    value = int.from_bytes(digest, "little")
+                    slot = value % self.dim
+                    # Sign bit keeps collisions from adding up on average
+                    features[slot] = features.get(slot, 0.0) + (1.0 if value >> 63 else -1.0)
+        return features
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for slot, weight in self._features(text).items():
+                out[row, slot] = weight
+        return normalize_rows(out)
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+# --- Offline build ---
+
+def train_centroids(vectors: np.ndarray, nlist: int, iterations: int = 12, sample: int = 256, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on a sample of at most `sample` points per list."""
+    rng = np.random.default_rng(seed)
+    if len(vectors) > nlist * sample:
+        vectors = vectors[rng.choice(len(vectors), nlist * sample, replace=False)]
+    centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = assign_lists(vectors, centroids)
+        counts = np.bincount(assign, minlength=nlist)
+        order = np.argsort(assign, kind="stable")
+        sums = np.zeros_like(centroids)
+        used = counts > 0
+        sums[used] = np.add.reduceat(vectors[order], np.cumsum(counts)[used] - counts[used])
+        empty = ~used
+        # Re-seed empty lists from random points so no list stays unused
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+def assign_lists(vectors: np.ndarray, centroids: np.ndarray, batch: int = 16384) -> np.ndarray:
+    out = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), batch):
+        out[start:start + batch] = np.argmax(vectors[start:start + batch] @ centroids.T, axis=1)
+    return out
+
+
+def build_index(vectors: np.ndarray, ids: Sequence[str], path: str, nlist: Optional[int] = None, **meta) -> Path:
+    """
+    Cluster `vectors` (one per id) and write the index directory atomically.
+
+    Layout: centroids.npy (nlist, d), vectors.npy (n, d) ordered by list,
+    offsets.npy (nlist + 1,) row ranges per list, ids.npy fixed-width
+    strings in the same order, meta.json.
+    """
+    vectors = normalize_rows(vectors)
+    nlist = nlist or max(1, min(4096, int(4 * np.sqrt(len(vectors)))))
+    nlist = min(nlist, len(vectors))
+    centroids = train_centroids(vectors, nlist)
+    assign = assign_lists(vectors, centroids)
+    order = np.argsort(assign, kind="stable")
+    offsets = np.zeros(nlist + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.bincount(assign, minlength=nlist))
+
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(dir=target.parent, prefix=f".{target.name}."))
+    staging.chmod(0o755)
+    np.save(staging / "centroids.npy", centroids)
+    np.save(staging / "vectors.npy", vectors[order])
+    np.save(staging / "offsets.npy", offsets)
+    np.save(staging / "ids.npy", np.asarray(ids)[order].astype(str))
+    (staging / "meta.json").write_text(json.dumps({
+        "version": FORMAT_VERSION, "count": len(vectors), "dim": vectors.shape[1], "nlist": nlist, **meta,
+    }))
+    # Swap directories so running workers keep their (unlinked) mapping
+    if target.exists():
+        retired = target.with_name(f".{target.name}.old")
+        os.replace(target, retired)
+        os.replace(staging, target)
+        for child in retired.iterdir():
+            child.unlink()
+        retired.rmdir()
+    else:
+        os.replace(staging, target)
+    return target
+
+
+# --- Search ---
+
+@dataclass
+class Neighbor:
+    id: str
+    score: float  # cosine similarity
+
+
+class IvfIndex:
+    """Read-only, memory-mapped IVF index; see build_index() for the layout."""
+
+    def __init__(self, path: str, nprobe: int = 8):
+        root = Path(path)
+        self.meta = json.loads((root / "meta.json").read_text())
+        if self.meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported vector index version {self.meta.get('version')}")
+        self.centroids = np.load(root / "centroids.npy")
+        self.vectors = np.load(root / "vectors.npy", mmap_mode="r")
+        self.offsets = np.load(root / "offsets.npy")
+        self.ids = np.load(root / "ids.npy", mmap_mode="r")
+        self.nprobe = nprobe
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    @property
+    def dim(self) -> int:
+        return self.vectors.shape[1]
+
+    def search(self, queries: np.ndarray, k: int = 5, nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k rows for each query in a batch; (scores, rows), -1 rows pad.
+
+        The lists probed by any query in the batch are scored against all
+        queries in one matrix product; scores from lists a query did not
+        probe are masked out.
+        """
+        queries = normalize_rows(np.atleast_2d(queries))
+        nq = len(queries)
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        probes = np.argpartition(-(queries @ self.centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+
+        # Probed lists of the whole batch, each read once as a contiguous slice
+        lists = np.unique(probes)
+        starts, ends = self.offsets[lists], self.offsets[lists + 1]
+        sizes = ends - starts
+        candidates = np.concatenate([self.vectors[a:b] for a, b in zip(starts, ends)])
+        rows = np.concatenate([np.arange(a, b) for a, b in zip(starts, ends)])
+        scores = queries @ candidates.T
+        # A query only sees the lists it probed
+        probed = np.zeros((nq, len(lists)), dtype=bool)
+        probed[np.arange(nq)[:, None], np.searchsorted(lists, probes)] = True
+        scores[~np.repeat(probed, sizes, axis=1)] = -np.inf
+
+        take = min(k, len(rows))
+        top = np.argpartition(-scores, take - 1, axis=1)[:, :take]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        top_rows = np.where(np.isfinite(top_scores), rows[np.take_along_axis(top, order, axis=1)], -1)
+
+        best_scores = np.full((nq, k), -np.inf, dtype=np.float32)
+        best_rows = np.full((nq, k), -1, dtype=np.int64)
+        best_scores[:, :take] = top_scores
+        best_rows[:, :take] = top_rows
+        return best_scores, best_rows
+
+    def exact(self, queries: np.ndarray, k: int = 5, batch: int = 65536) -> Tuple[np.ndarray, np.ndarray]:
+        """Brute-force top-k over every vector (reference for recall)."""
+        queries = normalize_rows(np.atleast_2d(queries))
+        best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        best_rows = np.full((len(queries), k), -1, dtype=np.int64)
+        for start in range(0, len(self.vectors), batch):
+            scores = queries @ self.vectors[start:start + batch].T
+            merged_scores = np.concatenate([best_scores, scores], axis=1)
+            merged_rows = np.concatenate([best_rows, np.broadcast_to(np.arange(start, start + scores.shape[1]), scores.shape)], axis=1)
+            keep = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(merged_scores, keep, axis=1)
+            best_rows = np.take_along_axis(merged_rows, keep, axis=1)
+        order = np.argsort(-best_scores, axis=1)
+        return np.take_along_axis(best_scores, order, axis=1), np.take_along_axis(best_rows, order, axis=1)
+
+    def neighbors(self, queries: np.ndarray, k: int = 5, min_score: float = 0.0) -> List[List[Neighbor]]:
+        scores, rows = self.search(queries, k)
+        return [
+            [Neighbor(str(self.ids[row]), float(score)) for score, row in zip(query_scores, query_rows)
+             if row >= 0 and score >= min_score]
+            for query_scores, query_rows in zip(scores, rows)
+        ]
+
+
+class SemanticLookup:
+    """Embeds text batches and resolves neighbors to terminology entries."""
+
+    def __init__(self, embedder: Embedder, index_path: str, nprobe: int, min_score: float):
+        self.embedder = embedder
+        self.index_path = index_path
+        self.nprobe = nprobe
+        self.min_score = min_score
+        self.index: Optional[IvfIndex] = None
+
+    def open(self) -> bool:
+        if not (Path(self.index_path) / "meta.json").exists():
+            logger.warning(f"No vector index at {self.index_path}; semantic lookup disabled.")
+            return False
+        index = IvfIndex(self.index_path, self.nprobe)
+        if index.dim != self.embedder.dim:
+            raise ValueError(f"Vector index dim {index.dim} != embedder dim {self.embedder.dim}")
+        self.index = index
+        logger.info(f"Mapped vector index with {len(index)} vectors from {self.index_path}")
+        return True
+
+    def lookup(self, texts: Sequence[str], k: int = 5) -> List[List[Neighbor]]:
+        """One batched search for all texts (e.g. the phrases of one window)."""
+        if self.index is None or not texts:
+            return [[] for _ in texts]
+        # Several surface forms per term: over-fetch, then keep each term once
+        batches = self.index.neighbors(self.embedder.embed(texts), k * 2, self.min_score)
+        results = []
+        for neighbors in batches:
+            seen = set()
+            unique = []
+            for neighbor in neighbors:
+                if neighbor.id not in seen:
+                    seen.add(neighbor.id)
+                    unique.append(neighbor)
+            results.append(unique[:k])
+        return results
+
+
+semantic_lookup = SemanticLookup(
+    HashingEmbedder(settings.VECTOR_INDEX_DIM),
+    settings.VECTOR_INDEX_PATH,
+    nprobe=settings.VECTOR_INDEX_NPROBE,
+    min_score=settings.VECTOR_INDEX_MIN_SCORE,
+)
+
+
+async def build_from_terminology(out: str, nlist: Optional[int] = None) -> Path:
+    """Embed every surface form of every term and build the index at `out`."""
+    from app.services.terminology import create_terminology_service
+
+    service = create_terminology_service()
+    terms = await service.source.fetch_all()
+    texts, ids = [], []
+    for term in terms:
+        for form in {term.term, term.generic_name, term.brand_name, *term.aliases} - {""}:
+            texts.append(form)
+            ids.append(term.id)
+    vectors = semantic_lookup.embedder.embed(texts)
+    return build_index(vectors, ids, out, nlist, embedder=type(semantic_lookup.embedder).__name__)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the semantic terminology index.")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--out", default=settings.VECTOR_INDEX_PATH)
+    parser.add_argument("--nlist", type=int, default=None)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    path = asyncio.run(build_from_terminology(args.out, args.nlist))
+    print(f"Wrote {json.loads((path / 'meta.json').read_text())['count']} vectors to {path}")
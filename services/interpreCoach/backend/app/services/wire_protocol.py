@@ -0,0 +1,165 @@
+"""
+Reply encodings for /ws/audio/{client_id}, negotiated at connect.
+
+  full    {"transcript", "is_final", "suggestions", "audio_ms"} as JSON text,
+          the whole utterance on every update (default, original format)
+  delta   only what changed, with short keys:
+            u  utterance number (a new number starts a new line)
+            o  offset into the current utterance text to replace from
+            t  text replacing everything from `o` (usually an append)
+            f  1 when the utterance is final (omitted otherwise)
+            a  audio_ms, as in full
+            d  term definitions, sent once per connection:
+               [[ref, id, term, translation, context], ...]
+            s  suggestions as [[ref, start, end], ...] code-point offsets
+               into the utterance (the client derives context from them)
+          encoded as JSON text or, with msgpack, binary frames.
+
+When a client reconnects with the same client_id and its session state is
+restored, the first reply is a resume notice: {"type": "resumed",
+"audio_ms"} in full mode, {"r": audio_ms} in delta mode. Refs the client
+received before the reconnect stay valid.
+
+Clients pick one with the WebSocket subprotocol header (first supported
+entry wins) or, where headers can't be set, ?protocol=delta&encoding=msgpack.
+A request this server can't honour (e.g. msgpack without the package
+installed) is rejected rather than silently answered in another format.
+"""
+
+import json
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+from app.services.keywords import common_prefix
+from app.services.session_state import SessionState
+from app.services.terminology import TermMatch, suggestion
+from app.services.transcription import TranscriptUpdate
+
+try:
+    import msgpack
+except ImportError:  # optional: binary framing is only offered when installed
+    msgpack = None
+
+Frame = Union[str, bytes]
+
+
+class UnsupportedProtocolError(ValueError):
+    """The client asked for a reply encoding this server can't provide."""
+
+
+def _json(payload: dict) -> str:
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+
+
+def _msgpack(payload: dict) -> bytes:
+    return msgpack.packb(payload, use_bin_type=True)
+
+
+class FullProtocol:
+    """Original format: the whole transcript and suggestion payloads each time."""
+
+    name = "full"
+
+    def encode(self, update: TranscriptUpdate, matches: List[TermMatch], audio_ms: int) -> Frame:
+        return _json({
+            "transcript": update.text,
+            "is_final": update.is_final,
+            "suggestions": [suggestion(m.term, update.text, m.start, m.end) for m in matches],
+            "audio_ms": audio_ms,
+        })
+
+    def resume(self, state: SessionState, audio_ms: int) -> Frame:
+        """Restore from a previous connection's state; returns the notice."""
+        return _json({"type": "resumed", "audio_ms": audio_ms})
+
+    def sync(self, state: SessionState) -> None:
+        pass
+
+
+class DeltaProtocol:
+    """Transcript deltas and per-connection term refs; see the module docstring."""
+
+    def __init__(self, pack: Callable[[dict], Frame], encoding: str):
+        self.pack = pack
+        self.name = f"delta+{encoding}"
+        self.utterance = 0
+        self._utterance_start: Optional[int] = None
+        self._text = ""
+        self._final = False
+        self._refs: Dict[str, int] = {}
+        self._new_refs: List[str] = []
+
+    def resume(self, state: SessionState, audio_ms: int) -> Frame:
+        if state.protocol.startswith("delta"):
+            self.utterance = state.utterance
+            self._refs = dict(state.refs)
+        return self.pack({"r": audio_ms})
+
+    def sync(self, state: SessionState) -> None:
+        """Copy the line counter and newly assigned refs into `state`."""
+        state.utterance = self.utterance
+        for term_id in self._new_refs:
+            state.mark_ref(term_id, self._refs[term_id])
+        self._new_refs = []
+
+    def encode(self, update: TranscriptUpdate, matches: List[TermMatch], audio_ms: int) -> Frame:
+        # After a final, the next update starts a new line even at the same start
+        if update.start != self._utterance_start or self._final:
+            self.utterance += 1
+            self._utterance_start = update.start
+            self._text = ""
+        offset = common_prefix(self._text, update.text)
+        frame = {"u": self.utterance, "o": offset, "t": update.text[offset:], "a": audio_ms}
+        if update.is_final:
+            frame["f"] = 1
+        if matches:
+            definitions = []
+            refs = []
+            for match in matches:
+                ref = self._refs.get(match.term.id)
+                if ref is None:
+                    ref = self._refs[match.term.id] = len(self._refs)
+                    self._new_refs.append(match.term.id)
+                    term = match.term
+                    definitions.append([ref, term.id, term.term, term.translation, term.context])
+                refs.append([ref, match.start, match.end])
+            if definitions:
+                frame["d"] = definitions
+            frame["s"] = refs
+        self._text = update.text
+        self._final = update.is_final
+        return self.pack(frame)
+
+
+WireProtocol = Union[FullProtocol, DeltaProtocol]
+
+SUBPROTOCOLS = {
+    "interprecoach.delta.msgpack": ("delta", "msgpack"),
+    "interprecoach.delta.json": ("delta", "json"),
+    "interprecoach.full.json": ("full", "json"),
+}
+
+
+def create_protocol(protocol: str, encoding: str) -> Optional[WireProtocol]:
+    if protocol == "full" and encoding == "json":
+        return FullProtocol()
+    if protocol == "delta" and encoding == "json":
+        return DeltaProtocol(_json, "json")
+    if protocol == "delta" and encoding == "msgpack" and msgpack is not None:
+        return DeltaProtocol(_msgpack, "msgpack")
+    return None
+
+
+def negotiate(offered: Sequence[str], query: Mapping[str, str]) -> Tuple[WireProtocol, Optional[str]]:
+    """(protocol, subprotocol to accept with) for a connecting client."""
+    requested = [subprotocol for subprotocol in offered if subprotocol in SUBPROTOCOLS]
+    for subprotocol in requested:
+        chosen = create_protocol(*SUBPROTOCOLS[subprotocol])
+        if chosen is not None:
+            return chosen, subprotocol
+    if requested:
+        raise UnsupportedProtocolError(f"None of the offered subprotocols are available: {', '.join(requested)}")
+    protocol, encoding = query.get("protocol", "full"), query.get("encoding", "json")
+    chosen = create_protocol(protocol, encoding)
+    if chosen is None:
+        raise UnsupportedProtocolError(f"Unsupported protocol={protocol} with encoding={encoding}")
+    return chosen, None
@@ -0,0 +1,106 @@
+"""
+CPU per audio-minute of term spotting, full re-match vs. incremental.
+
+Replays a transcript recording (JSONL of TranscriptUpdate fields, one per
+line) through both extractors:
+
+  before  index.suggest(update.text) on every update (re-tokenizes and
+          re-matches the whole growing utterance)
+  after   IncrementalExtractor.update(update) (new suffix only, deduped)
+
+Without --replay, a recording is produced by running the fake streaming
+recognizer over synthetic speech through the real ring buffer and framer;
+--record saves it for later runs.
+
+    python -m loadtest.keyword_replay --minutes 30 --terms 100000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from dataclasses import asdict
+from typing import List
+
+from app.config import settings
+from app.services.audio_stream import Framer, RingBuffer
+from app.services.keywords import IncrementalExtractor
+from app.services.terminology import DEFAULT_TERMS, TerminologyIndex
+from app.services.transcription import FakeTranscriber, TranscriptUpdate
+from loadtest.terminology_bench import synthetic_terms
+from loadtest.ws_audio import speech_like_pcm
+
+
+async def record(minutes: float, words_per_window: int, windows_per_utterance: int) -> List[TranscriptUpdate]:
+    rate = settings.AUDIO_SAMPLE_RATE
+    ring = RingBuffer(rate * 10)
+    framer = Framer(ring, rate * settings.STREAM_WINDOW_MS // 1000, rate * settings.STREAM_HOP_MS // 1000)
+    stt = FakeTranscriber(words_per_window=words_per_window, windows_per_utterance=windows_per_utterance).open(rate)
+    pcm = speech_like_pcm(minutes * 60, rate, seed=0)
+    updates: List[TranscriptUpdate] = []
+    chunk = rate // 10 * 2
+    for offset in range(0, len(pcm), chunk):
+        ring.write(pcm[offset:offset + chunk])
+        while (window := framer.next_window()) is not None:
+            updates.extend(await stt.feed(window))
+    updates.extend(await stt.finish())
+    return updates
+
+
+class Holder:
+    def __init__(self, index: TerminologyIndex):
+        self.index = index
+
+
+def main(args) -> None:
+    if args.replay:
+        with open(args.replay) as f:
+            updates = [TranscriptUpdate(**json.loads(line)) for line in f]
+    else:
+        updates = asyncio.run(record(args.minutes, args.words_per_window, args.windows_per_utterance))
+    if args.record:
+        with open(args.record, "w") as f:
+            f.writelines(json.dumps(asdict(update)) + "\n" for update in updates)
+
+    audio_minutes = max(update.end for update in updates) / settings.AUDIO_SAMPLE_RATE / 60
+    finals = [update for update in updates if update.is_final]
+    words = sum(len(update.text.split()) for update in finals)
+    print(f"replay:  {len(updates)} updates, {len(finals)} utterances, {words} words, {audio_minutes:.1f} audio min "
+          f"(avg {sum(len(u.text) for u in updates) / len(updates):.0f} chars/update)")
+
+    index = TerminologyIndex()
+    index.load(DEFAULT_TERMS + synthetic_terms(args.terms))
+    print(f"index:   {len(index)} terms")
+
+    before_terms = set()
+    started = time.process_time()
+    for update in updates:
+        before_terms.update(item["id"] for item in index.suggest(update.text))
+    before = time.process_time() - started
+
+    extractor = IncrementalExtractor(Holder(index))
+    after_terms = set()
+    started = time.process_time()
+    for update in updates:
+        after_terms.update(match.term.id for match in extractor.update(update))
+    after = time.process_time() - started
+
+    print(f"before:  {before / audio_minutes * 1000:8.2f} ms CPU per audio minute")
+    print(f"after:   {after / audio_minutes * 1000:8.2f} ms CPU per audio minute  (x{before / after:.1f})")
+    print(f"terms:   {len(before_terms)} before, {len(after_terms)} after, "
+          f"{len(before_terms ^ after_terms)} differ")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--replay", help="JSONL recording to replay")
+    parser.add_argument("--record", help="write the replayed updates to this JSONL file")
+    parser.add_argument("--minutes", type=float, default=10.0)
+    parser.add_argument("--words-per-window", type=int, default=1)
+    parser.add_argument("--windows-per-utterance", type=int, default=40, help="partials per utterance")
+    parser.add_argument("--terms", type=int, default=20_000, help="synthetic terms added to the index")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,103 @@
+"""
+Reply size and client apply cost per wire protocol, on a session replay.
+
+Replays a transcript recording (see loadtest.keyword_replay) through the
+server-side extractor and each encoding, then decodes and applies every
+frame with a reference client that rebuilds the transcript and the
+suggestion list the way the extension does.
+
+    python -m loadtest.protocol_replay --minutes 30
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List
+
+import msgpack
+
+from app.config import settings
+from app.services.keywords import IncrementalExtractor
+from app.services.terminology import DEFAULT_TERMS, TerminologyIndex
+from app.services.transcription import TranscriptUpdate
+from app.services.wire_protocol import create_protocol
+from loadtest.keyword_replay import Holder, record
+
+
+class FullClient:
+    def __init__(self):
+        self.lines: List[str] = []
+        self.text = ""
+        self.suggestions: List[tuple] = []
+
+    def apply(self, frame) -> None:
+        message = json.loads(frame)
+        self.text = message["transcript"]
+        if message["is_final"]:
+            self.lines.append(self.text)
+        for item in message["suggestions"]:
+            self.suggestions.append((item["id"], item["translation"]))
+
+
+class DeltaClient:
+    def __init__(self):
+        self.lines: List[str] = []
+        self.utterance = 0
+        self.text = ""
+        self.terms: Dict[int, list] = {}
+        self.suggestions: List[tuple] = []
+
+    def apply(self, frame) -> None:
+        message = msgpack.unpackb(frame) if isinstance(frame, bytes) else json.loads(frame)
+        if message["u"] != self.utterance:
+            self.utterance = message["u"]
+            self.text = ""
+        self.text = self.text[:message["o"]] + message["t"]
+        if message.get("f"):
+            self.lines.append(self.text)
+        for definition in message.get("d", ()):
+            self.terms[definition[0]] = definition
+        for ref, start, end in message.get("s", ()):
+            term = self.terms[ref]
+            self.suggestions.append((term[1], term[3]))
+
+
+def main(args) -> None:
+    updates: List[TranscriptUpdate] = asyncio.run(record(args.minutes, args.words_per_window, args.windows_per_utterance))
+    index = TerminologyIndex()
+    index.load(DEFAULT_TERMS)
+    print(f"replay: {len(updates)} updates over {args.minutes:.0f} min "
+          f"(avg {sum(len(u.text) for u in updates) / len(updates):.0f} chars of transcript/update)")
+
+    reference = None
+    for protocol, encoding, client in (("full", "json", FullClient), ("delta", "json", DeltaClient),
+                                       ("delta", "msgpack", DeltaClient)):
+        wire = create_protocol(protocol, encoding)
+        extractor = IncrementalExtractor(Holder(index))
+        frames = [wire.encode(u, extractor.update(u), u.end * 1000 // settings.AUDIO_SAMPLE_RATE) for u in updates]
+        sizes = [len(frame.encode() if isinstance(frame, str) else frame) for frame in frames]
+
+        receiver = client()
+        started = time.perf_counter()
+        for frame in frames:
+            receiver.apply(frame)
+        apply_us = (time.perf_counter() - started) / len(frames) * 1e6
+
+        state = (receiver.lines, receiver.suggestions)
+        reference = reference or state
+        print(f"{wire.name:14s} {sum(sizes) / 2**10:8.1f} KiB total  {sum(sizes) / len(sizes):6.1f} B/msg  "
+              f"max {max(sizes):4d} B  apply {apply_us:5.2f} us/msg  "
+              f"{'same result' if state == reference else 'MISMATCH'}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=30.0)
+    parser.add_argument("--words-per-window", type=int, default=1)
+    parser.add_argument("--windows-per-utterance", type=int, default=40)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,111 @@
+"""
+Benchmark for the in-memory terminology index.
+
+Builds an index over synthetic terms (single- and multi-word, with
+aliases), then reports build time, memory, suggest() throughput on
+transcript-sized fragments and the cost of an incremental update.
+
+    python -m loadtest.terminology_bench --terms 100000
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from app.services.terminology import Term, TerminologyIndex
+
+SYLLABLES = "ab ac ad al an ar as bi bo ca ce ci co cu da de di do du el en er es fa fe fi fo ga ge " \
+            "gi go ha he hi ho in is it ka ke ki ko la le li lo lu ma me mi mo mu na ne ni no nu " \
+            "pa pe pi po pu ra re ri ro ru sa se si so su ta te ti to tu va ve vi vo za ze zi zo".split()
+FILLER = "the patient says that she has been feeling a bit worse since last week and".split()
+
+
+def word(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def synthetic_terms(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    terms = []
+    for i in range(count):
+        phrase = " ".join(word(rng) for _ in range(rng.choice((1, 1, 2, 2, 3))))
+        aliases = (word(rng),) if rng.random() < 0.3 else ()
+        terms.append(Term(
+            f"t{i}", phrase, "en", phrase.upper(),
+            brand_name=word(rng).capitalize() if rng.random() < 0.1 else "",
+            aliases=aliases, updated_at=f"2025-01-01T00:00:{i % 60:02d}",
+        ))
+    return terms
+
+
+def fragments(terms: list, count: int, seed: int = 1) -> list:
+    """Partial-transcript-sized text, ~1 in 3 containing a known term."""
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        words = rng.sample(FILLER, 8)
+        if rng.random() < 0.33:
+            words.insert(rng.randrange(len(words)), rng.choice(terms).term)
+        texts.append(" ".join(words))
+    return texts
+
+
+def main(args) -> None:
+    terms = synthetic_terms(args.terms)
+
+    started = time.perf_counter()
+    index = TerminologyIndex()
+    index.load(terms)
+    build = time.perf_counter() - started
+
+    # Separate build: tracemalloc slows allocation-heavy code several-fold
+    tracemalloc.start()
+    measured = TerminologyIndex()
+    measured.load(terms)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del measured
+    stats = index.stats()
+    print(f"terms:        {stats['terms']}  automaton states: {stats['main_states']}")
+    print(f"build:        {build:.2f} s")
+    print(f"memory:       {memory / 2**20:.1f} MiB index structures ({memory / len(terms):.0f} B/term, "
+          f"{memory / 2**20 * 100_000 / len(terms):.1f} MiB per 100k terms)")
+
+    texts = fragments(terms, args.lookups)
+    started = time.perf_counter()
+    hits = sum(len(index.suggest(text)) for text in texts)
+    elapsed = time.perf_counter() - started
+    print(f"suggest():    {len(texts) / elapsed:,.0f} fragments/s  "
+          f"({elapsed / len(texts) * 1e6:.1f} us each, {hits} hits)")
+
+    started = time.perf_counter()
+    found = sum(1 for term in terms[:args.lookups] if index.lookup(term.term.lower()))
+    elapsed = time.perf_counter() - started
+    print(f"lookup():     {min(args.lookups, len(terms)) / elapsed:,.0f} phrases/s  ({found} found)")
+
+    rng = random.Random(2)
+    changed = [
+        Term(term.id, term.term, term.language, "updated", aliases=(word(rng),), updated_at="2025-02-01")
+        for term in rng.sample(terms, args.changes)
+    ]
+    started = time.perf_counter()
+    index.apply(changed, deleted=[terms[0].id])
+    update = time.perf_counter() - started
+    print(f"apply():      {args.changes} changes + 1 delete in {update * 1000:.1f} ms (no full rebuild)")
+
+    started = time.perf_counter()
+    index = index.compacted()
+    print(f"compaction:   {time.perf_counter() - started:.2f} s")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--terms", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=50_000)
+    parser.add_argument("--changes", type=int, default=100)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,79 @@
+"""
+Recall and latency of the IVF index against exact brute-force search.
+
+Builds an index over a synthetic clustered corpus (embedding-like: many
+tight topics in a high-dimensional space), memory-maps it as the server
+does, and sweeps nprobe with batched queries the size of one transcript
+window's phrases.
+
+    python -m loadtest.vector_bench --vectors 200000 --dim 256
+"""
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from app.services.vector_index import IvfIndex, build_index, normalize_rows
+
+
+def synthetic_corpus(count: int, dim: int, topics: int, noise: float, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = normalize_rows(rng.standard_normal((topics, dim)))
+    labels = rng.integers(0, topics, count)
+    return normalize_rows(centers[labels] + noise * normalize_rows(rng.standard_normal((count, dim))))
+
+
+def main(args) -> None:
+    corpus = synthetic_corpus(args.vectors, args.dim, args.topics, args.noise)
+    rng = np.random.default_rng(1)
+    picks = rng.choice(len(corpus), args.queries, replace=False)
+    queries = normalize_rows(corpus[picks] + 0.3 * normalize_rows(rng.standard_normal((args.queries, args.dim))))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        build_index(corpus, [f"t{i}" for i in range(len(corpus))], f"{tmp}/index", args.nlist)
+        print(f"build:   {time.perf_counter() - started:.1f} s  ({args.vectors} x {args.dim})")
+
+        started = time.perf_counter()
+        index = IvfIndex(f"{tmp}/index")
+        print(f"open:    {(time.perf_counter() - started) * 1000:.1f} ms (memory-mapped)  nlist={index.meta['nlist']}")
+
+        started = time.perf_counter()
+        _, truth = index.exact(queries, args.k)
+        exact_seconds = time.perf_counter() - started
+        per_batch = exact_seconds / len(queries) * args.batch
+        print(f"exact:   {per_batch * 1000:7.2f} ms per batch of {args.batch}  recall@{args.k} 1.000")
+
+        for nprobe in args.nprobe:
+            rows = []
+            latencies = []
+            for start in range(0, len(queries), args.batch):
+                began = time.perf_counter()
+                _, found = index.search(queries[start:start + args.batch], args.k, nprobe)
+                latencies.append(time.perf_counter() - began)
+                rows.append(found)
+            found = np.concatenate(rows)
+            recall = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(found, truth)])
+            p50, p99 = np.percentile(np.array(latencies) * 1000, [50, 99])
+            print(f"nprobe {nprobe:3d}: p50 {p50:6.2f} ms  p99 {p99:6.2f} ms per batch of {args.batch}  "
+                  f"recall@{args.k} {recall:.3f}  speedup x{per_batch * 1000 / p50:.1f}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--topics", type=int, default=2000)
+    parser.add_argument("--noise", type=float, default=1.3, help="spread of each topic (higher = harder)")
+    parser.add_argument("--nlist", type=int, default=None)
+    parser.add_argument("--queries", type=int, default=2048)
+    parser.add_argument("--batch", type=int, default=16, help="queries per search (phrases in one window)")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32, 64])
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
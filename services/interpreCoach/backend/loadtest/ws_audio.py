@@ -0,0 +1,156 @@
+"""
+Load harness for /ws/audio/{client_id}.
+
+Opens many simulated extension connections that stream PCM in real time
+and reports end-to-end latency: the time from sending the audio a message
+accounts for (its `audio_ms`) until that message arrives.
+
+    # against a running server (start it with TRANSCRIBER=fake)
+    python -m loadtest.ws_audio --url ws://127.0.0.1:8080 --connections 300
+
+    # spawn a local server first
+    python -m loadtest.ws_audio --spawn --workers 2 --connections 300
+"""
+
+import argparse
+import asyncio
+import bisect
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+from typing import List, Optional
+
+import msgpack
+import numpy as np
+import websockets
+
+
+def speech_like_pcm(seconds: float, sample_rate: int, seed: int) -> bytes:
+    """Deterministic 'speech': voiced bursts separated by short pauses."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    envelope = (np.sin(2 * np.pi * 0.4 * t + rng.uniform(0, np.pi)) > -0.6).astype(np.float32)
+    voice = np.sin(2 * np.pi * rng.uniform(110, 220) * t) + 0.1 * rng.standard_normal(len(t))
+    return (voice * envelope * 6000).astype("<i2").tobytes()
+
+
+class ClientResult:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.suggestion_latencies: List[float] = []
+        self.messages = 0
+        self.error: Optional[str] = None
+
+
+def decode(message) -> dict:
+    """Normalize full and delta replies to {"audio_ms", "suggestions"}."""
+    payload = msgpack.unpackb(message) if isinstance(message, bytes) else json.loads(message)
+    if "audio_ms" in payload:
+        return payload
+    return {"audio_ms": payload["a"], "suggestions": payload.get("s")}
+
+
+async def run_client(url: str, audio: bytes, sample_rate: int, chunk_ms: int, start_delay: float,
+                     subprotocol: Optional[str] = None) -> ClientResult:
+    result = ClientResult()
+    await asyncio.sleep(start_delay)
+    chunk_bytes = sample_rate * chunk_ms // 1000 * 2
+    sent_ms: List[int] = []  # audio position at the end of each chunk
+    sent_at: List[float] = []
+
+    try:
+        async with websockets.connect(
+            f"{url}/ws/audio/load-{uuid.uuid4().hex[:8]}",
+            max_queue=None,
+            subprotocols=[subprotocol] if subprotocol else None,
+        ) as ws:
+            async def receive():
+                async for message in ws:
+                    now = time.perf_counter()
+                    payload = decode(message)
+                    result.messages += 1
+                    index = bisect.bisect_left(sent_ms, payload["audio_ms"])
+                    if index < len(sent_at):
+                        latency = now - sent_at[index]
+                        result.latencies.append(latency)
+                        if payload.get("suggestions"):
+                            result.suggestion_latencies.append(latency)
+
+            receiver = asyncio.create_task(receive())
+            started = time.perf_counter()
+            for offset in range(0, len(audio), chunk_bytes):
+                # Real-time pacing, like a capture callback
+                target = started + offset / 2 / sample_rate
+                await asyncio.sleep(max(0.0, target - time.perf_counter()))
+                chunk = audio[offset:offset + chunk_bytes]
+                await ws.send(chunk)
+                sent_ms.append((offset + len(chunk)) // 2 * 1000 // sample_rate)
+                sent_at.append(time.perf_counter())
+            await ws.send(json.dumps({"type": "stop"}))
+            await asyncio.wait_for(receiver, timeout=30)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    return result
+
+
+def percentiles(values: List[float]) -> str:
+    if not values:
+        return "n/a"
+    ms = np.array(values) * 1000
+    p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+    return f"p50 {p50:7.1f} ms  p90 {p90:7.1f} ms  p99 {p99:7.1f} ms  max {ms.max():7.1f} ms  (n={len(ms)})"
+
+
+async def main(args) -> None:
+    audio = [speech_like_pcm(args.duration, args.sample_rate, seed) for seed in range(8)]
+    started = time.perf_counter()
+    results = await asyncio.gather(*(
+        run_client(args.url, audio[i % len(audio)], args.sample_rate, args.chunk_ms, i * args.ramp / args.connections,
+                   args.subprotocol)
+        for i in range(args.connections)
+    ))
+    elapsed = time.perf_counter() - started
+
+    errors = [r.error for r in results if r.error]
+    print(f"connections: {args.connections}  ok: {args.connections - len(errors)}  errors: {len(errors)}")
+    for error in sorted(set(errors))[:5]:
+        print(f"  {error}")
+    print(f"messages:    {sum(r.messages for r in results)} in {elapsed:.1f}s")
+    print(f"transcript:  {percentiles([l for r in results for l in r.latencies])}")
+    print(f"suggestions: {percentiles([l for r in results for l in r.suggestion_latencies])}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="ws://127.0.0.1:8080")
+    parser.add_argument("--connections", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of audio per connection")
+    parser.add_argument("--chunk-ms", type=int, default=100)
+    parser.add_argument("--sample-rate", type=int, default=16000)
+    parser.add_argument("--ramp", type=float, default=5.0, help="seconds over which connections open")
+    parser.add_argument("--subprotocol", help="e.g. interprecoach.delta.msgpack (default: full JSON)")
+    parser.add_argument("--spawn", action="store_true", help="start a local uvicorn with the fake transcriber")
+    parser.add_argument("--workers", type=int, default=1)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    server = None
+    if args.spawn:
+        port = args.url.rsplit(":", 1)[-1]
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", port, "--workers", str(args.workers),
+             "--log-level", "warning"],
+            env={**os.environ, "TRANSCRIBER": "fake"},
+        )
+        time.sleep(3)
+    try:
+        asyncio.run(main(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
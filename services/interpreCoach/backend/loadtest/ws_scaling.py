@@ -0,0 +1,183 @@
+"""
+Throughput vs. uvicorn worker count, and reconnect-resume across workers.
+
+For each worker count a local server is started with the fake recognizer
+burning FAKE_STT_CPU_MS of CPU per window and STREAM_OVERFLOW_POLICY=block
+(nothing is dropped, so throughput is real work done). Client processes
+then push audio as fast as backpressure allows. Throughput is reported
+as audio seconds recognized per wall-clock second.
+
+A fraction of the connections disconnect halfway and reconnect with the
+same client_id. They count as resumed when the server sends the resume
+notice. They count as duplicates when a term is suggested on both
+connections. Workers only share state through Redis: with the memory
+backend, a reconnect resumes only if it lands on the same worker.
+
+    python -m loadtest.ws_scaling --workers 1 2 4 --connections 64
+    python -m loadtest.ws_scaling --workers 1 2 4 --state-backend redis --redis-url redis://127.0.0.1:6379/0
+
+Needs at least as many free cores as the largest worker count plus the
+client processes for the scaling to be visible.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+import uuid
+from typing import List, Optional, Tuple
+
+import websockets
+
+from loadtest.ws_audio import decode, speech_like_pcm
+
+SAMPLE_RATE = 16000
+CHUNK_BYTES = SAMPLE_RATE // 10 * 2  # 100 ms
+
+
+async def stream(url: str, client_id: str, audio: bytes, stop: bool) -> Tuple[bool, List[str], Optional[str]]:
+    """(resumed, suggested term ids, error) for one connection."""
+    resumed = False
+    terms: List[str] = []
+    try:
+        async with websockets.connect(f"{url}/ws/audio/{client_id}", max_queue=None) as ws:
+            async def receive():
+                nonlocal resumed
+                async for message in ws:
+                    payload = decode(message)
+                    if payload.get("type") == "resumed":
+                        resumed = True
+                        continue
+                    terms.extend(item["id"] for item in payload.get("suggestions") or ())
+
+            receiver = asyncio.create_task(receive())
+            for offset in range(0, len(audio), CHUNK_BYTES):
+                await ws.send(audio[offset:offset + CHUNK_BYTES])
+            if stop:
+                await ws.send(json.dumps({"type": "stop"}))
+                await asyncio.wait_for(receiver, timeout=300)
+            else:
+                # Let the recognizer catch up, then drop the connection mid-stream
+                await asyncio.sleep(0.5)
+                receiver.cancel()
+    except Exception as e:
+        return resumed, terms, f"{type(e).__name__}: {e}"
+    return resumed, terms, None
+
+
+async def run_client(url: str, audio: bytes, reconnect: bool) -> dict:
+    client_id = f"scale-{uuid.uuid4().hex[:10]}"
+    if not reconnect:
+        _, terms, error = await stream(url, client_id, audio, stop=True)
+        return {"audio": len(audio), "resumes": 0, "resumed": 0, "duplicates": 0, "error": error}
+    half = len(audio) // 2 // CHUNK_BYTES * CHUNK_BYTES
+    _, first, error = await stream(url, client_id, audio[:half], stop=False)
+    resumed, second, error2 = await stream(url, client_id, audio[half:], stop=True)
+    return {
+        "audio": len(audio),
+        "resumes": 1,
+        "resumed": int(resumed),
+        "duplicates": len(set(first) & set(second)),
+        "error": error or error2,
+    }
+
+
+def client_process(url: str, connections: int, seconds: float, reconnect_every: int, seed: int) -> List[dict]:
+    audio = speech_like_pcm(seconds, SAMPLE_RATE, seed)
+
+    async def main():
+        return await asyncio.gather(*(
+            run_client(url, audio, reconnect_every > 0 and i % reconnect_every == 0)
+            for i in range(connections)
+        ))
+    return asyncio.run(main())
+
+
+def wait_ready(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+def measure(args, workers: int) -> dict:
+    env = {
+        **os.environ,
+        "TRANSCRIBER": "fake",
+        "FAKE_STT_CPU_MS": str(args.cpu_ms),
+        "STREAM_OVERFLOW_POLICY": "block",
+        "SESSION_STATE_BACKEND": args.state_backend,
+        "REDIS_URL": args.redis_url,
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--workers", str(workers),
+         "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        wait_ready(args.port)
+        time.sleep(1.0)  # all workers up, not just the first
+        url = f"ws://127.0.0.1:{args.port}"
+        per_process = max(1, args.connections // args.client_procs)
+        started = time.perf_counter()
+        with multiprocessing.Pool(args.client_procs) as pool:
+            batches = pool.starmap(client_process, [
+                (url, per_process, args.duration, args.reconnect_every, seed) for seed in range(args.client_procs)
+            ])
+        elapsed = time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait()
+
+    results = [result for batch in batches for result in batch]
+    audio_seconds = sum(result["audio"] for result in results) / 2 / SAMPLE_RATE
+    resumes = sum(result["resumes"] for result in results)
+    return {
+        "workers": workers,
+        "throughput": audio_seconds / elapsed,
+        "elapsed": elapsed,
+        "errors": sum(1 for result in results if result["error"]),
+        "resumed": sum(result["resumed"] for result in results) / resumes if resumes else None,
+        "duplicates": sum(result["duplicates"] for result in results),
+    }
+
+
+def main(args) -> None:
+    print(f"cores: {os.cpu_count()}  connections: {args.connections} x {args.duration:.0f} s audio  "
+          f"stt cpu: {args.cpu_ms} ms/window  state: {args.state_backend}")
+    baseline = None
+    for workers in args.workers:
+        result = measure(args, workers)
+        baseline = baseline or result["throughput"] / result["workers"]
+        resumed = "n/a" if result["resumed"] is None else f"{result['resumed']:.0%}"
+        print(f"workers {workers:2d}: {result['throughput']:7.1f} audio s/s  "
+              f"speedup x{result['throughput'] / baseline:4.2f}  "
+              f"efficiency {result['throughput'] / baseline / workers:4.0%}  "
+              f"resumed {resumed}  duplicate terms {result['duplicates']}  errors {result['errors']}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of audio per connection")
+    parser.add_argument("--cpu-ms", type=float, default=5.0, help="simulated recognizer CPU per window")
+    parser.add_argument("--client-procs", type=int, default=2)
+    parser.add_argument("--reconnect-every", type=int, default=4, help="every Nth connection reconnects (0: none)")
+    parser.add_argument("--state-backend", default="memory", choices=["memory", "redis"])
+    parser.add_argument("--redis-url", default="")
+    parser.add_argument("--port", type=int, default=8090)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
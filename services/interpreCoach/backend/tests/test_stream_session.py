@@ -0,0 +1,95 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services.stream_session import AudioStreamSession
+from app.services.terminology import DEFAULT_TERMS, TerminologyIndex
+from app.services.transcription import FakeTranscriber
+
+SAMPLE_RATE = 16000
+
+
+class Terminology:
+    def __init__(self):
+        self.index = TerminologyIndex()
+        self.index.load(DEFAULT_TERMS)
+
+
+def tone(seconds: float) -> bytes:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (np.sin(2 * np.pi * 180 * t) * 6000).astype("<i2").tobytes()
+
+
+def make_session(frames: list, **kwargs) -> AudioStreamSession:
+    async def send(frame):
+        frames.append(frame)
+
+    return AudioStreamSession(
+        "test-client", FakeTranscriber(), Terminology(), send,
+        sample_rate=SAMPLE_RATE, window_ms=500, hop_ms=250, ring_seconds=10.0, max_lag_ms=2000,
+        **kwargs,
+    )
+
+
+def test_block_policy_accepts_chunk_after_partial_window():
+    # 0.3 s is less than one window, so the consumer waits for data; a
+    # following 2 s chunk (> max_lag) must not wait for it in turn
+    async def scenario():
+        frames = []
+        session = make_session(frames, overflow_policy="block")
+        consumer = asyncio.create_task(session.run())
+        await asyncio.wait_for(session.write(tone(0.3)), timeout=1)
+        await asyncio.sleep(0.01)
+        await asyncio.wait_for(session.write(tone(2.0)), timeout=1)
+        session.close_input()
+        await asyncio.wait_for(consumer, timeout=5)
+        return session, frames
+
+    session, frames = asyncio.run(scenario())
+    assert session.stats()["received_ms"] == 2300
+    assert session.stats()["dropped_ms"] == 0
+    assert frames
+
+
+def test_block_policy_waits_for_consumer_when_behind():
+    async def scenario():
+        frames = []
+        session = make_session(frames, overflow_policy="block")
+        session.stt = FakeTranscriber(delay_seconds=0.01).open(SAMPLE_RATE)
+        consumer = asyncio.create_task(session.run())
+        for _ in range(40):
+            await asyncio.wait_for(session.write(tone(0.25)), timeout=5)
+            assert session.framer.lag <= session.max_lag + SAMPLE_RATE // 4
+        session.close_input()
+        await asyncio.wait_for(consumer, timeout=10)
+        return session
+
+    session = asyncio.run(scenario())
+    assert session.stats()["received_ms"] == 10000
+    assert session.stats()["dropped_ms"] == 0
+
+
+class FailingSession:
+    async def feed(self, window):
+        raise RuntimeError("recognizer went away")
+
+    async def finish(self):
+        return []
+
+    async def close(self):
+        pass
+
+
+def test_block_policy_writer_does_not_hang_when_consumer_dies():
+    async def scenario():
+        session = make_session([], overflow_policy="block")
+        session.stt = FailingSession()
+        consumer = asyncio.create_task(session.run())
+        for _ in range(40):
+            await asyncio.wait_for(session.write(tone(0.25)), timeout=1)
+        assert consumer.done()
+        with pytest.raises(RuntimeError):
+            await consumer
+
+    asyncio.run(scenario())
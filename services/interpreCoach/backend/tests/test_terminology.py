@@ -0,0 +1,27 @@
+import asyncio
+
+from app.services.terminology import StaticTerminologySource, Term, TerminologyService
+
+
+def term(term_id: str, text: str, updated_at: str) -> Term:
+    return Term(term_id, text, "en", f"{text} (es)", updated_at=updated_at)
+
+
+def test_reconcile_picks_up_rows_missed_by_the_delta_pull():
+    source = StaticTerminologySource([term("1", "hypertension", "2026-01-02")])
+    service = TerminologyService(source)
+
+    async def scenario():
+        service.index.load(await source.fetch_all())
+        # Written with an updated_at older than the cursor: invisible to fetch_since
+        source.terms = source.terms + [term("2", "myocarditis", "2026-01-01")]
+        await service.refresh()
+        before = set(service.index.terms)
+        source.terms = source.terms[1:]
+        await service.refresh(reconcile=True)
+        return before, set(service.index.terms)
+
+    before, after = asyncio.run(scenario())
+    assert before == {"1"}
+    assert after == {"2"}
+    assert [item["id"] for item in service.index.suggest("signs of myocarditis")] == ["2"]
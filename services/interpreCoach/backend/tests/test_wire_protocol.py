@@ -0,0 +1,27 @@
+import pytest
+
+from app.services import wire_protocol
+from app.services.wire_protocol import DeltaProtocol, FullProtocol, UnsupportedProtocolError, negotiate
+
+
+def test_negotiate_prefers_first_supported_subprotocol():
+    protocol, subprotocol = negotiate(["unknown", "interprecoach.delta.json", "interprecoach.full.json"], {})
+    assert isinstance(protocol, DeltaProtocol)
+    assert subprotocol == "interprecoach.delta.json"
+
+
+def test_negotiate_defaults_to_full_json():
+    protocol, subprotocol = negotiate([], {})
+    assert isinstance(protocol, FullProtocol)
+    assert subprotocol is None
+
+
+def test_negotiate_rejects_msgpack_when_unavailable(monkeypatch):
+    monkeypatch.setattr(wire_protocol, "msgpack", None)
+    with pytest.raises(UnsupportedProtocolError):
+        negotiate([], {"protocol": "delta", "encoding": "msgpack"})
+    with pytest.raises(UnsupportedProtocolError):
+        negotiate(["interprecoach.delta.msgpack"], {})
+    # A supported fallback in the offer still wins
+    protocol, subprotocol = negotiate(["interprecoach.delta.msgpack", "interprecoach.delta.json"], {})
+    assert subprotocol == "interprecoach.delta.json"
@@ -1,15 +1,29 @@
+import asyncio
+import json
+import uuid
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from app.config import settings
+from app.services.acoustics import acoustic_analyzer
 from app.services.ai_service import ai_service
+from app.services.assessment_writer import SpoolFullError, assessment_writer
+from app.services.concurrency import QueueFullError
 
 router = APIRouter(prefix="/analysis", tags=["analysis"])
 
 class TextAnalysisRequest(BaseModel):
     text: str
     context: str | None = None
+    # When set, the result is saved to `assessments` (write-behind)
+    user_id: uuid.UUID | None = None
+
+class BatchTextAnalysisRequest(BaseModel):
+    texts: list[str]
 
 class AnalysisResponse(BaseModel):
     results: dict
+    assessment_id: str | None = None
 
 @router.post("/text", response_model=AnalysisResponse)
 async def analyze_text(request: TextAnalysisRequest):
@@ -19,18 +33,115 @@ async def analyze_text(request: TextAnalysisRequest):
     if not request.text:
         raise HTTPException(status_code=400, detail="Text is required")
     
-    result = await ai_service.analyze_text(request.text)
+    try:
+        result = await ai_service.analyze_text(request.text)
+    except QueueFullError:
+        raise HTTPException(
+            status_code=503,
+            detail="Analysis service is busy. Please retry shortly.",
+            headers={"Retry-After": "1"},
+        )
     
     if "error" in result:
          # Log internal errors but maybe return 500 or 503 depending on cause?
          # For now letting it return as part of response for debugging
          pass
 
-    return AnalysisResponse(results=result)
+    assessment_id = None
+    if request.user_id and "analysis" in result:
+        try:
+            assessment_id = await assessment_writer.submit({
+                "user_id": str(request.user_id),
+                "type": "grammatical",
+                "score": result["analysis"]["overall_score"],
+                "feedback": result["analysis"],
+            })
+        except SpoolFullError:
+            raise HTTPException(
+                status_code=503,
+                detail="Too many assessments pending. Please retry shortly.",
+                headers={"Retry-After": "5"},
+            )
+
+    return AnalysisResponse(results=result, assessment_id=assessment_id)
+
+@router.post("/text/stream")
+async def analyze_text_stream(request: TextAnalysisRequest):
+    """
+    Analyze text and stream fields as Server-Sent Events while Gemini generates.
+
+    Emits `overall_score`, one `correction` per correction and `feedback` as
+    soon as each is parsed from the model output, then a final `result`
+    (same shape as POST /text) or `error` event.
+    """
+    if not request.text:
+        raise HTTPException(status_code=400, detail="Text is required")
+    if ai_service.executor.saturated:
+        raise HTTPException(
+            status_code=503,
+            detail="Analysis service is busy. Please retry shortly.",
+            headers={"Retry-After": "1"},
+        )
+
+    async def stream_events():
+        try:
+            async for event, data in ai_service.stream_analysis(request.text):
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        except QueueFullError:
+            yield f"event: error\ndata: {json.dumps({'error': 'Analysis service is busy'})}\n\n"
+
+    return StreamingResponse(stream_events(), media_type="text/event-stream")
+
+@router.post("/text/batch")
+async def analyze_text_batch(request: BatchTextAnalysisRequest):
+    """
+    Analyze many passages in one request.
+
+    Results are streamed back as NDJSON in completion order, one line per
+    passage: {"index": int, "results": {...}}. Short passages are packed into
+    shared prompts by the AI service's micro-batcher.
+    """
+    if not request.texts:
+        raise HTTPException(status_code=400, detail="At least one text is required")
+    if len(request.texts) > settings.ANALYSIS_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch limited to {settings.ANALYSIS_BATCH_MAX_ITEMS} texts",
+        )
+
+    async def stream_results():
+        semaphore = asyncio.Semaphore(settings.ANALYSIS_BATCH_CONCURRENCY)
+
+        async def run(index: int, text: str):
+            if not text:
+                return index, {"error": "Text is required"}
+            async with semaphore:
+                try:
+                    return index, await ai_service.analyze_text(text)
+                except QueueFullError:
+                    return index, {"error": "Analysis service is busy"}
+
+        tasks = [asyncio.create_task(run(i, text)) for i, text in enumerate(request.texts)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, result = await next_done
+                yield json.dumps({"index": index, "results": result}) + "\n"
+        finally:
+            # Client went away: stop outstanding work
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
 
 @router.get("/health")
 async def check_ai_health():
     return {
         "gemini": ai_service.gemini_configured,
-        "spacy": ai_service.nlp is not None
+        "spacy": ai_service.nlp is not None,
+        "executor": ai_service.executor.stats(),
+        "cache": ai_service.cache.stats(),
+        "batcher": ai_service.batcher.stats(),
+        "preanalysis": ai_service.preanalyzer.stats(),
+        "streaming": ai_service.stream_stats(),
+        "acoustics": acoustic_analyzer.stats(),
     }
@@ -0,0 +1,64 @@
+import uuid
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from app.config import settings
+from app.services.acoustics import FluencyTracker, acoustic_analyzer
+from app.services.ai_service import ai_service
+from app.services.assessment_writer import SpoolFullError, assessment_writer
+from app.services.audio import UnsupportedAudioError, iter_upload
+from app.services.audio_assessment import assess_audio_stream
+from app.services.concurrency import QueueFullError
+from app.services.transcription import TranscriberUnavailableError, get_transcriber
+
+router = APIRouter(prefix="/assess", tags=["assessment"])
+
+@router.post("/audio")
+async def assess_audio(
+    file: UploadFile = File(...),
+    user_id: uuid.UUID | None = Form(None),
+):
+    """
+    Assess an interpreting recording (wav/mp3).
+
+    The upload is decoded, transcribed and analyzed as a stream; see
+    `assess_audio_stream`.
+    """
+    try:
+        transcriber = get_transcriber()
+    except TranscriberUnavailableError as e:
+        raise HTTPException(status_code=503, detail=f"Transcription is unavailable: {e}")
+
+    try:
+        result = await assess_audio_stream(
+            iter_upload(file, settings.AUDIO_UPLOAD_CHUNK_BYTES),
+            transcriber,
+            ai_service.analyze_text,
+            sample_rate=settings.AUDIO_SAMPLE_RATE,
+            frame_seconds=settings.AUDIO_FRAME_SECONDS,
+            passage_min_words=settings.ASSESS_PASSAGE_MIN_WORDS,
+            fluency=FluencyTracker(acoustic_analyzer, settings.AUDIO_SAMPLE_RATE),
+        )
+    except UnsupportedAudioError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except QueueFullError:
+        raise HTTPException(
+            status_code=503,
+            detail="Assessment service is busy. Please retry shortly.",
+            headers={"Retry-After": "5"},
+        )
+
+    if user_id and result["score"] is not None:
+        try:
+            result["assessment_id"] = await assessment_writer.submit({
+                "user_id": str(user_id),
+                "type": "linguistic",
+                "score": result["score"],
+                "feedback": result,
+            })
+        except SpoolFullError:
+            raise HTTPException(
+                status_code=503,
+                detail="Too many assessments pending. Please retry shortly.",
+                headers={"Retry-After": "5"},
+            )
+
+    return result
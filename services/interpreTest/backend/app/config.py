@@ -5,6 +5,32 @@ class Settings(BaseSettings):
     SUPABASE_URL: str
     SUPABASE_SERVICE_ROLE_KEY: str
     
+    # Direct Postgres connection (Supabase pooler) for bulk writes; optional
+    DATABASE_URL: str | None = None
+    DB_POOL_MIN_SIZE: int = 1
+    DB_POOL_MAX_SIZE: int = 10
+
+    # Audio assessment pipeline
+    AUDIO_UPLOAD_CHUNK_BYTES: int = 64 * 1024
+    AUDIO_SAMPLE_RATE: int = 16000
+    AUDIO_FRAME_SECONDS: float = 1.0
+    TRANSCRIBER: str = "gemini"  # "gemini" or "fake" (deterministic, offline)
+    TRANSCRIBE_WINDOW_SECONDS: float = 30.0
+    ASSESS_PASSAGE_MIN_WORDS: int = 120
+    ACOUSTIC_WORKERS: int = 2
+
+    # Write-behind buffer for assessments
+    ASSESSMENT_SPOOL_PATH: str = "/tmp/interpretest/assessments.spool"
+    ASSESSMENT_DEAD_LETTER_PATH: str = "/tmp/interpretest/assessments.dead"
+    ASSESSMENT_FLUSH_BATCH_SIZE: int = 100
+    ASSESSMENT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    ASSESSMENT_MAX_PENDING: int = 10000
+
+    # Supabase HTTP connection pool
+    SUPABASE_HTTP_MAX_CONNECTIONS: int = 20
+    SUPABASE_HTTP_MAX_KEEPALIVE: int = 10
+    SUPABASE_HTTP_TIMEOUT_SECONDS: float = 10.0
+    
     # AI Keys
     GEMINI_API_KEY: str
     
@@ -12,6 +38,32 @@ class Settings(BaseSettings):
     ENVIRONMENT: str = "development"
     APP_NAME: str = "InterpreTest Backend"
 
+    # AI execution limits (per process)
+    AI_MAX_CONCURRENCY: int = 8
+    AI_MAX_QUEUE: int = 32
+
+    # Analysis result cache
+    ANALYSIS_CACHE_MAX_ENTRIES: int = 1024
+    ANALYSIS_CACHE_TTL_SECONDS: int = 86400
+    REDIS_URL: str | None = None
+
+    # Batching: short passages are packed into one prompt
+    ANALYSIS_BATCH_WINDOW_MS: float = 10.0
+    ANALYSIS_PACK_MAX_ITEMS: int = 8
+    ANALYSIS_PACK_MAX_TOKENS: int = 3000
+    ANALYSIS_PACK_TEXT_MAX_TOKENS: int = 600
+    ANALYSIS_BATCH_MAX_ITEMS: int = 1000
+    ANALYSIS_BATCH_CONCURRENCY: int = 32
+
+    # NLP pipeline (loaded in the background at startup)
+    SPACY_MODEL: str = "en_core_web_sm"
+    SPACY_EXCLUDE: list[str] = ["ner"]
+    SPACY_AUTO_DOWNLOAD: bool = False
+
+    # Local pre-analysis: passages longer than this only send flagged spans to Gemini
+    PREANALYSIS_MIN_TOKENS: int = 600
+    PREANALYSIS_BATCH_SIZE: int = 32
+
     class Config:
         env_file = ".env"
         case_sensitive = True
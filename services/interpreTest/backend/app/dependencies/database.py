@@ -0,0 +1,218 @@
+import json
+import logging
+from typing import Optional, Protocol
+
+from postgrest.exceptions import APIError
+from postgrest.types import ReturnMethod
+from supabase import AsyncClient
+from app.config import settings
+from app.dependencies.supabase import create_http_client, create_supabase_client
+
+try:
+    import asyncpg
+    ASYNCPG_AVAILABLE = True
+except ImportError:
+    ASYNCPG_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class PermanentWriteError(Exception):
+    """The store rejected a batch for a reason retrying won't fix (bad data, missing user)."""
+
+
+class AssessmentStore(Protocol):
+    durable: bool  # rows survive a restart once insert_assessments returns
+
+    async def insert_assessments(self, rows: list[dict]) -> int: ...
+    def stats(self) -> dict: ...
+
+
+class PostgresAssessmentStore:
+    """
+    Bulk writes to the `assessments` table over an asyncpg pool.
+
+    Rows are sent as column arrays and expanded with unnest(), so N rows
+    cost one statement and one round trip. Rows carry their own id, making
+    retried batches idempotent.
+    """
+
+    durable = True
+
+    INSERT_SQL = """
+        INSERT INTO assessments (id, user_id, type, score, feedback)
+        SELECT * FROM unnest($1::uuid[], $2::uuid[], $3::text[], $4::numeric[], $5::text[]::jsonb[])
+        ON CONFLICT (id) DO NOTHING
+    """
+
+    def __init__(self, pool: "asyncpg.Pool"):
+        self.pool = pool
+        self.waiting = 0
+        self.rows_written = 0
+
+    async def insert_assessments(self, rows: list[dict]) -> int:
+        if not rows:
+            return 0
+        self.waiting += 1
+        try:
+            connection = await self.pool.acquire()
+        finally:
+            self.waiting -= 1
+        try:
+            await connection.execute(
+                self.INSERT_SQL,
+                [row["id"] for row in rows],
+                [row["user_id"] for row in rows],
+                [row["type"] for row in rows],
+                [row.get("score") for row in rows],
+                [json.dumps(row.get("feedback")) for row in rows],
+            )
+        except (asyncpg.DataError, asyncpg.IntegrityConstraintViolationError) as e:
+            raise PermanentWriteError(str(e)) from e
+        finally:
+            await self.pool.release(connection)
+        self.rows_written += len(rows)
+        return len(rows)
+
+    def stats(self) -> dict:
+        size = self.pool.get_size()
+        idle = self.pool.get_idle_size()
+        max_size = self.pool.get_max_size()
+        return {
+            "backend": "postgres",
+            "pool_size": size,
+            "pool_max_size": max_size,
+            "in_use": size - idle,
+            "idle": idle,
+            "waiting": self.waiting,
+            "saturation": round((size - idle) / max_size, 2) if max_size else None,
+            "rows_written": self.rows_written,
+        }
+
+
+class SupabaseAssessmentStore:
+    """
+    Inserts into `assessments` through the Supabase REST API.
+
+    Used when DATABASE_URL is not set: one upsert request per batch,
+    ignoring ids that already exist so retried batches stay idempotent.
+    Slower than the asyncpg path, but just as durable.
+    """
+
+    durable = True
+
+    def __init__(self, client: AsyncClient):
+        self.client = client
+        self.rows_written = 0
+
+    async def insert_assessments(self, rows: list[dict]) -> int:
+        if not rows:
+            return 0
+        try:
+            await self.client.table("assessments").upsert(
+                rows, on_conflict="id", ignore_duplicates=True, returning=ReturnMethod.minimal,
+            ).execute()
+        except APIError as e:
+            # SQLSTATE class 22 (data exception) / 23 (integrity violation)
+            if e.code and e.code[:2] in ("22", "23"):
+                raise PermanentWriteError(str(e)) from e
+            raise
+        self.rows_written += len(rows)
+        return len(rows)
+
+    def stats(self) -> dict:
+        return {"backend": "supabase", "rows_written": self.rows_written}
+
+
+class InMemoryAssessmentStore:
+    """Drop-in fake for tests; rows are lost on restart, so the writer won't use it."""
+
+    durable = False
+
+    def __init__(self):
+        self.rows: list[dict] = []
+
+    async def insert_assessments(self, rows: list[dict]) -> int:
+        self.rows.extend(rows)
+        return len(rows)
+
+    def stats(self) -> dict:
+        return {"backend": "memory", "rows_written": len(self.rows)}
+
+
+class Database:
+    """
+    Async data-access layer, opened and closed by the FastAPI lifespan.
+
+    Holds the pooled Supabase client (HTTP/2) for regular REST access and an
+    assessment store for bulk inserts: asyncpg when DATABASE_URL is set,
+    otherwise the Supabase REST API. If neither is available the store is
+    an in-memory fake, which the assessment writer refuses to start with.
+    """
+
+    def __init__(self):
+        self.http_client = None
+        self.supabase: Optional[AsyncClient] = None
+        self.pool = None
+        self.assessments: AssessmentStore = InMemoryAssessmentStore()
+
+    async def connect(self) -> None:
+        if settings.SUPABASE_URL and settings.SUPABASE_SERVICE_ROLE_KEY:
+            self.http_client = create_http_client()
+            try:
+                self.supabase = await create_supabase_client(self.http_client)
+            except Exception as e:
+                logger.error(f"Failed to initialize Supabase client: {e}")
+
+        if settings.DATABASE_URL and ASYNCPG_AVAILABLE:
+            try:
+                self.pool = await asyncpg.create_pool(
+                    settings.DATABASE_URL,
+                    min_size=settings.DB_POOL_MIN_SIZE,
+                    max_size=settings.DB_POOL_MAX_SIZE,
+                    # Supabase's pooler (pgbouncer, transaction mode) can't use prepared statements
+                    statement_cache_size=0,
+                )
+                self.assessments = PostgresAssessmentStore(self.pool)
+                logger.info("Assessment store connected to Postgres.")
+                return
+            except Exception as e:
+                logger.error(f"Failed to connect to Postgres: {e}")
+        elif settings.DATABASE_URL:
+            logger.warning("DATABASE_URL is set but asyncpg is not installed.")
+
+        if self.supabase is not None:
+            self.assessments = SupabaseAssessmentStore(self.supabase)
+            logger.info("Assessment store using the Supabase REST API.")
+        else:
+            logger.error("No Postgres or Supabase connection; assessments cannot be stored.")
+
+    async def close(self) -> None:
+        if self.pool is not None:
+            await self.pool.close()
+        if self.http_client is not None:
+            await self.http_client.aclose()
+
+    def stats(self) -> dict:
+        return {
+            "supabase": self.supabase is not None,
+            "http_pool": {
+                "http2": True,
+                "max_connections": settings.SUPABASE_HTTP_MAX_CONNECTIONS,
+                "max_keepalive": settings.SUPABASE_HTTP_MAX_KEEPALIVE,
+            },
+            "assessments": self.assessments.stats(),
+        }
+
+
+db = Database()
+
+def get_supabase() -> AsyncClient:
+    """FastAPI dependency for routes that need the Supabase client."""
+    if db.supabase is None:
+        raise RuntimeError("Supabase client is not initialized")
+    return db.supabase
+
+def get_assessment_store() -> AssessmentStore:
+    """FastAPI dependency for routes that persist assessments."""
+    return db.assessments
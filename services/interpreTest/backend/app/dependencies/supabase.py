@@ -1,12 +1,28 @@
-from supabase import create_client, Client
+import httpx
+from supabase import AsyncClient, AsyncClientOptions, acreate_client
 from app.config import settings
 
-def get_supabase_client() -> Client:
+def create_http_client() -> httpx.AsyncClient:
     """
-    Creates and returns a Supabase client instance.
-    Uses SERVICE_ROLE_KEY for backend operations - be careful with RLS!
+    Shared HTTP/2 connection pool for Supabase REST/Storage calls.
+    Sized via SUPABASE_HTTP_MAX_CONNECTIONS / SUPABASE_HTTP_MAX_KEEPALIVE.
     """
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=settings.SUPABASE_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.SUPABASE_HTTP_MAX_KEEPALIVE,
+        ),
+        timeout=httpx.Timeout(settings.SUPABASE_HTTP_TIMEOUT_SECONDS),
+    )
 
-# Singleton instance for simple imports if needed
-supabase: Client = get_supabase_client()
+async def create_supabase_client(http_client: httpx.AsyncClient) -> AsyncClient:
+    """
+    Creates an async Supabase client on top of the shared HTTP pool.
+    Uses SERVICE_ROLE_KEY for backend operations - be careful with RLS!
+    """
+    return await acreate_client(
+        settings.SUPABASE_URL,
+        settings.SUPABASE_SERVICE_ROLE_KEY,
+        options=AsyncClientOptions(httpx_client=http_client),
+    )
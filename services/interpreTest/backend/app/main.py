@@ -1,7 +1,12 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 import logging
+import time
+
+# Measured from here so the readiness payload can report import/startup cost
+_import_started = time.perf_counter()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -12,6 +17,17 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting interpreTest backend...")
+    from app.services.ai_service import ai_service
+    from app.dependencies.database import db
+    from app.services.assessment_writer import assessment_writer
+    from app.services.acoustics import acoustic_analyzer
+    await db.connect()
+    await assessment_writer.start()
+    # Models load in worker threads; the app serves /health immediately and
+    # reports /ready once they are done.
+    ai_service.start_background_loading()
+    acoustic_analyzer.start()
+    app.state.startup_seconds = round(time.perf_counter() - _import_started, 3)
     
     # =========================================================================
     # TODO: AGENT IMPLEMENTATION GUIDE - CORE ASSESSMENT LOGIC
@@ -48,6 +64,11 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     logger.info("Shutting down interpreTest backend...")
+    await ai_service.shutdown()
+    acoustic_analyzer.shutdown()
+    # Flush buffered assessments before the DB pool goes away
+    await assessment_writer.close()
+    await db.close()
 
 # Create FastAPI app
 app = FastAPI(
@@ -81,11 +102,30 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint for Cloud Run"""
+    """Health check endpoint for Cloud Run (liveness)"""
     return {
         "status": "healthy",
         "service": "interpretest-backend"
     }
 
-from app.api import analysis
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint: 503 until background model loading has finished"""
+    from app.services.ai_service import ai_service
+    from app.dependencies.database import db
+    from app.services.assessment_writer import assessment_writer
+    payload = {
+        "status": "ready" if ai_service.ready else "loading",
+        "service": "interpretest-backend",
+        "startup": {
+            "app_startup_seconds": getattr(app.state, "startup_seconds", None),
+            **ai_service.startup_stats(),
+        },
+        "database": db.stats(),
+        "assessment_writer": assessment_writer.stats(),
+    }
+    return JSONResponse(payload, status_code=200 if ai_service.ready else 503)
+
+from app.api import analysis, assess
 app.include_router(analysis.router, prefix="/api/v1")
+app.include_router(assess.router, prefix="/api/v1")
@@ -0,0 +1,14 @@
+from pydantic import BaseModel, Field
+
+
+class Correction(BaseModel):
+    original: str
+    correction: str
+    explanation: str
+
+
+class TextAnalysis(BaseModel):
+    """Structured result of a grammar/linguistic analysis."""
+    overall_score: int = Field(ge=0, le=100)
+    corrections: list[Correction] = []
+    feedback: str = ""
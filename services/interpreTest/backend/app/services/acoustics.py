@@ -0,0 +1,212 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+HOP_SECONDS = 0.01
+MIN_PAUSE_SECONDS = 0.25
+MAX_FILLER_SECONDS = 0.3
+
+
+# --- Feature extraction (fluency_metrics runs in the process pool; must stay module-level) ---
+
+def frame_rms(samples: np.ndarray, sample_rate: int, hop_seconds: float = HOP_SECONDS) -> tuple[np.ndarray, float]:
+    """RMS energy per `hop_seconds` window, plus the CPU time spent."""
+    started = time.process_time()
+    hop = int(sample_rate * hop_seconds)
+    usable = len(samples) - len(samples) % hop
+    windows = samples[:usable].reshape(-1, hop).astype(np.float64)
+    rms = np.sqrt(np.mean(windows * windows, axis=1)).astype(np.float32)
+    return rms, time.process_time() - started
+
+
+def _runs(mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Start/end indices of consecutive True runs in a boolean mask."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def fluency_metrics(rms: np.ndarray, word_count: int, hop_seconds: float = HOP_SECONDS) -> tuple[dict, float]:
+    """Fluency metrics (see _fluency_metrics), plus the CPU time the worker spent."""
+    started = time.process_time()
+    metrics = _fluency_metrics(rms, word_count, hop_seconds)
+    return metrics, time.process_time() - started
+
+
+def _fluency_metrics(rms: np.ndarray, word_count: int, hop_seconds: float) -> dict:
+    """
+    Objective fluency metrics from a per-window RMS envelope.
+
+    Speech/silence is split with an adaptive threshold between the noise
+    floor and the loud end of the recording. Pauses are silent runs of at
+    least MIN_PAUSE_SECONDS; fillers are short voiced bursts isolated between
+    pauses (typically "uh"/"um" hesitations).
+    """
+    duration = len(rms) * hop_seconds
+    if not len(rms) or duration == 0:
+        return {"duration_seconds": 0.0}
+
+    noise_floor, loud = np.percentile(rms, [10, 95])
+    threshold = max(noise_floor + 0.25 * (loud - noise_floor), 1e-4)
+    voiced = rms >= threshold
+
+    silent_starts, silent_ends = _runs(~voiced)
+    silent_lengths = (silent_ends - silent_starts) * hop_seconds
+    is_pause = silent_lengths >= MIN_PAUSE_SECONDS
+    # Leading/trailing silence is lag / tail, not a pause
+    is_pause &= (silent_starts > 0) & (silent_ends < len(rms))
+    pauses = silent_lengths[is_pause]
+
+    voiced_starts, voiced_ends = _runs(voiced)
+    voiced_lengths = (voiced_ends - voiced_starts) * hop_seconds
+    isolated = np.isin(voiced_starts, silent_ends[is_pause]) & np.isin(voiced_ends, silent_starts[is_pause])
+    fillers = voiced_lengths[isolated & (voiced_lengths <= MAX_FILLER_SECONDS)]
+
+    speaking_seconds = float(voiced.sum()) * hop_seconds
+    voiced_rms = rms[voiced]
+    # Syllable-nucleus proxy: envelope peaks that dominate a ±50 ms neighbourhood
+    smooth = np.convolve(rms, np.ones(5) / 5, mode="same")
+    neighbourhood = sliding_window_view(np.pad(smooth, 5, mode="edge"), 11).max(axis=1)
+    rising = np.concatenate(([False], smooth[1:] > smooth[:-1]))
+    peaks = (smooth >= neighbourhood) & rising & voiced
+
+    total_pause = float(pauses.sum())
+    return {
+        "duration_seconds": round(duration, 2),
+        "speaking_seconds": round(speaking_seconds, 2),
+        "lag_seconds": round(float(np.argmax(voiced)) * hop_seconds, 2) if voiced.any() else None,
+        "speech_rate_wpm": round(word_count / duration * 60, 1),
+        "articulation_rate_wpm": round(word_count / speaking_seconds * 60, 1) if speaking_seconds else None,
+        "syllable_rate_per_second": round(float(peaks.sum()) / speaking_seconds, 2) if speaking_seconds else None,
+        "pauses": {
+            "count": int(len(pauses)),
+            "per_minute": round(len(pauses) / duration * 60, 1),
+            "total_seconds": round(total_pause, 2),
+            "mean_seconds": round(float(pauses.mean()), 2) if len(pauses) else 0.0,
+            "p90_seconds": round(float(np.percentile(pauses, 90)), 2) if len(pauses) else 0.0,
+            "max_seconds": round(float(pauses.max()), 2) if len(pauses) else 0.0,
+            "histogram": dict(zip(
+                ["0.25-0.5", "0.5-1", "1-2", "2+"],
+                np.histogram(pauses, bins=[MIN_PAUSE_SECONDS, 0.5, 1, 2, np.inf])[0].tolist(),
+            )),
+        },
+        "fillers": int(len(fillers)),
+        "filler_silence_ratio": round(float(fillers.sum()) / total_pause, 3) if total_pause else 0.0,
+        "energy": {
+            "mean_rms": round(float(voiced_rms.mean()), 4) if len(voiced_rms) else 0.0,
+            "std_rms": round(float(voiced_rms.std()), 4) if len(voiced_rms) else 0.0,
+            "dynamic_range_db": round(float(20 * np.log10(loud / max(noise_floor, 1e-6))), 1),
+        },
+    }
+
+
+# --- Async front end ---
+
+class AcousticAnalyzer:
+    """
+    Acoustic feature extraction for the assessment pipeline.
+
+    The RMS envelope is computed in-process with numpy as audio arrives
+    (a 10 s block takes well under a millisecond), so raw samples are
+    never pickled. Only the compact envelope goes to the process pool for
+    fluency_metrics. The pool uses forkserver (spawn where unavailable):
+    forking the multithreaded API process could copy held locks into the
+    children.
+    """
+
+    def __init__(self, workers: int = 2):
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+        # Metrics (CPU time of both stages, wherever they ran)
+        self.audio_seconds = 0.0
+        self.rms_cpu_seconds = 0.0
+        self.metrics_cpu_seconds = 0.0
+
+    @property
+    def cpu_seconds(self) -> float:
+        return self.rms_cpu_seconds + self.metrics_cpu_seconds
+
+    def start(self) -> None:
+        if self._pool is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context(method),
+            )
+
+    def rms(self, samples: np.ndarray, sample_rate: int) -> np.ndarray:
+        rms, cpu = frame_rms(samples, sample_rate)
+        self.audio_seconds += len(samples) / sample_rate
+        self.rms_cpu_seconds += cpu
+        return rms
+
+    async def metrics(self, rms: np.ndarray, word_count: int) -> dict:
+        self.start()
+        loop = asyncio.get_running_loop()
+        metrics, cpu = await loop.run_in_executor(self._pool, fluency_metrics, rms, word_count)
+        self.metrics_cpu_seconds += cpu
+        return metrics
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "audio_seconds": round(self.audio_seconds, 1),
+            "cpu_seconds": round(self.cpu_seconds, 3),
+            "rms_cpu_seconds": round(self.rms_cpu_seconds, 3),
+            "metrics_cpu_seconds": round(self.metrics_cpu_seconds, 3),
+            "audio_seconds_per_cpu_second": round(self.audio_seconds / self.cpu_seconds, 1) if self.cpu_seconds else None,
+        }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+class FluencyTracker:
+    """
+    Per-recording accumulator: collects decoded frames into fixed blocks,
+    reduces each block to its RMS envelope as soon as it fills, and keeps
+    only that envelope (100 floats per second of audio).
+    """
+
+    def __init__(self, analyzer: AcousticAnalyzer, sample_rate: int, block_seconds: float = 10.0):
+        self.analyzer = analyzer
+        self.sample_rate = sample_rate
+        self._block = np.empty(int(sample_rate * block_seconds), dtype=np.float32)
+        self._fill = 0
+        self._envelopes: list[np.ndarray] = []
+
+    def push(self, frame: np.ndarray) -> None:
+        offset = 0
+        while offset < len(frame):
+            take = min(len(self._block) - self._fill, len(frame) - offset)
+            self._block[self._fill:self._fill + take] = frame[offset:offset + take]
+            self._fill += take
+            offset += take
+            if self._fill == len(self._block):
+                self._envelopes.append(self.analyzer.rms(self._block, self.sample_rate))
+                self._fill = 0
+
+    async def finish(self, word_count: int) -> dict:
+        if self._fill:
+            self._envelopes.append(self.analyzer.rms(self._block[:self._fill], self.sample_rate))
+            self._fill = 0
+        rms = np.concatenate(self._envelopes) if self._envelopes else np.empty(0, dtype=np.float32)
+        return await self.analyzer.metrics(rms, word_count)
+
+    def cancel(self) -> None:
+        self._envelopes = []
+        self._fill = 0
+
+
+acoustic_analyzer = AcousticAnalyzer(workers=settings.ACOUSTIC_WORKERS)
@@ -1,25 +1,64 @@
 import google.generativeai as genai
 from app.config import settings
+from app.services.batching import MicroBatcher, estimate_tokens
+from app.services.cache import AnalysisCache, make_cache_key
+from app.services.concurrency import BoundedExecutor, QueueFullError
+from app.services.models import ModelRegistry
+from app.services.json_stream import AnalysisStreamParser
+from app.services.preanalysis import PreAnalyzer, local_analysis
+from app.schemas import TextAnalysis
+from typing import AsyncIterator
+import asyncio
+import importlib.util
+import json
 import logging
+import threading
+import time
 
-try:
-    import spacy
-    SPACY_AVAILABLE = True
-except ImportError:
-    SPACY_AVAILABLE = False
+SPACY_AVAILABLE = importlib.util.find_spec("spacy") is not None
 
 logger = logging.getLogger(__name__)
 
+GEMINI_MODEL_NAME = "gemini-1.5-pro"
+# Bump whenever the analysis prompt changes so stale cached results are not served
+PROMPT_VERSION = "grammar-v3"
+
+_STREAM_END = object()
+
 class AIService:
     def __init__(self):
+        started = time.perf_counter()
         self.gemini_configured = False
-        self.nlp = None
+
+        # Gemini's SDK call is blocking; run it on a bounded pool off the event loop
+        self.executor = BoundedExecutor(
+            "gemini",
+            max_concurrency=settings.AI_MAX_CONCURRENCY,
+            max_queue=settings.AI_MAX_QUEUE,
+        )
+
+        self.cache = AnalysisCache(
+            max_entries=settings.ANALYSIS_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.ANALYSIS_CACHE_TTL_SECONDS,
+            redis_url=settings.REDIS_URL,
+        )
+
+        # Short passages arriving together are packed into a single prompt
+        self.batcher = MicroBatcher(
+            self._analyze_packed,
+            window_ms=settings.ANALYSIS_BATCH_WINDOW_MS,
+            max_items=settings.ANALYSIS_PACK_MAX_ITEMS,
+            max_tokens=settings.ANALYSIS_PACK_MAX_TOKENS,
+        )
         
         # Initialize Gemini
         if settings.GEMINI_API_KEY:
             try:
                 genai.configure(api_key=settings.GEMINI_API_KEY)
-                self.model = genai.GenerativeModel('gemini-1.5-pro')
+                self.model = genai.GenerativeModel(
+                    GEMINI_MODEL_NAME,
+                    generation_config=genai.GenerationConfig(response_mime_type="application/json"),
+                )
                 self.gemini_configured = True
                 logger.info("Gemini 1.5 Pro initialized successfully.")
             except Exception as e:
@@ -27,51 +66,316 @@ class AIService:
         else:
             logger.warning("GEMINI_API_KEY not found. AI features will be disabled.")
 
-        # Initialize SpaCy
+        # SpaCy is loaded in the background from the app lifespan (see start_background_loading)
+        self.models = ModelRegistry()
         if SPACY_AVAILABLE:
-            try:
-                # simple load for now, can be upgraded to 'en_core_web_trf' for accuracy
-                self.nlp = spacy.load("en_core_web_sm") 
-                logger.info("SpaCy (en_core_web_sm) initialized successfully.")
-            except OSError:
-                logger.warning("SpaCy model not found. Downloading...")
-                try:
-                    from spacy.cli import download
-                    download("en_core_web_sm")
-                    self.nlp = spacy.load("en_core_web_sm")
-                except Exception as e:
-                     logger.warning(f"Failed to download/load SpaCy: {e}")
-                     self.nlp = None
+            self.models.register("spacy", self._load_spacy)
         else:
             logger.warning("SpaCy library not found (likely Python 3.13 incompatibility). NLP features disabled.")
 
+        # Local spaCy pre-pass, batched across requests with nlp.pipe
+        self.preanalyzer = PreAnalyzer(
+            lambda: self.nlp,
+            window_ms=settings.ANALYSIS_BATCH_WINDOW_MS,
+            batch_size=settings.PREANALYSIS_BATCH_SIZE,
+        )
+
+        self.init_seconds = round(time.perf_counter() - started, 3)
+        self.first_request_seconds = None
+
+        # Streaming metrics (time to first useful byte = first score/correction)
+        self.streams = 0
+        self.ttfub_total_ms = 0.0
+        self.last_ttfub_ms = None
+
+    @property
+    def nlp(self):
+        """The spaCy pipeline, or None while it is still loading (or unavailable)."""
+        return self.models.get("spacy")
+
+    @staticmethod
+    def _load_spacy():
+        # Imported here: importing spacy alone costs seconds of cold start
+        import spacy
+
+        model_name = settings.SPACY_MODEL
+        try:
+            # Only keep the components the analysis uses (tagger/parser/lemmatizer)
+            nlp = spacy.load(model_name, exclude=settings.SPACY_EXCLUDE)
+        except OSError:
+            if not settings.SPACY_AUTO_DOWNLOAD:
+                logger.warning(f"SpaCy model '{model_name}' not installed. NLP features disabled.")
+                return None
+            logger.warning(f"SpaCy model '{model_name}' not found. Downloading...")
+            from spacy.cli import download
+            download(model_name)
+            nlp = spacy.load(model_name, exclude=settings.SPACY_EXCLUDE)
+        logger.info(f"SpaCy ({model_name}) initialized with components: {nlp.pipe_names}")
+        return nlp
+
+    def start_background_loading(self) -> None:
+        self.models.start()
+
+    @property
+    def ready(self) -> bool:
+        return self.models.ready
+
+    def startup_stats(self) -> dict:
+        return {
+            "init_seconds": self.init_seconds,
+            "first_request_seconds": self.first_request_seconds,
+            "models": self.models.status(),
+        }
+
     async def analyze_text(self, text: str) -> dict:
         if not self.gemini_configured:
+            if self.preanalyzer.available:
+                return self._degraded(await self.preanalyzer.analyze(text))
             return {"error": "AI service not configured"}
 
+        started = time.perf_counter()
+        key = make_cache_key(text, PROMPT_VERSION, GEMINI_MODEL_NAME)
+        if estimate_tokens(text) <= settings.ANALYSIS_PACK_TEXT_MAX_TOKENS:
+            compute = lambda: self.batcher.submit(text)
+        else:
+            compute = lambda: self._analyze_uncached(text)
+        result = await self.cache.get_or_compute(
+            key,
+            compute,
+            cacheable=lambda result: "error" not in result and not result.get("degraded"),
+        )
+        if self.first_request_seconds is None:
+            self.first_request_seconds = round(time.perf_counter() - started, 3)
+        return result
+
+    async def _build_prompt(self, text: str) -> tuple[str, dict | None]:
+        # Long passages get a local pre-pass so only flagged spans go to Gemini
+        pre = None
+        if self.preanalyzer.available and estimate_tokens(text) > settings.PREANALYSIS_MIN_TOKENS:
+            pre = await self.preanalyzer.analyze(text)
+
+        if pre is not None:
+            return self._condensed_prompt(pre), pre
+        return self._full_prompt(text), None
+
+    async def _analyze_uncached(self, text: str) -> dict:
+        prompt, pre = await self._build_prompt(text)
+        
+        try:
+            response = await self.executor.run(self.model.generate_content, prompt)
+            if response.text:
+                return self._parse_response(response.text)
+            else:
+                return await self._fallback(text, pre, "Empty response from Gemini")
+        except QueueFullError:
+            # Let the API layer turn this into a 503
+            raise
+        except Exception as e:
+            logger.error(f"Error during analysis: {e}")
+            return await self._fallback(text, pre, str(e))
+
+    async def _fallback(self, text: str, pre: dict | None, error: str) -> dict:
+        """
+        Degraded local analysis for when Gemini fails.
+
+        Short passages (and packed ones) skip the pre-pass on the happy path,
+        so it is run here on demand; an error is returned only when spaCy is
+        unavailable too.
+        """
+        if pre is None and self.preanalyzer.available:
+            try:
+                pre = await self.preanalyzer.analyze(text)
+            except Exception as e:
+                logger.error(f"Local pre-analysis fallback failed: {e}")
+        if pre is not None:
+            return self._degraded(pre)
+        return {"error": error}
+
+    @staticmethod
+    def _parse_response(text: str) -> dict:
+        # Simple cleanup in case the model wraps the JSON in markdown
+        text_response = text.replace('```json', '').replace('```', '').strip()
+        try:
+            analysis = TextAnalysis.model_validate_json(text_response)
+        except ValueError as e:
+            logger.warning(f"Unparseable analysis from Gemini: {e}")
+            return {"error": "Unparseable response from Gemini", "raw_analysis": text_response}
+        return {"analysis": analysis.model_dump()}
+
+    @staticmethod
+    def _degraded(pre: dict) -> dict:
+        return {"analysis": local_analysis(pre), "degraded": True}
+
+    async def stream_analysis(self, text: str) -> AsyncIterator[tuple[str, object]]:
+        """
+        Analyze `text`, yielding (event, data) pairs as soon as fields are available.
+
+        Events are "overall_score", "correction" (one per correction) and
+        "feedback", followed by a final "result" with the full analysis dict
+        (same shape as analyze_text) or "error".
+        """
+        started = time.perf_counter()
+        key = make_cache_key(text, PROMPT_VERSION, GEMINI_MODEL_NAME)
+
+        result = await self.cache.peek(key)
+        if result is None and not self.gemini_configured:
+            if self.preanalyzer.available:
+                result = self._degraded(await self.preanalyzer.analyze(text))
+            else:
+                result = {"error": "AI service not configured"}
+
+        if result is not None:
+            # Nothing to stream: replay the finished result as events
+            if "analysis" in result:
+                analysis = result["analysis"]
+                yield "overall_score", analysis["overall_score"]
+                for correction in analysis["corrections"]:
+                    yield "correction", correction
+                yield "feedback", analysis["feedback"]
+                yield "result", result
+            else:
+                yield "error", result
+            return
+
+        prompt, pre = await self._build_prompt(text)
+        parser = AnalysisStreamParser()
+        first_useful = None
+        try:
+            async for chunk in self._stream_model(prompt):
+                for name, value in parser.feed(chunk):
+                    if name == "corrections[]":
+                        name = "correction"
+                    elif name not in ("overall_score", "feedback"):
+                        continue
+                    if first_useful is None and name != "feedback":
+                        first_useful = time.perf_counter()
+                        self._record_ttfub((first_useful - started) * 1000)
+                    yield name, value
+            result = {"analysis": TextAnalysis.model_validate(parser.result()).model_dump()}
+        except QueueFullError:
+            raise
+        except Exception as e:
+            logger.error(f"Error during streamed analysis: {e}")
+            result = await self._fallback(text, pre, str(e))
+
+        if "analysis" in result and not result.get("degraded"):
+            await self.cache.put(key, result)
+        yield ("result" if "analysis" in result else "error"), result
+
+    async def _stream_model(self, prompt: str) -> AsyncIterator[str]:
+        """Iterate Gemini's blocking stream on the executor, yielding text chunks."""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+
+        def produce():
+            for chunk in self.model.generate_content(prompt, stream=True):
+                if stop.is_set():
+                    break
+                if chunk.text:
+                    loop.call_soon_threadsafe(queue.put_nowait, chunk.text)
+
+        producer = asyncio.ensure_future(self.executor.run(produce))
+        # Runs after every chunk queued by the thread, including on failure
+        producer.add_done_callback(lambda _: queue.put_nowait(_STREAM_END))
+        try:
+            while (item := await queue.get()) is not _STREAM_END:
+                yield item
+            # Surface errors raised while streaming
+            await producer
+        finally:
+            stop.set()
+
+    def _record_ttfub(self, ms: float) -> None:
+        self.streams += 1
+        self.ttfub_total_ms += ms
+        self.last_ttfub_ms = round(ms, 1)
+
+    def stream_stats(self) -> dict:
+        return {
+            "streams": self.streams,
+            "avg_ttfub_ms": round(self.ttfub_total_ms / self.streams, 1) if self.streams else None,
+            "last_ttfub_ms": self.last_ttfub_ms,
+        }
+
+    @staticmethod
+    def _full_prompt(text: str) -> str:
         # Basic prompt for grammatical analysis
-        prompt = f"""
+        return f"""
         Analyze the following text for grammatical correctness and linguistic accuracy suitable for a professional medical interpreter.
         
         Text: "{text}"
         
         Provide response in JSON format with:
-        - corrections: list of objects {{"original": str, "correction": str, "explanation": str}}
         - overall_score: int (0-100)
+        - corrections: list of objects {{"original": str, "correction": str, "explanation": str}}
         - feedback: string summary
         """
+
+    @staticmethod
+    def _condensed_prompt(pre: dict) -> str:
+        summary = pre["summary"]
+        flagged = "\n".join(f"- {json.dumps(sentence, ensure_ascii=False)}" for sentence in pre["flagged_sentences"]) or "- (none)"
+        hints = "\n".join(f"- {issue['message']}" for issue in pre["issues"]) or "- (none)"
+        terminology = ", ".join(pre["terminology"]) or "(none)"
+        return f"""
+        You are reviewing a passage written by a professional medical interpreter. Automated checks already processed the full passage; only the sentences they flagged are shown.
+        
+        Passage summary: {summary["sentences"]} sentences, {summary["tokens"]} tokens, {summary["past_sentences"]} in past tense, {summary["present_sentences"]} in present tense.
+        Medical terminology used: {terminology}
         
+        Flagged sentences:
+        {flagged}
+        
+        Automated findings:
+        {hints}
+        
+        Provide response in JSON format with:
+        - overall_score: int (0-100) for the whole passage, given the summary and findings
+        - corrections: list of objects {{"original": str, "correction": str, "explanation": str}} for the flagged sentences
+        - feedback: string summary
+        """
+
+    async def _analyze_packed(self, texts: list[str]) -> list[dict]:
+        """Analyze several short passages with one Gemini call."""
+        if len(texts) == 1:
+            return [await self._analyze_uncached(texts[0])]
+
+        passages = "\n".join(
+            f"[{index}] {json.dumps(text, ensure_ascii=False)}" for index, text in enumerate(texts)
+        )
+        prompt = f"""
+        Analyze each of the following numbered passages independently for grammatical correctness and linguistic accuracy suitable for a professional medical interpreter.
+        
+        Passages:
+        {passages}
+        
+        Provide response as a JSON array with exactly one object per passage, each with:
+        - index: int (the passage number)
+        - overall_score: int (0-100)
+        - corrections: list of objects {{"original": str, "correction": str, "explanation": str}}
+        - feedback: string summary
+        """
+
         try:
-            response = self.model.generate_content(prompt)
-            # Simple cleanup to ensure valid JSON parsing if model wraps in markdown
-            if response.text:
-                text_response = response.text.replace('```json', '').replace('```', '').strip()
-                return {"raw_analysis": text_response}
-            else:
-                return {"error": "Empty response from Gemini"}
+            response = await self.executor.run(self.model.generate_content, prompt)
+            text_response = response.text.replace('```json', '').replace('```', '').strip()
+            items = {int(item["index"]): item for item in json.loads(text_response)}
+            return [
+                {"analysis": TextAnalysis.model_validate(items[index]).model_dump()}
+                for index in range(len(texts))
+            ]
+        except QueueFullError:
+            raise
         except Exception as e:
-            logger.error(f"Error during analysis: {e}")
-            # If Gemini fails, we might fallback to Spacy if available (not implemented yet)
-            return {"error": str(e)}
+            # A malformed packed response shouldn't fail every passage; analyze them one by one
+            logger.warning(f"Packed analysis of {len(texts)} passages failed ({e}), falling back to single calls.")
+            return list(await asyncio.gather(*(self._analyze_uncached(text) for text in texts)))
+
+    async def shutdown(self) -> None:
+        self.executor.shutdown()
+        await self.cache.close()
+        await self.models.close()
+        self.preanalyzer.shutdown()
 
 ai_service = AIService()
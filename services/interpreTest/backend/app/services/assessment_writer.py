@@ -0,0 +1,267 @@
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Callable
+
+from app.config import settings
+from app.dependencies.database import AssessmentStore, PermanentWriteError, db
+
+logger = logging.getLogger(__name__)
+
+
+class SpoolFullError(Exception):
+    """Raised when too many assessments are waiting to be written."""
+
+
+class AssessmentWriter:
+    """
+    Write-behind buffer for the `assessments` table.
+
+    `submit()` appends the row to a local spool file and returns right away;
+    a background task flushes pending rows in multi-row inserts once
+    `batch_size` rows are waiting or every `flush_interval` seconds. Rows
+    still in the spool at startup (after a crash) are replayed.
+
+    The spool is a series of append-only segment files
+    (`<spool_path>.00000001`, ...) of up to `segment_rows` rows each. A
+    segment is deleted once all of its rows are written, so every row hits
+    the disk once no matter how deep the backlog gets. Every row
+    carries its own id, so a batch that is retried after a partial failure
+    does not create duplicates. Rows the store rejects for good (invalid
+    data, unknown user) are moved to a dead-letter file instead of being
+    retried forever.
+
+    Note: on Cloud Run the local filesystem is per-instance memory, so the
+    spool protects against process crashes, while graceful scale-down is
+    covered by the final flush in `close()`.
+    """
+
+    def __init__(
+        self,
+        get_store: Callable[[], AssessmentStore],
+        spool_path: str,
+        dead_letter_path: str,
+        batch_size: int = 100,
+        segment_rows: int = 1000,
+        flush_interval: float = 1.0,
+        max_pending: int = 10000,
+        backpressure_timeout: float = 2.0,
+    ):
+        self._get_store = get_store
+        self.spool_path = Path(spool_path)
+        self.dead_letter_path = Path(dead_letter_path)
+        self.batch_size = batch_size
+        self.segment_rows = segment_rows
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.backpressure_timeout = backpressure_timeout
+
+        self._pending: list[dict] = []
+        # [path, rows not yet written] per segment, oldest first; the last one is open
+        self._segments: deque[list] = deque()
+        self._segment_seq = 0
+        self._segment_written = 0
+        self._spool = None
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._room = asyncio.Event()
+        self._room.set()
+        self._task = None
+
+        # Metrics
+        self.flushed = 0
+        self.flushes = 0
+        self.failures = 0
+        self.rejected = 0
+        self.dead_lettered = 0
+
+    async def start(self) -> None:
+        store = self._get_store()
+        if not store.durable:
+            # Spooled rows would be "flushed" into memory and lost on restart
+            raise RuntimeError(
+                f"Assessment writer needs a durable store, got {type(store).__name__}; "
+                "set DATABASE_URL, or SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY."
+            )
+        self.spool_path.parent.mkdir(parents=True, exist_ok=True)
+        for path in await asyncio.to_thread(self._spool_segments):
+            rows = await asyncio.to_thread(self._read_spool, path)
+            if rows:
+                self._pending.extend(rows)
+                self._segments.append([path, len(rows)])
+            else:
+                path.unlink()
+        if self._pending:
+            logger.info(f"Replaying {len(self._pending)} spooled assessments.")
+            self._wakeup.set()
+        self._open_segment()
+        self._task = asyncio.create_task(self._run())
+
+    async def submit(self, row: dict) -> str:
+        """Queue an assessment row for writing; returns its id."""
+        if len(self._pending) >= self.max_pending:
+            self._room.clear()
+            try:
+                await asyncio.wait_for(self._room.wait(), self.backpressure_timeout)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise SpoolFullError(f"{len(self._pending)} assessments pending")
+
+        row = {"id": str(uuid.uuid4()), **row}
+        async with self._lock:
+            self._spool.write(json.dumps(row) + "\n")
+            self._spool.flush()
+            self._pending.append(row)
+            self._segments[-1][1] += 1
+            self._segment_written += 1
+            if self._segment_written >= self.segment_rows:
+                self._spool.close()
+                self._open_segment()
+
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+        return row["id"]
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Assessment flush failed, will retry: {e}")
+
+    async def flush(self) -> None:
+        """Write out everything pending, `batch_size` rows per insert."""
+        while self._pending:
+            batch = self._pending[:self.batch_size]
+            await self._insert(batch)
+            self.flushes += 1
+            async with self._lock:
+                del self._pending[:len(batch)]
+                self._release(len(batch))
+            if len(self._pending) < self.max_pending:
+                self._room.set()
+
+    async def _insert(self, batch: list[dict]) -> None:
+        """Insert `batch`, dead-lettering the rows the store rejects permanently."""
+        try:
+            await self._get_store().insert_assessments(batch)
+        except PermanentWriteError as e:
+            if len(batch) == 1:
+                logger.error(f"Assessment {batch[0].get('id')} rejected, moved to dead-letter file: {e}")
+                await asyncio.to_thread(self._dead_letter, batch[0], str(e))
+                self.dead_lettered += 1
+                return
+            # One bad row fails the whole statement; bisect to find it.
+            # Inserts are idempotent, so the good halves can simply be resent.
+            middle = len(batch) // 2
+            await self._insert(batch[:middle])
+            await self._insert(batch[middle:])
+            return
+        self.flushed += len(batch)
+
+    def _dead_letter(self, row: dict, error: str) -> None:
+        self.dead_letter_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"row": row, "error": error, "failed_at": time.time()}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _segment_path(self, seq: int) -> Path:
+        return self.spool_path.with_name(f"{self.spool_path.name}.{seq:08d}")
+
+    def _spool_segments(self) -> list[Path]:
+        """Existing segments in write order (a pre-segment spool file first)."""
+        segments = []
+        for path in self.spool_path.parent.glob(f"{self.spool_path.name}.*"):
+            suffix = path.name[len(self.spool_path.name) + 1:]
+            if suffix.isdigit():
+                segments.append((int(suffix), path))
+        segments.sort()
+        if segments:
+            self._segment_seq = segments[-1][0]
+        legacy = [self.spool_path] if self.spool_path.exists() else []
+        return legacy + [path for _, path in segments]
+
+    def _open_segment(self) -> None:
+        self._segment_seq += 1
+        path = self._segment_path(self._segment_seq)
+        self._spool = open(path, "a", encoding="utf-8")
+        self._segments.append([path, 0])
+        self._segment_written = 0
+
+    def _release(self, count: int) -> None:
+        """Mark the oldest `count` pending rows written; delete finished segments."""
+        while count:
+            segment = self._segments[0]
+            take = min(segment[1], count)
+            segment[1] -= take
+            count -= take
+            if segment[1]:
+                break
+            if len(self._segments) == 1:
+                # The open segment is fully written: start a fresh one
+                self._spool.close()
+                self._open_segment()
+            self._segments.popleft()
+            segment[0].unlink(missing_ok=True)
+
+    def _read_spool(self, path: Path) -> list[dict]:
+        rows = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rows.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Torn final line from a crash mid-write
+                    logger.warning(f"Skipping corrupt line in assessment spool {path.name}.")
+        return rows
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Final assessment flush failed; {len(self._pending)} rows kept in spool: {e}")
+        if self._spool is not None:
+            self._spool.close()
+            path, unwritten = self._segments[-1]
+            if not unwritten:
+                path.unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "spool_segments": len(self._segments),
+            "max_pending": self.max_pending,
+            "flushed": self.flushed,
+            "flushes": self.flushes,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "dead_lettered": self.dead_lettered,
+        }
+
+
+assessment_writer = AssessmentWriter(
+    lambda: db.assessments,
+    spool_path=settings.ASSESSMENT_SPOOL_PATH,
+    dead_letter_path=settings.ASSESSMENT_DEAD_LETTER_PATH,
+    batch_size=settings.ASSESSMENT_FLUSH_BATCH_SIZE,
+    flush_interval=settings.ASSESSMENT_FLUSH_INTERVAL_SECONDS,
+    max_pending=settings.ASSESSMENT_MAX_PENDING,
+)
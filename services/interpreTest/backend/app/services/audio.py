@@ -0,0 +1,241 @@
+import asyncio
+import logging
+import struct
+import tempfile
+from typing import AsyncIterator, Iterator, Optional
+
+import numpy as np
+import soxr
+
+logger = logging.getLogger(__name__)
+
+MAX_WAV_HEADER_BYTES = 1 << 20
+
+
+class UnsupportedAudioError(ValueError):
+    """Raised when an upload can't be decoded."""
+
+
+class WavStreamDecoder:
+    """
+    Incremental WAV decoder: feed raw bytes, get mono float32 samples back.
+
+    Only the RIFF header is buffered; sample data is converted as it arrives,
+    carrying over at most one partial sample frame between chunks.
+    """
+
+    def __init__(self):
+        self._header = bytearray()
+        self._remainder = b""
+        self.sample_rate: Optional[int] = None
+        self.channels = 1
+        self._dtype = None
+        self._scale = 1.0
+        self._offset = 0.0
+        self._block_align = 0
+        self._data_remaining: Optional[int] = None
+
+    def feed(self, chunk: bytes) -> np.ndarray:
+        if self.sample_rate is None:
+            self._header += chunk
+            data = self._parse_header()
+            if data is None:
+                if len(self._header) > MAX_WAV_HEADER_BYTES:
+                    raise UnsupportedAudioError("WAV header too large or missing data chunk")
+                return np.empty(0, dtype=np.float32)
+            chunk = data
+
+        if self._data_remaining is not None:
+            # Ignore trailing chunks (LIST, etc.) after the sample data
+            chunk = chunk[:self._data_remaining]
+            self._data_remaining -= len(chunk)
+
+        data = self._remainder + chunk if self._remainder else chunk
+        usable = len(data) - len(data) % self._block_align
+        self._remainder = data[usable:]
+        if not usable:
+            return np.empty(0, dtype=np.float32)
+
+        samples = np.frombuffer(data, dtype=self._dtype, count=usable // self._dtype.itemsize)
+        samples = samples.astype(np.float32)
+        if self._offset:
+            samples -= self._offset
+        if self._scale != 1.0:
+            samples *= self._scale
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1)
+        return samples
+
+    def _parse_header(self) -> Optional[bytes]:
+        """Returns the bytes following the data chunk header, or None if incomplete."""
+        header = self._header
+        if len(header) < 12:
+            return None
+        if header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+            raise UnsupportedAudioError("Not a RIFF/WAVE file")
+
+        pos = 12
+        fmt = None
+        while len(header) >= pos + 8:
+            chunk_id, size = struct.unpack("<4sI", header[pos:pos + 8])
+            body = pos + 8
+            if chunk_id == b"data":
+                if fmt is None:
+                    raise UnsupportedAudioError("WAV data chunk before fmt chunk")
+                self._configure(*fmt)
+                # Streamed WAVs often leave the size as 0 or 0xFFFFFFFF: read to EOF then
+                if 0 < size < 0xFFFFFFFF:
+                    self._data_remaining = size
+                return bytes(header[body:])
+            if len(header) < body + size:
+                return None
+            if chunk_id == b"fmt ":
+                fmt = struct.unpack("<HHIIHH", header[body:body + 16])
+            pos = body + size + (size & 1)
+        return None
+
+    def _configure(self, audio_format, channels, sample_rate, byte_rate, block_align, bits) -> None:
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self._block_align = block_align
+        if audio_format == 1 and bits == 16:
+            self._dtype, self._scale = np.dtype("<i2"), 1 / 32768
+        elif audio_format == 1 and bits == 32:
+            self._dtype, self._scale = np.dtype("<i4"), 1 / 2147483648
+        elif audio_format == 1 and bits == 8:
+            self._dtype, self._scale, self._offset = np.dtype("u1"), 1 / 128, 128.0
+        elif audio_format == 3 and bits == 32:
+            self._dtype = np.dtype("<f4")
+        else:
+            raise UnsupportedAudioError(f"Unsupported WAV encoding (format={audio_format}, bits={bits})")
+
+
+class Framer:
+    """Re-slices a stream of samples into fixed-size frames using one preallocated buffer."""
+
+    def __init__(self, frame_size: int):
+        self.frame_size = frame_size
+        self._buffer = np.empty(frame_size, dtype=np.float32)
+        self._fill = 0
+
+    def push(self, samples: np.ndarray) -> Iterator[np.ndarray]:
+        offset = 0
+        while offset < len(samples):
+            take = min(self.frame_size - self._fill, len(samples) - offset)
+            self._buffer[self._fill:self._fill + take] = samples[offset:offset + take]
+            self._fill += take
+            offset += take
+            if self._fill == self.frame_size:
+                yield self._buffer.copy()
+                self._fill = 0
+
+    def flush(self) -> Iterator[np.ndarray]:
+        if self._fill:
+            yield self._buffer[:self._fill].copy()
+            self._fill = 0
+
+
+async def _prepend(first: bytes, rest: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    yield first
+    async for chunk in rest:
+        yield chunk
+
+
+async def _decode_wav(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[np.ndarray, int]]:
+    decoder = WavStreamDecoder()
+    async for chunk in chunks:
+        samples = decoder.feed(chunk)
+        if len(samples):
+            yield samples, decoder.sample_rate
+
+
+async def _decode_compressed(
+    chunks: AsyncIterator[bytes], block_seconds: float
+) -> AsyncIterator[tuple[np.ndarray, int]]:
+    # mp3/ogg/flac need a seekable source: spool the upload to disk in chunks
+    # (constant memory), then decode it block by block with librosa.stream.
+    import librosa
+
+    with tempfile.NamedTemporaryFile() as tmp:
+        async for chunk in chunks:
+            tmp.write(chunk)
+        tmp.flush()
+
+        try:
+            sample_rate = librosa.get_samplerate(tmp.name)
+        except Exception as e:
+            raise UnsupportedAudioError(f"Could not decode audio: {e}")
+
+        frame_length = 2048
+        blocks = librosa.stream(
+            tmp.name,
+            block_length=max(1, int(block_seconds * sample_rate) // frame_length),
+            frame_length=frame_length,
+            hop_length=frame_length,
+            mono=True,
+            dtype=np.float32,
+        )
+        while (block := await asyncio.to_thread(next, blocks, None)) is not None:
+            yield block, sample_rate
+
+
+async def decode_audio_frames(
+    chunks: AsyncIterator[bytes],
+    sample_rate: int = 16000,
+    frame_seconds: float = 1.0,
+) -> AsyncIterator[np.ndarray]:
+    """
+    Decode an uploaded audio byte stream into fixed-size mono float32 frames
+    at `sample_rate`.
+
+    WAV is decoded fully incrementally; other formats are spooled to a temp
+    file first. Resampling uses a stateful soxr stream, so frame boundaries
+    introduce no artifacts. Memory use is bounded by the chunk and frame
+    sizes, not the recording length.
+    """
+    first = b""
+    async for chunk in chunks:
+        if chunk:
+            first = chunk
+            break
+    if not first:
+        raise UnsupportedAudioError("Empty upload")
+
+    stream = _prepend(first, chunks)
+    if first[:4] == b"RIFF":
+        decoded = _decode_wav(stream)
+    else:
+        decoded = _decode_compressed(stream, block_seconds=frame_seconds * 4)
+
+    framer = Framer(int(sample_rate * frame_seconds))
+    resampler = None
+    async for samples, source_rate in decoded:
+        if source_rate != sample_rate:
+            if resampler is None:
+                resampler = soxr.ResampleStream(source_rate, sample_rate, 1, dtype="float32")
+            samples = resampler.resample_chunk(samples)
+        for frame in framer.push(samples):
+            yield frame
+
+    if resampler is not None:
+        for frame in framer.push(resampler.resample_chunk(np.empty(0, dtype=np.float32), last=True)):
+            yield frame
+    for frame in framer.flush():
+        yield frame
+
+
+async def iter_upload(file, chunk_size: int) -> AsyncIterator[bytes]:
+    """Read an UploadFile in fixed-size chunks without buffering it whole."""
+    while chunk := await file.read(chunk_size):
+        yield chunk
+
+
+def encode_wav(samples: np.ndarray, sample_rate: int) -> bytes:
+    """Mono float32 samples -> 16-bit PCM WAV bytes."""
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+    header = struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + len(pcm), b"WAVE", b"fmt ", 16, 1, 1,
+        sample_rate, sample_rate * 2, 2, 16, b"data", len(pcm),
+    )
+    return header + pcm
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+import numpy as np
+
+from app.services.acoustics import FluencyTracker
+from app.services.audio import decode_audio_frames
+from app.services.transcription import Transcriber
+
+logger = logging.getLogger(__name__)
+
+
+async def assess_audio_stream(
+    chunks: AsyncIterator[bytes],
+    transcriber: Transcriber,
+    analyze: Callable[[str], Awaitable[dict]],
+    sample_rate: int = 16000,
+    frame_seconds: float = 1.0,
+    passage_min_words: int = 120,
+    fluency: Optional[FluencyTracker] = None,
+) -> dict:
+    """
+    Upload -> decode/resample -> transcribe -> analyze, as one streaming pipeline.
+
+    Each stage pulls from the previous one, so only a chunk, a frame and a
+    transcription window are held at a time. Finished transcript segments are
+    grouped into passages of ~`passage_min_words` words and analyzed
+    concurrently while the rest of the recording is still being transcribed.
+    If a FluencyTracker is given, every frame is also fed to it and the
+    acoustic metrics are added under "fluency".
+    """
+    frames = decode_audio_frames(chunks, sample_rate=sample_rate, frame_seconds=frame_seconds)
+    if fluency is not None:
+        frames = _tap(frames, fluency)
+
+    transcript: list[str] = []
+    passage: list[str] = []
+    passage_words = 0
+    analyses: list[tuple[int, asyncio.Task]] = []
+    duration = 0.0
+
+    def start_analysis() -> None:
+        text = " ".join(passage)
+        analyses.append((len(text.split()), asyncio.create_task(analyze(text))))
+
+    try:
+        async for segment in transcriber.transcribe(frames, sample_rate):
+            duration = segment.end
+            if not segment.text:
+                continue
+            transcript.append(segment.text)
+            passage.append(segment.text)
+            passage_words += len(segment.text.split())
+            if passage_words >= passage_min_words:
+                start_analysis()
+                passage = []
+                passage_words = 0
+        if passage:
+            start_analysis()
+
+        results = [(words, await task) for words, task in analyses]
+        transcription = " ".join(transcript)
+        metrics = await fluency.finish(len(transcription.split())) if fluency is not None else None
+    finally:
+        for _, task in analyses:
+            task.cancel()
+        if fluency is not None:
+            fluency.cancel()
+
+    assessment = _combine(transcription, duration, results)
+    if metrics is not None:
+        assessment["fluency"] = metrics
+    return assessment
+
+
+async def _tap(frames: AsyncIterator[np.ndarray], fluency: FluencyTracker) -> AsyncIterator[np.ndarray]:
+    async for frame in frames:
+        fluency.push(frame)
+        yield frame
+
+
+def _combine(transcription: str, duration: float, results: list[tuple[int, dict]]) -> dict:
+    """Merge per-passage analyses into the assessment response shape."""
+    scored = [(words, r["analysis"]) for words, r in results if "analysis" in r]
+    total_words = sum(words for words, _ in scored)
+    score = round(sum(words * a["overall_score"] for words, a in scored) / total_words) if total_words else None
+
+    grammar = []
+    improvements = []
+    strengths = []
+    for _, analysis in scored:
+        for correction in analysis["corrections"]:
+            grammar.append(correction["explanation"])
+            improvements.append(f'"{correction["original"]}" -> "{correction["correction"]}"')
+        if analysis["feedback"]:
+            strengths.append(analysis["feedback"])
+
+    return {
+        "score": score,
+        "transcription": transcription,
+        "duration_seconds": round(duration, 2),
+        "feedback": {"grammar": grammar, "vocab": []},
+        "strengths": strengths,
+        "improvements": improvements,
+        "errors": [r["error"] for _, r in results if "error" in r],
+    }
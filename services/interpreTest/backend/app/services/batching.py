@@ -0,0 +1,96 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English/Spanish prose)."""
+    return len(text) // 4 + 1
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-item submissions into one batched call.
+
+    Items submitted within `window_ms` of the first pending item are grouped
+    and passed to `handler` together. A group is flushed early once it reaches
+    `max_items` or would exceed `max_tokens`, so packed prompts stay within the
+    model's limits. `handler` must return one result per input, in order.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[list[str]], Awaitable[list[dict]]],
+        window_ms: float = 10.0,
+        max_items: int = 8,
+        max_tokens: int = 3000,
+    ):
+        self.handler = handler
+        self.window = window_ms / 1000
+        self.max_items = max(1, max_items)
+        self.max_tokens = max_tokens
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._pending_tokens = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task] = set()
+
+        # Metrics
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, text: str) -> dict:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        tokens = estimate_tokens(text)
+
+        if self._pending and self._pending_tokens + tokens > self.max_tokens:
+            self._flush()
+
+        self._pending.append((text, future))
+        self._pending_tokens += tokens
+
+        if len(self._pending) >= self.max_items:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch = self._pending
+        self._pending = []
+        self._pending_tokens = 0
+
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[str, asyncio.Future]]) -> None:
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = await self.handler([text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0,
+        }
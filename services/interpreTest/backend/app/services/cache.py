@@ -0,0 +1,186 @@
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+try:
+    import redis.asyncio as redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(text: str, prompt_version: str, model_name: str) -> str:
+    """
+    Content-addressed key for an analysis result.
+
+    Whitespace is collapsed so trivially re-formatted submissions of the same
+    passage share an entry; casing and punctuation are kept since they matter
+    for grammar feedback.
+    """
+    normalized = " ".join(text.split())
+    digest = hashlib.sha256(
+        f"{prompt_version}\x00{model_name}\x00{normalized}".encode("utf-8")
+    ).hexdigest()
+    return digest
+
+
+class AnalysisCache:
+    """
+    Two-tier cache for analysis results with single-flight de-duplication.
+
+    - Tier 1: in-process LRU with a TTL.
+    - Tier 2: optional shared Redis (enabled when `redis_url` is set).
+
+    Concurrent lookups for the same key while it is being computed wait on the
+    first caller's result instead of triggering another upstream call. The
+    computation runs in its own task, so it survives any one caller being
+    cancelled. Every caller gets its own copy of the result.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: int = 86400,
+        redis_url: Optional[str] = None,
+        namespace: str = "interpretest:analysis",
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace
+        self._local: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._redis = None
+
+        if redis_url and REDIS_AVAILABLE:
+            self._redis = redis.from_url(redis_url)
+            logger.info("Analysis cache using shared Redis tier.")
+        elif redis_url:
+            logger.warning("REDIS_URL set but redis package not installed. Using local cache only.")
+
+        # Metrics
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _get_local(self, key: str) -> Optional[dict]:
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._local[key]
+            return None
+        self._local.move_to_end(key)
+        # Callers mutate results; never hand out the cached object itself
+        return copy.deepcopy(value)
+
+    def _set_local(self, key: str, value: dict) -> None:
+        self._local[key] = (time.monotonic() + self.ttl_seconds, copy.deepcopy(value))
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    async def _get_redis(self, key: str) -> Optional[dict]:
+        if self._redis is None:
+            return None
+        try:
+            raw = await self._redis.get(f"{self.namespace}:{key}")
+            return json.loads(raw) if raw else None
+        except Exception as e:
+            logger.warning(f"Redis cache read failed: {e}")
+            return None
+
+    async def _set_redis(self, key: str, value: dict) -> None:
+        if self._redis is None:
+            return
+        try:
+            await self._redis.set(
+                f"{self.namespace}:{key}", json.dumps(value), ex=self.ttl_seconds
+            )
+        except Exception as e:
+            logger.warning(f"Redis cache write failed: {e}")
+
+    async def peek(self, key: str) -> Optional[dict]:
+        """Return the cached value for `key` without computing it."""
+        value = self._get_local(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        value = await self._get_redis(key)
+        if value is not None:
+            self.redis_hits += 1
+            self._set_local(key, value)
+        return value
+
+    async def put(self, key: str, value: dict) -> None:
+        self._set_local(key, value)
+        await self._set_redis(key, value)
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[dict]],
+        cacheable: Callable[[dict], bool] = lambda result: True,
+    ) -> dict:
+        """Return the cached value for `key`, computing it at most once concurrently."""
+        value = self._get_local(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(self._load(key, compute, cacheable))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        # Cancelling a caller only cancels its wait, not the shared computation
+        return copy.deepcopy(await asyncio.shield(task))
+
+    async def _load(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[dict]],
+        cacheable: Callable[[dict], bool],
+    ) -> dict:
+        value = await self._get_redis(key)
+        if value is not None:
+            self.redis_hits += 1
+            self._set_local(key, value)
+            return value
+        self.misses += 1
+        value = await compute()
+        if cacheable(value):
+            self._set_local(key, value)
+            await self._set_redis(key, value)
+        return value
+
+    def _finished(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "entries": len(self._local),
+            "redis": self._redis is not None,
+        }
+
+    async def close(self) -> None:
+        if self._redis is not None:
+            await self._redis.aclose()
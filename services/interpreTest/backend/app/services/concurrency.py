@@ -0,0 +1,87 @@
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when a BoundedExecutor already has `max_queue` callers waiting."""
+
+
+class BoundedExecutor:
+    """
+    Runs blocking callables (e.g. the synchronous Gemini SDK) off the event loop.
+
+    Calls go to a dedicated thread pool sized to `max_concurrency`, so slow
+    upstream calls never starve the default executor or the loop itself.
+    At most `max_queue` callers may wait for a slot; anything beyond that is
+    rejected immediately with QueueFullError so the API can answer 503 fast.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix=name
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        # Metrics
+        self.in_flight = 0
+        self.waiting = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    @property
+    def saturated(self) -> bool:
+        """True when a new call would be rejected with QueueFullError."""
+        return self._semaphore.locked() and self.waiting >= self.max_queue
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run `func(*args, **kwargs)` on the pool once a slot is free."""
+        if self.saturated:
+            self.rejected += 1
+            raise QueueFullError(
+                f"{self.name}: {self.in_flight} calls in flight and {self.waiting} queued"
+            )
+
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                self._executor, functools.partial(func, *args, **kwargs)
+            )
+            self.completed += 1
+            return result
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        logger.info(f"Shutting down executor '{self.name}'")
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,108 @@
+import json
+import logging
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisStreamParser:
+    """
+    Incremental parser for a streamed top-level JSON object.
+
+    Feed it model output as it arrives; `feed()` returns the fields that
+    became complete in that chunk as (name, value) pairs. Scalar/object
+    fields are emitted once their value closes, and elements of array
+    fields listed in `item_fields` are emitted one by one (as
+    ("<field>[]", element)) so e.g. the first corrections can be shown
+    before the model finishes. Leading text such as ```json fences is
+    ignored.
+    """
+
+    def __init__(self, item_fields: tuple[str, ...] = ("corrections",)):
+        self.item_fields = item_fields
+        self._text = ""
+        self._pos = 0
+        self._start = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._expect_key = False
+        self._key = None
+        self._value_start = None
+        self._item_start = None
+        self.done = False
+
+    def feed(self, chunk: str) -> list[tuple[str, Any]]:
+        self._text += chunk
+        events = []
+        text = self._text
+
+        for i in range(self._pos, len(text)):
+            if self.done:
+                break
+            c = text[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expect_key:
+                        self._key = json.loads(text[self._string_start:i + 1])
+                continue
+
+            if self._depth == 0:
+                if c == "{":
+                    self._start = i
+                    self._depth = 1
+                    self._expect_key = True
+                continue
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c in "{[":
+                if self._depth == 2 and c == "{" and self._key in self.item_fields:
+                    self._item_start = i
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 2 and c == "}" and self._item_start is not None:
+                    self._emit(events, f"{self._key}[]", text[self._item_start:i + 1])
+                    self._item_start = None
+                elif self._depth == 0:
+                    self._finish_value(events, text[self._value_start:i])
+                    self.done = True
+            elif self._depth == 1:
+                if c == ":":
+                    self._expect_key = False
+                    self._value_start = i + 1
+                elif c == ",":
+                    self._finish_value(events, text[self._value_start:i])
+                    self._expect_key = True
+
+        self._pos = len(text)
+        return events
+
+    def _finish_value(self, events: list, raw: str) -> None:
+        if self._key is not None and self._value_start is not None:
+            self._emit(events, self._key, raw)
+        self._key = None
+        self._value_start = None
+
+    @staticmethod
+    def _emit(events: list, name: str, raw: str) -> None:
+        try:
+            events.append((name, json.loads(raw)))
+        except json.JSONDecodeError:
+            logger.debug(f"Skipping unparseable streamed field '{name}'")
+
+    def result(self) -> dict:
+        """The complete object once the stream has ended."""
+        if self._start is None:
+            raise ValueError("No JSON object found in model output")
+        end = self._text.rfind("}")
+        return json.loads(self._text[self._start:end + 1])
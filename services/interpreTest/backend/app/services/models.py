@@ -0,0 +1,86 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """
+    Loads heavy models (spaCy pipelines, etc.) in the background.
+
+    Nothing is loaded at import time: `start()` is called from the FastAPI
+    lifespan and each registered loader runs in a worker thread, so the
+    process can accept liveness probes immediately. Callers use `get()`,
+    which returns None until the model is ready, or `wait()` to block on it.
+    """
+
+    def __init__(self):
+        self._loaders: dict[str, Callable[[], Any]] = {}
+        self._models: dict[str, Any] = {}
+        self._errors: dict[str, str] = {}
+        self._load_seconds: dict[str, float] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    def register(self, name: str, loader: Callable[[], Any]) -> None:
+        self._loaders[name] = loader
+
+    def start(self) -> None:
+        """Kick off background loading of every registered model."""
+        for name, loader in self._loaders.items():
+            if name not in self._tasks:
+                self._tasks[name] = asyncio.create_task(self._load(name, loader))
+
+    async def _load(self, name: str, loader: Callable[[], Any]) -> None:
+        started = time.perf_counter()
+        try:
+            model = await asyncio.to_thread(loader)
+        except Exception as e:
+            self._errors[name] = str(e)
+            logger.warning(f"Model '{name}' failed to load: {e}")
+            return
+        finally:
+            self._load_seconds[name] = round(time.perf_counter() - started, 3)
+
+        if model is None:
+            self._errors[name] = "unavailable"
+            return
+        self._models[name] = model
+        logger.info(f"Model '{name}' loaded in {self._load_seconds[name]}s")
+
+    def get(self, name: str) -> Optional[Any]:
+        return self._models.get(name)
+
+    async def wait(self, name: str) -> Optional[Any]:
+        task = self._tasks.get(name)
+        if task is not None:
+            await asyncio.shield(task)
+        return self._models.get(name)
+
+    @property
+    def ready(self) -> bool:
+        """True once every registered model has finished loading (or failed)."""
+        return all(name in self._models or name in self._errors for name in self._loaders)
+
+    def status(self) -> dict:
+        status = {}
+        for name in self._loaders:
+            if name in self._models:
+                state = "loaded"
+            elif name in self._errors:
+                state = "failed"
+            elif name in self._tasks:
+                state = "loading"
+            else:
+                state = "pending"
+            status[name] = {
+                "state": state,
+                "load_seconds": self._load_seconds.get(name),
+                "error": self._errors.get(name),
+            }
+        return status
+
+    async def close(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
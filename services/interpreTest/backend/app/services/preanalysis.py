@@ -0,0 +1,173 @@
+import logging
+import time
+from typing import Any, Callable
+
+from app.services.batching import MicroBatcher
+from app.services.concurrency import BoundedExecutor
+
+logger = logging.getLogger(__name__)
+
+# Common terms interpreters are assessed on; matched case-insensitively
+MEDICAL_TERMS = [
+    "abdomen", "allergy", "anemia", "anesthesia", "antibiotic", "appendicitis",
+    "arrhythmia", "asthma", "biopsy", "blood pressure", "bronchitis", "cardiology",
+    "catheter", "chemotherapy", "cholesterol", "colonoscopy", "concussion",
+    "diabetes", "diagnosis", "dialysis", "fracture", "gallbladder", "heart attack",
+    "hypertension", "inflammation", "insulin", "intravenous", "kidney stone",
+    "mammogram", "migraine", "myocarditis", "nausea", "pneumonia", "prescription",
+    "prognosis", "seizure", "side effects", "stroke", "symptom", "thyroid",
+    "ultrasound", "vaccine", "x-ray",
+]
+
+SINGULAR_PRONOUNS = {"he", "she", "it"}
+NON_THIRD_SINGULAR_PRONOUNS = {"i", "you", "we", "they"}
+PAST_TAGS = {"VBD"}
+PRESENT_TAGS = {"VBZ", "VBP"}
+
+
+class PreAnalyzer:
+    """
+    Local, deterministic linguistic pre-pass over the spaCy pipeline.
+
+    Catches issues that don't need an LLM (subject-verb agreement, tense
+    shifts, repeated words) and spots medical terminology. Texts submitted
+    concurrently are grouped by a MicroBatcher and processed with a single
+    `nlp.pipe` call on a dedicated worker thread.
+    """
+
+    def __init__(self, get_nlp: Callable[[], Any], window_ms: float = 10.0, batch_size: int = 32):
+        self._get_nlp = get_nlp
+        self._matcher = None
+        self.batch_size = batch_size
+        # spaCy pipelines are not safe to share across threads; use one worker
+        self.executor = BoundedExecutor("spacy", max_concurrency=1, max_queue=1024)
+        self.batcher = MicroBatcher(self._process_batch, window_ms=window_ms, max_items=batch_size, max_tokens=50000)
+
+        # Metrics
+        self.docs = 0
+        self.seconds = 0.0
+
+    @property
+    def available(self) -> bool:
+        return self._get_nlp() is not None
+
+    async def analyze(self, text: str) -> dict:
+        return await self.batcher.submit(text)
+
+    async def _process_batch(self, texts: list[str]) -> list[dict]:
+        return await self.executor.run(self._run_pipe, texts)
+
+    def _run_pipe(self, texts: list[str]) -> list[dict]:
+        nlp = self._get_nlp()
+        matcher = self._terminology_matcher(nlp)
+        started = time.perf_counter()
+        results = [self._inspect(doc, matcher) for doc in nlp.pipe(texts, batch_size=self.batch_size)]
+        self.seconds += time.perf_counter() - started
+        self.docs += len(texts)
+        return results
+
+    def _terminology_matcher(self, nlp):
+        if self._matcher is None:
+            from spacy.matcher import PhraseMatcher
+
+            matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+            matcher.add("MEDICAL_TERM", list(nlp.tokenizer.pipe(MEDICAL_TERMS)))
+            self._matcher = matcher
+        return self._matcher
+
+    def _inspect(self, doc, matcher) -> dict:
+        issues = []
+
+        # Repeated words ("the the")
+        for prev, token in zip(doc, doc[1:]):
+            if token.is_alpha and token.lower_ == prev.lower_:
+                issues.append(self._issue("repetition", doc[prev.i:token.i + 1], f"Repeated word '{token.text}'"))
+
+        # Subject-verb agreement
+        for token in doc:
+            verb = token.head
+            if token.dep_ != "nsubj" or verb.tag_ not in PRESENT_TAGS or any(c.dep_ == "conj" for c in token.children):
+                continue
+            subject_plural = token.tag_ in ("NNS", "NNPS") or token.lower_ in NON_THIRD_SINGULAR_PRONOUNS
+            subject_singular = token.tag_ in ("NN", "NNP") or token.lower_ in SINGULAR_PRONOUNS
+            if (verb.tag_ == "VBZ" and subject_plural) or (verb.tag_ == "VBP" and subject_singular):
+                start, end = sorted((token.i, verb.i))
+                issues.append(self._issue(
+                    "agreement", doc[start:end + 1],
+                    f"Subject '{token.text}' does not agree with verb '{verb.text}'",
+                ))
+
+        # Tense consistency across sentences: flag the minority tense
+        sentence_tenses = []
+        for sent in doc.sents:
+            if sent.root.tag_ in PAST_TAGS:
+                sentence_tenses.append((sent, "past"))
+            elif sent.root.tag_ in PRESENT_TAGS:
+                sentence_tenses.append((sent, "present"))
+        past = sum(1 for _, tense in sentence_tenses if tense == "past")
+        present = len(sentence_tenses) - past
+        if past and present:
+            minority = "past" if past < present else "present"
+            for sent, tense in sentence_tenses:
+                if tense == minority:
+                    issues.append(self._issue("tense", sent, f"Tense shift to {tense} ('{sent.root.text}')"))
+
+        terminology = sorted({doc[start:end].text.lower() for _, start, end in matcher(doc)})
+
+        return {
+            "issues": issues,
+            "terminology": terminology,
+            "summary": {
+                "tokens": len(doc),
+                "sentences": len(list(doc.sents)),
+                "past_sentences": past,
+                "present_sentences": present,
+                "issue_count": len(issues),
+            },
+            "flagged_sentences": self._flagged_sentences(doc, issues),
+        }
+
+    @staticmethod
+    def _issue(kind: str, span, message: str) -> dict:
+        return {
+            "type": kind,
+            "text": span.text,
+            "start": span.start_char,
+            "end": span.end_char,
+            "message": message,
+        }
+
+    @staticmethod
+    def _flagged_sentences(doc, issues: list[dict]) -> list[str]:
+        flagged = []
+        for sent in doc.sents:
+            if any(sent.start_char <= issue["start"] < sent.end_char for issue in issues):
+                flagged.append(sent.text)
+        return flagged
+
+    def stats(self) -> dict:
+        return {
+            "docs": self.docs,
+            "seconds": round(self.seconds, 3),
+            "docs_per_second": round(self.docs / self.seconds, 1) if self.seconds else None,
+            "batcher": self.batcher.stats(),
+        }
+
+    def shutdown(self) -> None:
+        self.executor.shutdown()
+
+
+def local_analysis(pre: dict) -> dict:
+    """Degraded-but-fast analysis built only from the local pre-pass."""
+    corrections = [
+        {"original": issue["text"], "correction": "", "explanation": issue["message"]}
+        for issue in pre["issues"]
+    ]
+    return {
+        "corrections": corrections,
+        "overall_score": max(0, 100 - 5 * len(corrections)),
+        "feedback": (
+            f"Automated check found {len(corrections)} issue(s). "
+            "Detailed AI feedback is temporarily unavailable."
+        ),
+    }
@@ -0,0 +1,145 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional, Protocol
+
+import numpy as np
+
+from app.config import settings
+from app.services.audio import encode_wav
+from app.services.concurrency import BoundedExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriberUnavailableError(RuntimeError):
+    """No real transcriber is configured and the fake was not opted into."""
+
+
+@dataclass
+class TranscriptSegment:
+    text: str
+    start: float
+    end: float
+
+
+class Transcriber(Protocol):
+    """Turns a stream of fixed-size mono float32 frames into transcript segments."""
+
+    def transcribe(
+        self, frames: AsyncIterator[np.ndarray], sample_rate: int
+    ) -> AsyncIterator[TranscriptSegment]: ...
+
+
+class FakeTranscriber:
+    """
+    Deterministic local stand-in for tests and offline development.
+
+    Emits a fixed word sequence for every frame with audible energy and
+    closes a sentence every `frames_per_sentence` frames, so the same audio
+    always yields the same transcript.
+    """
+
+    WORDS = ["the", "patient", "reports", "chest", "pain", "since", "yesterday", "and", "shortness", "of", "breath"]
+
+    def __init__(self, words_per_frame: int = 2, frames_per_sentence: int = 5, silence_rms: float = 0.01):
+        self.words_per_frame = words_per_frame
+        self.frames_per_sentence = frames_per_sentence
+        self.silence_rms = silence_rms
+
+    async def transcribe(
+        self, frames: AsyncIterator[np.ndarray], sample_rate: int
+    ) -> AsyncIterator[TranscriptSegment]:
+        words: list[str] = []
+        position = 0.0
+        start = 0.0
+        index = 0
+        async for frame in frames:
+            duration = len(frame) / sample_rate
+            if len(frame) and float(np.sqrt(np.mean(frame ** 2))) >= self.silence_rms:
+                for j in range(self.words_per_frame):
+                    words.append(self.WORDS[(index * self.words_per_frame + j) % len(self.WORDS)])
+            index += 1
+            position += duration
+            if index % self.frames_per_sentence == 0 and words:
+                yield TranscriptSegment(" ".join(words).capitalize() + ".", start, position)
+                words = []
+                start = position
+        if words:
+            yield TranscriptSegment(" ".join(words).capitalize() + ".", start, position)
+
+
+class GeminiTranscriber:
+    """
+    Transcribes fixed windows of audio with Gemini.
+
+    Frames are collected into a preallocated `window_seconds` buffer; each
+    full window is sent as a WAV on the AI executor while the next window
+    is still being decoded, so upload, decoding and transcription overlap.
+    """
+
+    PROMPT = "Transcribe this audio verbatim. Return only the transcript text."
+
+    def __init__(self, model, executor: BoundedExecutor, window_seconds: float = 30.0):
+        self.model = model
+        self.executor = executor
+        self.window_seconds = window_seconds
+
+    async def _transcribe_window(self, samples: np.ndarray, sample_rate: int, start: float) -> TranscriptSegment:
+        audio = {"mime_type": "audio/wav", "data": encode_wav(samples, sample_rate)}
+        response = await self.executor.run(self.model.generate_content, [self.PROMPT, audio])
+        return TranscriptSegment(response.text.strip(), start, start + len(samples) / sample_rate)
+
+    async def transcribe(
+        self, frames: AsyncIterator[np.ndarray], sample_rate: int
+    ) -> AsyncIterator[TranscriptSegment]:
+        window = np.empty(int(self.window_seconds * sample_rate), dtype=np.float32)
+        fill = 0
+        position = 0.0
+        pending: Optional[asyncio.Task] = None
+        try:
+            async for frame in frames:
+                take = min(len(frame), len(window) - fill)
+                window[fill:fill + take] = frame[:take]
+                fill += take
+                if fill == len(window):
+                    if pending is not None:
+                        yield await pending
+                    pending = asyncio.create_task(self._transcribe_window(window.copy(), sample_rate, position))
+                    position += fill / sample_rate
+                    fill = 0
+                    rest = frame[take:]
+                    window[:len(rest)] = rest
+                    fill = len(rest)
+            if pending is not None:
+                yield await pending
+                pending = None
+            if fill:
+                yield await self._transcribe_window(window[:fill], sample_rate, position)
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+
+def get_transcriber() -> Transcriber:
+    """
+    Transcriber selected by the TRANSCRIBER setting ("gemini" or "fake").
+
+    The fake is only used when TRANSCRIBER=fake is set explicitly; a missing
+    Gemini configuration is an error, never a silent canned transcript.
+    """
+    if settings.TRANSCRIBER == "fake":
+        return FakeTranscriber()
+    if settings.TRANSCRIBER != "gemini":
+        raise TranscriberUnavailableError(f"Unknown TRANSCRIBER: {settings.TRANSCRIBER!r}")
+
+    import google.generativeai as genai
+    from app.services.ai_service import GEMINI_MODEL_NAME, ai_service
+
+    if not ai_service.gemini_configured:
+        raise TranscriberUnavailableError("Gemini is not configured")
+    return GeminiTranscriber(
+        genai.GenerativeModel(GEMINI_MODEL_NAME),
+        ai_service.executor,
+        window_seconds=settings.TRANSCRIBE_WINDOW_SECONDS,
+    )
@@ -0,0 +1,97 @@
+"""
+Audio seconds analyzed per CPU second by the acoustic fluency stage.
+
+Synthetic speech-like recordings (voiced bursts separated by pauses) are
+pushed frame by frame through FluencyTracker exactly as the assessment
+pipeline does: RMS envelopes in-process as blocks fill, fluency_metrics
+in the process pool when a recording finishes. --concurrency recordings
+are analyzed at a time until --recordings have finished.
+
+CPU time is what AcousticAnalyzer itself accounts (process_time in this
+process for RMS, in the pool worker for fluency_metrics), so the figure
+matches audio_seconds_per_cpu_second in /analysis/stats. It excludes
+decoding, resampling and transcription; see audio_assess for the whole
+pipeline.
+
+    python -m loadtest.acoustic_throughput --minutes 1 10 30
+    python -m loadtest.acoustic_throughput --minutes 5 --recordings 16 --concurrency 4
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+import numpy as np
+
+# Nothing here talks to Supabase or Gemini
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "loadtest")
+os.environ.setdefault("GEMINI_API_KEY", "loadtest")
+
+from app.config import settings  # noqa: E402
+from app.services.acoustics import AcousticAnalyzer, FluencyTracker  # noqa: E402
+
+
+def speech_like(seconds: float, sample_rate: int, seed: int = 0) -> np.ndarray:
+    """~1.5 s voiced bursts with ~0.4 s pauses, as float32 in [-1, 1]."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    voiced = (t % 1.9) < 1.5
+    tone = 0.3 * np.sin(2 * np.pi * 180 * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t))
+    return (np.where(voiced, tone, 0.0) + rng.normal(0, 0.003, len(t))).astype(np.float32)
+
+
+async def analyze(analyzer: AcousticAnalyzer, audio: np.ndarray, frame_samples: int) -> dict:
+    tracker = FluencyTracker(analyzer, settings.AUDIO_SAMPLE_RATE)
+    for offset in range(0, len(audio), frame_samples):
+        tracker.push(audio[offset:offset + frame_samples])
+        await asyncio.sleep(0)  # frames arrive through the event loop, as from an upload
+    return await tracker.finish(word_count=len(audio) // settings.AUDIO_SAMPLE_RATE * 2)
+
+
+async def run_level(minutes: float, args) -> dict:
+    analyzer = AcousticAnalyzer(workers=settings.ACOUSTIC_WORKERS)
+    analyzer.start()
+    audio = speech_like(minutes * 60, settings.AUDIO_SAMPLE_RATE)
+    frame_samples = int(settings.AUDIO_SAMPLE_RATE * settings.AUDIO_FRAME_SECONDS)
+    try:
+        # Warm the pool so worker start-up isn't counted
+        await analyze(analyzer, audio[:settings.AUDIO_SAMPLE_RATE], frame_samples)
+        analyzer.audio_seconds = analyzer.rms_cpu_seconds = analyzer.metrics_cpu_seconds = 0.0
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def one() -> None:
+            async with semaphore:
+                await analyze(analyzer, audio, frame_samples)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(args.recordings)))
+        elapsed = time.perf_counter() - started
+    finally:
+        analyzer.shutdown()
+    stats = analyzer.stats()
+    return {**stats, "wall_seconds": elapsed}
+
+
+async def main(args) -> None:
+    print(f"{settings.AUDIO_SAMPLE_RATE} Hz  {args.recordings} recordings per level, "
+          f"{args.concurrency} at a time  pool: {settings.ACOUSTIC_WORKERS} workers")
+    for minutes in args.minutes:
+        result = await run_level(minutes, args)
+        print(f"{minutes:5.1f} min: {result['audio_seconds_per_cpu_second']:10.1f} audio s / cpu s  "
+              f"(rms {result['rms_cpu_seconds']:6.3f} s, metrics {result['metrics_cpu_seconds']:6.3f} s cpu)  "
+              f"x{result['audio_seconds'] / result['wall_seconds']:7.1f} realtime wall")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, nargs="+", default=[1.0, 10.0, 30.0], help="recording length")
+    parser.add_argument("--recordings", type=int, default=8, help="recordings analyzed per level")
+    parser.add_argument("--concurrency", type=int, default=2)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,135 @@
+"""
+Wall time and peak memory of POST /assess/audio's pipeline on long recordings.
+
+Streams a synthetic WAV (speech-like bursts separated by pauses) through
+assess_audio_stream exactly as the endpoint does: chunked upload ->
+decode/resample -> fake transcriber -> passage analysis, with the
+acoustic fluency tracker attached. Analysis is a stub that sleeps for
+--analysis-ms per passage, so the numbers are the pipeline's own cost.
+
+Each recording length runs in its own process so peak RSS is per length;
+a streaming pipeline should use about the same memory for 1 and 30 minutes.
+
+    python -m loadtest.audio_assess --minutes 1 30
+    python -m loadtest.audio_assess --minutes 30 --input-rate 44100
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import struct
+import subprocess
+import sys
+import time
+from typing import AsyncIterator
+
+import numpy as np
+
+# The pipeline never talks to Supabase or Gemini here
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "loadtest")
+os.environ.setdefault("GEMINI_API_KEY", "loadtest")
+
+from app.config import settings  # noqa: E402
+from app.services.acoustics import AcousticAnalyzer, FluencyTracker  # noqa: E402
+from app.services.audio_assessment import assess_audio_stream  # noqa: E402
+from app.services.transcription import FakeTranscriber  # noqa: E402
+
+
+def wav_header(seconds: float, sample_rate: int) -> bytes:
+    data = int(seconds * sample_rate) * 2
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data, b"WAVE", b"fmt ", 16, 1, 1,
+        sample_rate, sample_rate * 2, 2, 16, b"data", data,
+    )
+
+
+async def wav_upload(seconds: float, sample_rate: int, chunk_bytes: int, seed: int = 0) -> AsyncIterator[bytes]:
+    """A WAV upload generated chunk by chunk (never held whole in memory)."""
+    rng = np.random.default_rng(seed)
+    yield wav_header(seconds, sample_rate)
+    remaining = int(seconds * sample_rate)
+    chunk_samples = chunk_bytes // 2
+    position = 0
+    while remaining:
+        count = min(chunk_samples, remaining)
+        t = np.arange(position, position + count) / sample_rate
+        # ~1.5 s voiced bursts with ~0.4 s pauses
+        voiced = (t % 1.9) < 1.5
+        tone = 0.3 * np.sin(2 * np.pi * 180 * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t))
+        samples = np.where(voiced, tone, 0.0) + rng.normal(0, 0.003, count)
+        yield (np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes()
+        position += count
+        remaining -= count
+        await asyncio.sleep(0)
+
+
+async def run(args) -> dict:
+    async def analyze(text: str) -> dict:
+        await asyncio.sleep(args.analysis_ms / 1000)
+        return {"analysis": {"overall_score": 80, "corrections": [], "feedback": ""}}
+
+    analyzer = AcousticAnalyzer(workers=settings.ACOUSTIC_WORKERS)
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    try:
+        result = await assess_audio_stream(
+            wav_upload(args.single * 60, args.input_rate, settings.AUDIO_UPLOAD_CHUNK_BYTES),
+            FakeTranscriber(),
+            analyze,
+            sample_rate=settings.AUDIO_SAMPLE_RATE,
+            frame_seconds=settings.AUDIO_FRAME_SECONDS,
+            passage_min_words=settings.ASSESS_PASSAGE_MIN_WORDS,
+            fluency=FluencyTracker(analyzer, settings.AUDIO_SAMPLE_RATE),
+        )
+    finally:
+        analyzer.shutdown()
+    return {
+        "minutes": args.single,
+        "wall_seconds": time.perf_counter() - started,
+        "cpu_seconds": time.process_time() - cpu_started,
+        # ru_maxrss is KiB on Linux
+        "peak_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "audio_seconds": result["duration_seconds"],
+        "words": len(result["transcription"].split()),
+        "pauses": result["fluency"]["pauses"]["count"],
+    }
+
+
+def measure(args, minutes: float) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "loadtest.audio_assess", "--single", str(minutes),
+         "--input-rate", str(args.input_rate), "--analysis-ms", str(args.analysis_ms)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main(args) -> None:
+    if args.single is not None:
+        print(json.dumps(asyncio.run(run(args))))
+        return
+    print(f"input: {args.input_rate} Hz mono wav -> {settings.AUDIO_SAMPLE_RATE} Hz  "
+          f"analysis stub: {args.analysis_ms:.0f} ms/passage")
+    for minutes in args.minutes:
+        result = measure(args, minutes)
+        print(f"{minutes:5.1f} min: {result['wall_seconds']:7.2f} s wall  "
+              f"x{result['audio_seconds'] / result['wall_seconds']:6.1f} realtime  "
+              f"{result['cpu_seconds']:6.2f} s cpu  peak RSS {result['peak_rss_mib']:6.1f} MiB  "
+              f"{result['words']} words  {result['pauses']} pauses")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, nargs="+", default=[1.0, 30.0])
+    parser.add_argument("--input-rate", type=int, default=16000, help="sample rate of the uploaded wav")
+    parser.add_argument("--analysis-ms", type=float, default=50.0, help="stub latency per analyzed passage")
+    parser.add_argument("--single", type=float, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,139 @@
+"""
+Event-loop lag under concurrent analysis, inline model calls vs. the bounded executor.
+
+A fake Gemini model blocks for --latency-ms per generate_content call (like
+the synchronous SDK waiting on the network) and returns a valid analysis.
+For each concurrency level, that many clients call analyze_text in a loop
+for --seconds while a probe task measures how late a 5 ms sleep wakes up:
+
+  inline    the model is called directly on the event loop (the original
+            AIService behaviour)
+  executor  AIService.analyze_text: cache, packing (short passages share
+            a call) and the BoundedExecutor (AI_MAX_CONCURRENCY slots,
+            AI_MAX_QUEUE waiters, then 503)
+
+With the executor, lag should stay flat as concurrency grows and requests
+beyond the queue limit are rejected fast instead of piling up.
+
+    python -m loadtest.event_loop_lag --concurrency 1 8 32 128
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import re
+import time
+
+import numpy as np
+
+# Nothing here talks to Supabase or Gemini
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "loadtest")
+os.environ.setdefault("GEMINI_API_KEY", "loadtest")
+
+from app.services.ai_service import ai_service  # noqa: E402
+from app.services.concurrency import QueueFullError  # noqa: E402
+
+ANALYSIS = {"overall_score": 85, "corrections": [], "feedback": "Clear and accurate."}
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    """Blocking stand-in for genai.GenerativeModel (single and packed prompts)."""
+
+    def __init__(self, latency_seconds: float):
+        self.latency_seconds = latency_seconds
+
+    def generate_content(self, prompt: str, stream: bool = False) -> FakeResponse:
+        time.sleep(self.latency_seconds)
+        if "Passages:" in prompt:
+            count = len(re.findall(r"^\s*\[\d+\] ", prompt, re.MULTILINE))
+            return FakeResponse(json.dumps([{"index": i, **ANALYSIS} for i in range(count)]))
+        return FakeResponse(json.dumps(ANALYSIS))
+
+
+async def probe(lags: list[float], stop: asyncio.Event, interval: float = 0.005) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+async def run_level(mode: str, concurrency: int, seconds: float, model: FakeModel) -> dict:
+    counter = itertools.count()
+    completed = rejected = 0
+    latencies: list[float] = []
+    deadline = time.perf_counter() + seconds
+
+    async def inline(text: str) -> dict:
+        response = model.generate_content(ai_service._full_prompt(text))
+        return ai_service._parse_response(response.text)
+
+    analyze = inline if mode == "inline" else ai_service.analyze_text
+
+    async def client() -> None:
+        nonlocal completed, rejected
+        while time.perf_counter() < deadline:
+            # Unique text per request, so every call reaches the model
+            text = f"The patient reports chest pain since yesterday ({next(counter)})."
+            started = time.perf_counter()
+            try:
+                await analyze(text)
+            except QueueFullError:
+                rejected += 1
+                await asyncio.sleep(0.05)  # client backs off on 503
+                continue
+            completed += 1
+            latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(0)  # next request arrives via the loop, as over HTTP
+
+    lags: list[float] = []
+    stop = asyncio.Event()
+    prober = asyncio.create_task(probe(lags, stop))
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    stop.set()
+    await prober
+    lag_ms = np.array(lags) * 1000
+    return {
+        "throughput": completed / seconds,
+        "rejected": rejected,
+        "latency_p50_ms": float(np.percentile(latencies, 50)) * 1000 if latencies else None,
+        "lag_p50_ms": float(np.percentile(lag_ms, 50)),
+        "lag_p99_ms": float(np.percentile(lag_ms, 99)),
+        "lag_max_ms": float(lag_ms.max()),
+    }
+
+
+async def main(args) -> None:
+    model = FakeModel(args.latency_ms / 1000)
+    ai_service.model = model
+    ai_service.gemini_configured = True
+    stats = ai_service.executor.stats()
+    print(f"fake model: {args.latency_ms:.0f} ms/call  executor: {stats['max_concurrency']} slots, "
+          f"{stats['max_queue']} queued")
+    for mode in args.modes:
+        for concurrency in args.concurrency:
+            result = await run_level(mode, concurrency, args.seconds, model)
+            print(f"{mode:8s} c={concurrency:4d}: {result['throughput']:7.1f} req/s  "
+                  f"rejected {result['rejected']:5d}  loop lag p50 {result['lag_p50_ms']:7.1f} ms  "
+                  f"p99 {result['lag_p99_ms']:7.1f} ms  max {result['lag_max_ms']:7.1f} ms")
+    await ai_service.shutdown()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--modes", nargs="+", default=["inline", "executor"], choices=["inline", "executor"])
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="fake model call latency")
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration of each level")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,80 @@
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from app.jobs.course import course_jobs
+from app.ingest.pdf import UploadTooLargeError, pdf_ingestor
+from pathlib import Path
+import json
+import logging
+
+router = APIRouter(tags=["courses"])
+logger = logging.getLogger(__name__)
+
+# --- Request Models ---
+
+class GenerateCourseRequest(BaseModel):
+    topic: str
+    source: str = ""
+
+# --- Endpoints ---
+
+@router.post("/generate/course", status_code=202)
+async def create_course(request: GenerateCourseRequest):
+    """
+    Start a background course generation job.
+
+    Poll `/jobs/{job_id}` for status or follow `/jobs/{job_id}/stream`
+    to receive lessons as they finish.
+    """
+    job = course_jobs.submit(request.topic, request.source)
+    return {"job_id": job.id, "status": job.status}
+
+@router.post("/generate/course/upload", status_code=202)
+async def create_course_from_pdf(file: UploadFile = File(...), topic: str = Form("")):
+    """
+    Start a course generation job from an uploaded PDF.
+
+    The upload is spooled to disk; text extraction and chunk summarization
+    run inside the job, reusing summaries of chunks seen in earlier uploads.
+    """
+    if file.content_type not in ("application/pdf", "application/octet-stream"):
+        raise HTTPException(status_code=415, detail="Only PDF uploads are supported")
+    try:
+        path = await pdf_ingestor.save_upload(file)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    job = course_jobs.submit(topic or Path(file.filename or "Uploaded document").stem, document_path=path)
+    return {"job_id": job.id, "status": job.status}
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Job status; includes the full course once completed."""
+    job = course_jobs.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    result = job.summary()
+    if job.status == "completed":
+        result["course"] = job.course()
+    return result
+
+@router.post("/jobs/{job_id}/resume", status_code=202)
+async def resume_job(job_id: str):
+    """Retry a failed job from its last checkpoint."""
+    if job_id not in course_jobs.jobs:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return course_jobs.resume(job_id).summary()
+
+@router.get("/jobs/{job_id}/stream")
+async def stream_job(job_id: str):
+    """
+    Server-Sent Events: `outline`, one `lesson` per finished lesson, then
+    `completed` or `failed`. Reconnecting replays everything finished so far.
+    """
+    if job_id not in course_jobs.jobs:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        async for event, data in course_jobs.subscribe(job_id):
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
@@ -1,7 +1,11 @@
 from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List
 from app.llm.generators import generate_quiz, generate_mnemonic, Quiz, MnemonicInsight
+from app.llm.cache import generation_cache, normalize
+from app.llm.batching import stream_mnemonic_insights
+import json
 import logging
 
 router = APIRouter(prefix="/study", tags=["study"])
@@ -18,6 +22,10 @@ class GenerateMnemonicRequest(BaseModel):
     term: str
     context: str = ""
 
+class GenerateMnemonicBatchRequest(BaseModel):
+    terms: List[str]
+    context: str = ""
+
 # --- Endpoints ---
 
 @router.post("/quiz/generate", response_model=Quiz)
@@ -26,7 +34,14 @@ async def create_quiz(request: GenerateQuizRequest):
     Generate a quiz on a specific topic.
     """
     try:
-        quiz = await generate_quiz(request.topic, request.difficulty, request.count)
+        quiz = await generation_cache.get_or_generate(
+            f"quiz:{normalize(request.difficulty)}:{request.count}",
+            request.topic,
+            lambda: generate_quiz(request.topic, request.difficulty, request.count),
+            Quiz,
+            # Near-duplicate topics ("Cardiology Basics" / "Basics of cardiology") share quizzes
+            semantic=True,
+        )
         return quiz
     except ValueError as e:
         # Likely missing API key
@@ -35,14 +50,49 @@ async def create_quiz(request: GenerateQuizRequest):
         logger.error(f"Quiz generation failed: {e}")
         raise HTTPException(status_code=500, detail="Failed to generate quiz. Please try again.")
 
+@router.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss counters for the generated-content cache."""
+    return generation_cache.stats()
+
 @router.post("/flashcards/insight", response_model=MnemonicInsight)
 async def get_flashcard_insight(request: GenerateMnemonicRequest):
     """
     Generate mnemonic and etymology for a flashcard term.
     """
     try:
-        insight = await generate_mnemonic(request.term, request.context)
+        # Exact match only: similar terms (myocarditis/pericarditis) need their own insight
+        insight = await generation_cache.get_or_generate(
+            generation_cache.mnemonic_namespace(request.context),
+            request.term,
+            lambda: generate_mnemonic(request.term, request.context),
+            MnemonicInsight,
+        )
         return insight
     except Exception as e:
         logger.error(f"Mnemonic generation failed: {e}")
         raise HTTPException(status_code=500, detail="Failed to generate insight.")
+
+@router.post("/flashcards/insights/batch")
+async def get_flashcard_insights_batch(request: GenerateMnemonicBatchRequest):
+    """
+    Generate mnemonics and etymologies for a whole deck.
+
+    Terms are packed into a few structured-output prompts and results are
+    streamed back as NDJSON, one line per unique term:
+    {"term": ..., "insight": {...}} or {"term": ..., "error": ...}.
+    """
+    if not request.terms:
+        raise HTTPException(status_code=400, detail="At least one term is required")
+    if len(request.terms) > 1000:
+        raise HTTPException(status_code=413, detail="Batch limited to 1000 terms")
+
+    async def stream_lines():
+        async for term, insight, error in stream_mnemonic_insights(request.terms, request.context, generation_cache):
+            if insight is not None:
+                line = {"term": term, "insight": insight.model_dump()}
+            else:
+                line = {"term": term, "error": error}
+            yield json.dumps(line) + "\n"
+
+    return StreamingResponse(stream_lines(), media_type="application/x-ndjson")
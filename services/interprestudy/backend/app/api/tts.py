@@ -0,0 +1,135 @@
+from fastapi import APIRouter, HTTPException, Header, Query
+from fastapi.responses import StreamingResponse, FileResponse
+from pydantic import BaseModel
+from typing import Optional, List, Dict
+from app.tts import get_tts, audio_cache, turn_synthesizer
+from app.tts.transcode import DEFAULT_ENCODING, ENCODINGS, TranscodeOptions, negotiate, transcoder
+import logging
+
+router = APIRouter(prefix="/tts", tags=["tts"])
+logger = logging.getLogger(__name__)
+
+# --- Request Models ---
+
+class ScenarioAudioRequest(BaseModel):
+    dialogue_text: str
+    speaker_configs: Optional[List[Dict[str, str]]] = None
+    temperature: float = 1.0
+    # Synthesize speaker turns in parallel and stitch them (faster for long dialogues)
+    parallel: bool = False
+    silence_ms: Optional[int] = None
+
+class ScenarioAudioResponse(BaseModel):
+    audio_id: str
+    url: str
+    cached: bool
+
+# --- Endpoints ---
+
+@router.post("/scenario", response_model=ScenarioAudioResponse)
+async def create_scenario_audio(request: ScenarioAudioRequest):
+    """
+    Synthesize a scenario (or reuse an identical earlier one).
+
+    The audio is content-addressed: the same dialogue, voices and settings
+    always map to the same `audio_id`, served from `url`.
+    """
+    try:
+        tts = get_tts()
+        if request.parallel:
+            audio_id, _, cached = await turn_synthesizer.get_or_synthesize(
+                tts, request.dialogue_text, request.speaker_configs, request.temperature, request.silence_ms
+            )
+        else:
+            audio_id, _, cached = await audio_cache.get_or_synthesize(
+                tts, request.dialogue_text, request.speaker_configs, request.temperature
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        logger.error(f"TTS generation failed: {e}")
+        raise HTTPException(status_code=502, detail="Failed to generate audio.")
+    return ScenarioAudioResponse(audio_id=audio_id, url=f"/api/tts/audio/{audio_id}", cached=cached)
+
+@router.get("/audio/{audio_id}")
+async def get_scenario_audio(
+    audio_id: str,
+    accept: Optional[str] = Header(None),
+    audio_format: Optional[str] = Query(None, alias="format", description="opus, mp3 or wav; overrides Accept"),
+    sample_rate: Optional[int] = Query(None, ge=8000, le=48000),
+    normalize: bool = False,
+):
+    """
+    Serve cached audio, compressed to Opus or MP3 when the client accepts it.
+
+    Encoded variants are produced once and cached. Supports Range requests
+    for seeking; files are sent with zero-copy pathsend where the server
+    supports it.
+    """
+    if not audio_cache.is_key(audio_id):
+        raise HTTPException(status_code=404, detail="Audio not found")
+    path = audio_cache.lookup(audio_id)
+    if path is None or path.suffix != ".wav":
+        raise HTTPException(status_code=404, detail="Audio not found")
+
+    encoding = audio_format or negotiate(accept, DEFAULT_ENCODING)
+    if encoding not in ENCODINGS:
+        raise HTTPException(status_code=406, detail="Supported formats: audio/ogg (Opus), audio/mpeg, audio/wav")
+
+    if encoding != "wav" or sample_rate or normalize:
+        options = TranscodeOptions(encoding, sample_rate, normalize)
+        try:
+            path = await transcoder.get_or_transcode(audio_id, path, options)
+        except Exception as e:
+            logger.error(f"Transcoding {audio_id} to {options.variant} failed: {e}")
+            raise HTTPException(status_code=500, detail="Failed to encode audio.")
+
+    return FileResponse(
+        path,
+        media_type=ENCODINGS[encoding].media_type,
+        headers={
+            # Content-addressed: the bytes behind an id never change
+            "Cache-Control": "public, max-age=31536000, immutable",
+            "Vary": "Accept",
+        },
+    )
+
+@router.get("/transcode/stats")
+async def transcode_stats():
+    """Compression ratio and encode throughput of the transcoding stage."""
+    return transcoder.stats()
+
+@router.get("/cache/stats")
+async def audio_cache_stats():
+    """Size and hit/miss counters for the scenario audio cache."""
+    return audio_cache.stats()
+
+@router.post("/scenario/stream")
+async def stream_scenario_audio(request: ScenarioAudioRequest):
+    """
+    Stream a multi-speaker scenario as WAV while it is being generated.
+
+    The browser can start playback as soon as the first chunk arrives.
+    """
+    try:
+        tts = get_tts()
+    except ValueError as e:
+        # Missing API key
+        raise HTTPException(status_code=500, detail=str(e))
+
+    stream = tts.stream_wav(request.dialogue_text, request.speaker_configs, request.temperature)
+    try:
+        # Surface generation errors as HTTP errors instead of a truncated stream
+        first = await anext(stream)
+    except StopAsyncIteration:
+        raise HTTPException(status_code=502, detail="No audio was generated.")
+    except Exception as e:
+        logger.error(f"TTS generation failed: {e}")
+        raise HTTPException(status_code=502, detail="Failed to generate audio.")
+
+    async def body():
+        yield first
+        async for chunk in stream:
+            yield chunk
+
+    return StreamingResponse(body(), media_type="audio/wav")
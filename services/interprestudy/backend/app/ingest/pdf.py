@@ -0,0 +1,382 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.llm.generators import ChunkSummary, generate_chunk_summary
+
+try:
+    from pypdf import PdfReader
+    PYPDF_AVAILABLE = True
+except ImportError:
+    PYPDF_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+Summarizer = Callable[[str], Awaitable[ChunkSummary]]
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"[A-Za-z][A-Za-z-]{5,}")
+
+
+class UploadTooLargeError(ValueError):
+    """An upload exceeded the ingestor's `max_upload_bytes`."""
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+@dataclass
+class Chunk:
+    hash: str
+    text: str
+    page_start: int
+    page_end: int
+
+
+@dataclass
+class IngestResult:
+    document_id: str
+    chunk_hashes: List[str]
+    summaries: Dict[str, ChunkSummary]
+    pages: int
+    reused: int
+    summarized: int
+
+    def course_source(self, max_tokens: int) -> str:
+        """Chunk summaries in document order, trimmed to a prompt budget."""
+        parts, used = [], 0
+        for chunk_hash in self.chunk_hashes:
+            summary = self.summaries.get(chunk_hash)
+            if summary is None:
+                continue
+            line = summary.summary
+            if summary.key_terms:
+                line += f" (Key terms: {', '.join(summary.key_terms)})"
+            used += estimate_tokens(line)
+            if used > max_tokens:
+                break
+            parts.append(f"- {line}")
+        return "\n".join(parts)
+
+
+# --- Extraction & chunking ---
+
+def iter_pages(path: str) -> Iterator[Tuple[int, str]]:
+    """Yield (page_number, text) one page at a time."""
+    if not PYPDF_AVAILABLE:
+        raise RuntimeError("pypdf is not installed")
+    reader = PdfReader(path)
+    for number, page in enumerate(reader.pages, start=1):
+        yield number, page.extract_text() or ""
+
+
+def _units(text: str, max_tokens: int) -> Iterator[str]:
+    """Whitespace-normalized lines; over-long lines are split on sentences."""
+    for line in text.splitlines():
+        line = " ".join(line.split())
+        if not line:
+            continue
+        if estimate_tokens(line) <= max_tokens:
+            yield line
+            continue
+        for sentence in _SENTENCE_END.split(line):
+            # A single run-on "sentence" still has to fit in one chunk
+            for start in range(0, len(sentence), max_tokens * 4):
+                yield sentence[start:start + max_tokens * 4]
+
+
+def chunk_pages(
+    pages: Iterator[Tuple[int, str]],
+    min_tokens: int = 300,
+    max_tokens: int = 800,
+    boundary_divisor: int = 8,
+) -> Iterator[Chunk]:
+    """
+    Content-defined chunking over the document's text lines.
+
+    A chunk ends after a line whose own hash hits `boundary_divisor` (once
+    `min_tokens` is reached), or at `max_tokens`. Because boundaries depend
+    only on nearby content, not on page numbers or absolute offsets, an edit
+    in one section changes the hash of that chunk and leaves the rest of the
+    document's chunks (and their cached summaries) intact.
+    """
+    lines: List[str] = []
+    tokens = 0
+    page_start = page_end = 0
+
+    def flush() -> Chunk:
+        text = "\n".join(lines)
+        return Chunk(
+            hash=hashlib.sha256(text.encode("utf-8")).hexdigest(),
+            text=text,
+            page_start=page_start,
+            page_end=page_end,
+        )
+
+    for number, text in pages:
+        for line in _units(text, max_tokens):
+            line_tokens = estimate_tokens(line)
+            if lines and tokens + line_tokens > max_tokens:
+                yield flush()
+                lines, tokens = [], 0
+            if not lines:
+                page_start = number
+            lines.append(line)
+            tokens += line_tokens
+            page_end = number
+            digest = hashlib.blake2b(line.encode("utf-8"), digest_size=4).digest()
+            if tokens >= min_tokens and int.from_bytes(digest, "big") % boundary_divisor == 0:
+                yield flush()
+                lines, tokens = [], 0
+    if lines:
+        yield flush()
+
+
+# --- Offline summarizer ---
+
+async def extractive_summary(text: str) -> ChunkSummary:
+    """LLM-free fallback: leading sentences plus the most frequent long words."""
+    flat = " ".join(text.split())
+    sentences = _SENTENCE_END.split(flat)
+    summary = " ".join(sentences[:2])[:600]
+    counts = Counter(word.lower() for word in _WORD.findall(flat))
+    return ChunkSummary(summary=summary, key_terms=[word for word, _ in counts.most_common(5)])
+
+
+# --- Chunk index ---
+
+class ChunkIndex:
+    """
+    SQLite index of chunk summaries (by content hash) and documents.
+
+    Summaries are keyed only by chunk hash, so identical passages are
+    summarized once across re-uploads and across different documents.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS chunks (hash TEXT PRIMARY KEY, summary TEXT NOT NULL, tokens INTEGER NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents (id TEXT PRIMARY KEY, name TEXT, pages INTEGER, chunk_hashes TEXT NOT NULL)"
+            )
+
+    def get_summaries(self, hashes: List[str]) -> Dict[str, ChunkSummary]:
+        if not hashes:
+            return {}
+        placeholders = ",".join("?" * len(hashes))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT hash, summary FROM chunks WHERE hash IN ({placeholders})", hashes
+            ).fetchall()
+        return {chunk_hash: ChunkSummary(**json.loads(summary)) for chunk_hash, summary in rows}
+
+    def put_summary(self, chunk_hash: str, summary: ChunkSummary, tokens: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO chunks (hash, summary, tokens) VALUES (?, ?, ?)",
+                (chunk_hash, summary.model_dump_json(), tokens),
+            )
+
+    def get_document(self, document_id: str) -> Optional[Tuple[int, List[str]]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT pages, chunk_hashes FROM documents WHERE id = ?", (document_id,)
+            ).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def put_document(self, document_id: str, name: str, pages: int, chunk_hashes: List[str]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents (id, name, pages, chunk_hashes) VALUES (?, ?, ?, ?)",
+                (document_id, name, pages, json.dumps(chunk_hashes)),
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+# --- Ingestor ---
+
+class PdfIngestor:
+    """
+    Incremental PDF ingestion: extract page by page, chunk, summarize.
+
+    Pages are pulled lazily in a worker thread, so only the current page and
+    the in-flight chunks are held in memory. Chunks whose hash is already in
+    the index reuse their stored summary; the rest are summarized
+    concurrently (at most `concurrency` at a time). Each summary is written
+    as soon as it finishes, so an interrupted ingestion resumes where it
+    stopped on the next attempt.
+    """
+
+    def __init__(
+        self,
+        index_path: str,
+        upload_dir: str,
+        concurrency: int = 8,
+        min_chunk_tokens: int = 300,
+        max_chunk_tokens: int = 800,
+        source_max_tokens: int = 6000,
+        max_upload_bytes: int = 50 * 1024 * 1024,
+        summarizer: Optional[Summarizer] = None,
+    ):
+        self.index_path = index_path
+        self.upload_dir = Path(upload_dir)
+        self.concurrency = concurrency
+        self.min_chunk_tokens = min_chunk_tokens
+        self.max_chunk_tokens = max_chunk_tokens
+        self.source_max_tokens = source_max_tokens
+        self.max_upload_bytes = max_upload_bytes
+        self._summarizer = summarizer
+        self._index: Optional[ChunkIndex] = None
+
+    @property
+    def index(self) -> ChunkIndex:
+        if self._index is None:
+            self._index = ChunkIndex(self.index_path)
+        return self._index
+
+    @property
+    def summarizer(self) -> Summarizer:
+        if self._summarizer is None:
+            mode = os.getenv("INGEST_SUMMARIZER", "auto")
+            has_key = "placeholder" not in os.getenv("OPENAI_API_KEY", "placeholder")
+            use_llm = mode == "llm" or (mode == "auto" and has_key)
+            self._summarizer = generate_chunk_summary if use_llm else extractive_summary
+        return self._summarizer
+
+    def close(self) -> None:
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+
+    async def save_upload(self, upload, chunk_size: int = 1024 * 1024) -> str:
+        """
+        Spool an UploadFile to disk in fixed-size chunks; returns its path.
+
+        File I/O runs in worker threads. Raises UploadTooLargeError (and
+        removes the partial file) once more than `max_upload_bytes` arrive.
+        """
+        fd, tmp_path = await asyncio.to_thread(self._create_spool_file)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                while chunk := await upload.read(chunk_size):
+                    size += len(chunk)
+                    if size > self.max_upload_bytes:
+                        raise UploadTooLargeError(f"Upload exceeds {self.max_upload_bytes} bytes")
+                    digest.update(chunk)
+                    await asyncio.to_thread(f.write, chunk)
+            path = self.upload_dir / f"{digest.hexdigest()}.pdf"
+            await asyncio.to_thread(os.replace, tmp_path, path)
+        except BaseException:
+            await asyncio.to_thread(os.unlink, tmp_path)
+            raise
+        return str(path)
+
+    def _create_spool_file(self) -> Tuple[int, str]:
+        self.upload_dir.mkdir(parents=True, exist_ok=True)
+        return tempfile.mkstemp(dir=self.upload_dir, suffix=".part")
+
+    async def ingest_file(self, path: str, name: str = "") -> IngestResult:
+        document_id = await asyncio.to_thread(self._file_hash, path)
+        index = self.index
+
+        known = await asyncio.to_thread(index.get_document, document_id)
+        if known is not None:
+            pages, chunk_hashes = known
+            summaries = await asyncio.to_thread(index.get_summaries, chunk_hashes)
+            if len(summaries) == len(set(chunk_hashes)):
+                return IngestResult(document_id, chunk_hashes, summaries, pages, len(summaries), 0)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        summaries: Dict[str, ChunkSummary] = {}
+        chunk_hashes: List[str] = []
+        tasks: List[asyncio.Task] = []
+        pages_seen = 0
+        reused = 0
+
+        async def summarize(chunk: Chunk) -> None:
+            try:
+                summary = await self.summarizer(chunk.text)
+                await asyncio.to_thread(index.put_summary, chunk.hash, summary, estimate_tokens(chunk.text))
+                summaries[chunk.hash] = summary
+            finally:
+                semaphore.release()
+
+        def page_counter() -> Iterator[Tuple[int, str]]:
+            nonlocal pages_seen
+            for number, text in iter_pages(path):
+                pages_seen = number
+                yield number, text
+
+        chunks = chunk_pages(page_counter(), self.min_chunk_tokens, self.max_chunk_tokens)
+        try:
+            while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+                chunk_hashes.append(chunk.hash)
+                if chunk.hash in summaries:
+                    continue
+                cached = await asyncio.to_thread(index.get_summaries, [chunk.hash])
+                if cached:
+                    summaries.update(cached)
+                    reused += 1
+                    continue
+                # Backpressure: stop extracting while `concurrency` summaries are in flight
+                await semaphore.acquire()
+                summaries[chunk.hash] = None  # claimed; duplicates in this document are skipped
+                tasks.append(asyncio.create_task(summarize(chunk)))
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            raise errors[0]
+
+        await asyncio.to_thread(index.put_document, document_id, name or Path(path).name, pages_seen, chunk_hashes)
+        logger.info(
+            f"Ingested {name or path}: {pages_seen} pages, {len(chunk_hashes)} chunks, "
+            f"{reused} reused, {len(tasks)} summarized"
+        )
+        return IngestResult(document_id, chunk_hashes, summaries, pages_seen, reused, len(tasks))
+
+    async def course_source(self, path: str) -> str:
+        """Ingest a spooled PDF and return prompt-ready source material."""
+        result = await self.ingest_file(path)
+        return result.course_source(self.source_max_tokens)
+
+    @staticmethod
+    def _file_hash(path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(1024 * 1024):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+
+pdf_ingestor = PdfIngestor(
+    index_path=os.getenv("INGEST_INDEX_PATH", "/tmp/interprestudy/ingest/chunks.sqlite3"),
+    upload_dir=os.getenv("INGEST_UPLOAD_DIR", "/tmp/interprestudy/ingest/uploads"),
+    concurrency=int(os.getenv("INGEST_SUMMARY_CONCURRENCY", "8")),
+    source_max_tokens=int(os.getenv("INGEST_SOURCE_MAX_TOKENS", "6000")),
+    max_upload_bytes=int(os.getenv("INGEST_MAX_UPLOAD_BYTES", str(50 * 1024 * 1024))),
+)
@@ -0,0 +1,338 @@
+import asyncio
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.ingest.pdf import pdf_ingestor
+from app.llm.generators import CourseOutline, Lesson, generate_course_outline, generate_lesson
+
+logger = logging.getLogger(__name__)
+
+LessonKey = Tuple[int, int]
+
+
+@dataclass
+class CourseJob:
+    id: str
+    topic: str
+    source: str = ""
+    document_path: Optional[str] = None
+    status: str = "queued"  # queued | running | completed | failed
+    outline: Optional[CourseOutline] = None
+    lessons: Dict[LessonKey, Lesson] = field(default_factory=dict)
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    subscribers: List[asyncio.Queue] = field(default_factory=list)
+
+    @property
+    def total_lessons(self) -> Optional[int]:
+        if self.outline is None:
+            return None
+        return sum(len(module.lesson_titles) for module in self.outline.modules)
+
+    def summary(self) -> dict:
+        return {
+            "job_id": self.id,
+            "topic": self.topic,
+            "status": self.status,
+            "completed_lessons": len(self.lessons),
+            "total_lessons": self.total_lessons,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+    def course(self) -> dict:
+        """Full course JSON (courses -> modules -> lessons)."""
+        return {
+            "title": self.outline.title,
+            "description": self.outline.description,
+            "modules": [
+                {
+                    "title": module.title,
+                    "lessons": [
+                        self.lessons[(m, l)].model_dump()
+                        for l in range(len(module.lesson_titles))
+                        if (m, l) in self.lessons
+                    ],
+                }
+                for m, module in enumerate(self.outline.modules)
+            ],
+        }
+
+
+class CourseJobEngine:
+    """
+    Background course generation with parallel fan-out and checkpoints.
+
+    After the outline is generated, every lesson of every module is
+    generated concurrently (bounded by `concurrency`), so course latency
+    tracks the slowest lesson instead of the sum of all modules. Each
+    finished lesson is checkpointed to `checkpoint_dir/<job_id>/`; a failed
+    or interrupted job resumes from its checkpoints instead of restarting.
+    Subscribers receive lessons as they complete.
+
+    Finished (completed or failed) jobs are kept for `job_ttl_seconds`
+    after they finish, then dropped together with their checkpoint
+    directory and, unless another job still uses it, their uploaded
+    document; 0 keeps them forever.
+    """
+
+    def __init__(
+        self,
+        checkpoint_dir: str,
+        concurrency: int = 6,
+        module_count: int = 5,
+        lesson_count: int = 3,
+        job_ttl_seconds: int = 24 * 3600,
+        persist: Optional[Callable[[CourseJob], Awaitable[None]]] = None,
+        ingest: Optional[Callable[[str], Awaitable[str]]] = None,
+    ):
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.concurrency = concurrency
+        self.module_count = module_count
+        self.lesson_count = lesson_count
+        self.job_ttl_seconds = job_ttl_seconds
+        # Hook for database persistence of the finished course
+        self.persist = persist
+        # Turns an uploaded document into source material for the prompts
+        self.ingest = ingest
+        self.jobs: Dict[str, CourseJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._sweeper: Optional[asyncio.Task] = None
+
+    # --- Lifecycle ---
+
+    async def start(self) -> None:
+        """Reload checkpointed jobs and resume the unfinished ones."""
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        for job in await asyncio.to_thread(self._load_all):
+            self.jobs[job.id] = job
+            if job.status in ("queued", "running"):
+                logger.info(f"Resuming course job {job.id} ({len(job.lessons)} lessons checkpointed)")
+                self._spawn(job)
+        if self.job_ttl_seconds > 0:
+            await self.evict_expired()
+            self._sweeper = asyncio.create_task(self._sweep())
+
+    async def close(self) -> None:
+        tasks = list(self._tasks.values())
+        if self._sweeper is not None:
+            tasks.append(self._sweeper)
+            self._sweeper = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def evict_expired(self, now: Optional[float] = None) -> int:
+        """Drop finished jobs older than `job_ttl_seconds`, their checkpoints and unshared uploads."""
+        if self.job_ttl_seconds <= 0:
+            return 0
+        now = time.time() if now is None else now
+        expired = [
+            job for job in self.jobs.values()
+            if job.status in ("completed", "failed")
+            and job.finished_at is not None
+            and now - job.finished_at > self.job_ttl_seconds
+            and job.id not in self._tasks
+        ]
+        for job in expired:
+            del self.jobs[job.id]
+            await asyncio.to_thread(shutil.rmtree, self.checkpoint_dir / job.id, True)
+        # Uploads are stored by content hash and may be shared between jobs
+        live = {job.document_path for job in self.jobs.values()}
+        for job in expired:
+            if job.document_path and job.document_path not in live:
+                await asyncio.to_thread(self._remove_upload, job.document_path, job.finished_at)
+        if expired:
+            logger.info(f"Evicted {len(expired)} finished course jobs")
+        return len(expired)
+
+    @staticmethod
+    def _remove_upload(path: str, finished_at: float) -> None:
+        try:
+            # Newer than the job: uploaded again since, for a job not submitted yet
+            if os.stat(path).st_mtime <= finished_at:
+                os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    async def _sweep(self) -> None:
+        interval = min(self.job_ttl_seconds, 600)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.evict_expired()
+            except Exception as e:
+                logger.warning(f"Course job eviction failed: {e}")
+
+    # --- Public API ---
+
+    def submit(self, topic: str, source: str = "", document_path: Optional[str] = None) -> CourseJob:
+        job = CourseJob(id=uuid.uuid4().hex, topic=topic, source=source, document_path=document_path)
+        self.jobs[job.id] = job
+        self._spawn(job)
+        return job
+
+    def resume(self, job_id: str) -> CourseJob:
+        job = self.jobs[job_id]
+        if job.status == "failed":
+            job.status, job.error = "queued", None
+            self._spawn(job)
+        return job
+
+    async def subscribe(self, job_id: str) -> AsyncIterator[Tuple[str, dict]]:
+        """Yield (event, data): already-finished lessons first, then live ones."""
+        job = self.jobs[job_id]
+        queue: asyncio.Queue = asyncio.Queue()
+        job.subscribers.append(queue)
+        try:
+            replayed = sorted(job.lessons.items())
+            replayed_outline = job.outline is not None
+            if replayed_outline:
+                yield "outline", job.outline.model_dump()
+            for (m, l), lesson in replayed:
+                yield "lesson", {"module": m, "lesson": l, **lesson.model_dump()}
+            seen = {key for key, _ in replayed}
+            if job.status in ("completed", "failed"):
+                yield job.status, job.summary()
+                return
+            while True:
+                event, data = await queue.get()
+                # Skip anything already sent during the replay above
+                if event == "outline" and replayed_outline:
+                    continue
+                if event == "lesson" and (data["module"], data["lesson"]) in seen:
+                    continue
+                yield event, data
+                if event in ("completed", "failed"):
+                    return
+        finally:
+            job.subscribers.remove(queue)
+
+    # --- Execution ---
+
+    def _spawn(self, job: CourseJob) -> None:
+        task = asyncio.create_task(self._run(job))
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.id, None))
+
+    def _publish(self, job: CourseJob, event: str, data: dict) -> None:
+        for queue in job.subscribers:
+            queue.put_nowait((event, data))
+
+    async def _run(self, job: CourseJob) -> None:
+        job.status = "running"
+        await self._save(job, "job.json", self._job_meta(job))
+        try:
+            if job.document_path and not job.source:
+                job.source = await self.ingest(job.document_path)
+                await self._save(job, "job.json", self._job_meta(job))
+
+            if job.outline is None:
+                job.outline = await generate_course_outline(
+                    job.topic, self.module_count, self.lesson_count, job.source
+                )
+                await self._save(job, "outline.json", job.outline.model_dump())
+                self._publish(job, "outline", job.outline.model_dump())
+
+            semaphore = asyncio.Semaphore(self.concurrency)
+            pending = [
+                (m, l, module.title, title)
+                for m, module in enumerate(job.outline.modules)
+                for l, title in enumerate(module.lesson_titles)
+                if (m, l) not in job.lessons
+            ]
+
+            async def run_lesson(m: int, l: int, module_title: str, lesson_title: str) -> None:
+                async with semaphore:
+                    lesson = await generate_lesson(job.outline.title, module_title, lesson_title, job.source)
+                job.lessons[(m, l)] = lesson
+                await self._save(job, f"lessons/{m}_{l}.json", lesson.model_dump())
+                self._publish(job, "lesson", {"module": m, "lesson": l, **lesson.model_dump()})
+
+            # Let sibling lessons finish (and checkpoint) even if one fails
+            results = await asyncio.gather(*(run_lesson(*args) for args in pending), return_exceptions=True)
+            errors = [r for r in results if isinstance(r, BaseException)]
+            if errors:
+                raise errors[0]
+
+            await self._save(job, "course.json", job.course())
+            if self.persist is not None:
+                await self.persist(job)
+            job.status = "completed"
+        except asyncio.CancelledError:
+            # Shutdown: leave status as running so start() resumes it
+            raise
+        except Exception as e:
+            logger.error(f"Course job {job.id} failed: {e}")
+            job.status, job.error = "failed", str(e)
+        job.finished_at = time.time()
+        await self._save(job, "job.json", self._job_meta(job))
+        self._publish(job, job.status, job.summary())
+
+    # --- Checkpoints ---
+
+    @staticmethod
+    def _job_meta(job: CourseJob) -> dict:
+        return {
+            "id": job.id,
+            "topic": job.topic,
+            "source": job.source,
+            "document_path": job.document_path,
+            "status": job.status,
+            "error": job.error,
+            "created_at": job.created_at,
+            "finished_at": job.finished_at,
+        }
+
+    async def _save(self, job: CourseJob, name: str, data: dict) -> None:
+        await asyncio.to_thread(self._write_json, self.checkpoint_dir / job.id / name, data)
+
+    @staticmethod
+    def _write_json(path: Path, data: dict) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def _load_all(self) -> List[CourseJob]:
+        jobs = []
+        for meta_path in self.checkpoint_dir.glob("*/job.json"):
+            try:
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+                job = CourseJob(
+                    id=meta["id"],
+                    topic=meta["topic"],
+                    source=meta.get("source", ""),
+                    document_path=meta.get("document_path"),
+                    status=meta["status"],
+                    error=meta.get("error"),
+                    created_at=meta["created_at"],
+                    finished_at=meta.get("finished_at"),
+                )
+                outline_path = meta_path.parent / "outline.json"
+                if outline_path.exists():
+                    job.outline = CourseOutline(**json.loads(outline_path.read_text(encoding="utf-8")))
+                for lesson_path in (meta_path.parent / "lessons").glob("*.json"):
+                    m, l = (int(part) for part in lesson_path.stem.split("_"))
+                    job.lessons[(m, l)] = Lesson(**json.loads(lesson_path.read_text(encoding="utf-8")))
+                jobs.append(job)
+            except Exception as e:
+                logger.warning(f"Skipping unreadable job checkpoint {meta_path.parent}: {e}")
+        return jobs
+
+
+course_jobs = CourseJobEngine(
+    checkpoint_dir=os.getenv("COURSE_CHECKPOINT_DIR", "/tmp/interprestudy/course_jobs"),
+    concurrency=int(os.getenv("COURSE_GENERATION_CONCURRENCY", "6")),
+    job_ttl_seconds=int(os.getenv("COURSE_JOB_TTL_SECONDS", str(24 * 3600))),
+    ingest=pdf_ingestor.course_source,
+)
@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import os
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from app.llm.cache import GenerationCache
+from app.llm.generators import MnemonicInsight, generate_mnemonics_batch
+
+logger = logging.getLogger(__name__)
+
+# Rough output budget per term (etymology sentence + mnemonic + JSON keys)
+TOKENS_PER_TERM_OUTPUT = 70
+
+
+def chunk_by_token_budget(terms: List[str], max_tokens: int, max_terms: int) -> List[List[str]]:
+    """Split terms into chunks whose estimated prompt+output tokens fit `max_tokens`."""
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    used = 0
+    for term in terms:
+        cost = len(term) // 4 + 1 + TOKENS_PER_TERM_OUTPUT
+        if current and (used + cost > max_tokens or len(current) >= max_terms):
+            chunks.append(current)
+            current, used = [], 0
+        current.append(term)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+async def stream_mnemonic_insights(
+    terms: List[str],
+    context: str,
+    cache: GenerationCache,
+    max_tokens: Optional[int] = None,
+    max_terms: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    retries: Optional[int] = None,
+) -> AsyncIterator[Tuple[str, Optional[MnemonicInsight], Optional[str]]]:
+    """
+    Yield (term, insight, error) for every unique term as soon as it is ready.
+
+    Cached terms are yielded first. The rest are packed into
+    token-budgeted chunks that run concurrently (bounded by `concurrency`);
+    terms missing from a chunk's parsed output are retried on their own in
+    smaller chunks, up to `retries` times.
+    """
+    max_tokens = max_tokens or int(os.getenv("INSIGHT_BATCH_MAX_TOKENS", "2000"))
+    max_terms = max_terms or int(os.getenv("INSIGHT_BATCH_MAX_TERMS", "25"))
+    concurrency = concurrency or int(os.getenv("INSIGHT_BATCH_CONCURRENCY", "4"))
+    retries = retries if retries is not None else int(os.getenv("INSIGHT_BATCH_RETRIES", "2"))
+
+    namespace = cache.mnemonic_namespace(context)
+    unique = list(dict.fromkeys(term.strip() for term in terms if term.strip()))
+
+    missing = []
+    for term in unique:
+        cached = await cache.peek(namespace, term, MnemonicInsight)
+        if cached is not None:
+            yield term, cached, None
+        else:
+            missing.append(term)
+
+    queue: asyncio.Queue = asyncio.Queue()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_chunk(chunk: List[str], attempt: int) -> None:
+        try:
+            async with semaphore:
+                insights: Dict[str, MnemonicInsight] = await generate_mnemonics_batch(chunk, context)
+        except Exception as e:
+            logger.warning(f"Insight batch of {len(chunk)} terms failed: {e}")
+            insights = {}
+            error = str(e)
+        else:
+            error = "Model returned no insight for this term"
+
+        # Only terms of this chunk count towards the consumer's total
+        insights = {term: insights[term] for term in chunk if term in insights}
+        for term, insight in insights.items():
+            # Deliver first: the consumer waits for exactly one entry per term
+            queue.put_nowait((term, insight, None))
+        for term, insight in insights.items():
+            try:
+                await cache.add(namespace, term, insight)
+            except Exception as e:
+                logger.warning(f"Caching insight for '{term}' failed: {e}")
+
+        failed = [term for term in chunk if term not in insights]
+        if failed and attempt < retries:
+            # Retry only what failed, in smaller chunks
+            smaller = max(1, len(chunk) // 2)
+            for retry_chunk in chunk_by_token_budget(failed, max_tokens, smaller):
+                spawn(retry_chunk, attempt + 1)
+        else:
+            for term in failed:
+                queue.put_nowait((term, None, error))
+
+    tasks: List[asyncio.Task] = []
+
+    def spawn(chunk: List[str], attempt: int) -> None:
+        tasks.append(asyncio.create_task(run_chunk(chunk, attempt)))
+
+    for chunk in chunk_by_token_budget(missing, max_tokens, max_terms):
+        spawn(chunk, 0)
+
+    try:
+        for _ in range(len(missing)):
+            yield await queue.get()
+    finally:
+        for task in tasks:
+            task.cancel()
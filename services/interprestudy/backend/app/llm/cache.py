@@ -0,0 +1,265 @@
+import json
+import logging
+import os
+import random
+import re
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, List, Optional, Type, TypeVar
+
+import numpy as np
+from pydantic import BaseModel
+
+try:
+    import redis.asyncio as redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T", bound=BaseModel)
+
+
+def normalize(text: str) -> str:
+    """Case/whitespace/punctuation-insensitive form used for exact keys."""
+    text = re.sub(r"[^\w\s-]", " ", text.casefold())
+    return " ".join(text.split())
+
+
+class LocalBackend:
+    """In-process LRU of variant pools with a TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, List[dict]]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[List[dict]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, variants = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return variants
+
+    async def add_variant(self, key: str, variant: dict, max_variants: int) -> None:
+        variants = (await self.get(key)) or []
+        variants = (variants + [variant])[-max_variants:]
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, variants)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisBackend:
+    """Shared variant pools in Redis lists (eviction via Redis' own maxmemory LRU policy)."""
+
+    def __init__(self, url: str, ttl_seconds: int, namespace: str = "interprestudy:gen"):
+        self._redis = redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace
+
+    async def get(self, key: str) -> Optional[List[dict]]:
+        raw = await self._redis.lrange(f"{self.namespace}:{key}", 0, -1)
+        return [json.loads(item) for item in raw] or None
+
+    async def add_variant(self, key: str, variant: dict, max_variants: int) -> None:
+        name = f"{self.namespace}:{key}"
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(name, json.dumps(variant))
+            pipe.ltrim(name, -max_variants, -1)
+            pipe.expire(name, self.ttl_seconds)
+            await pipe.execute()
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+class SemanticIndex:
+    """
+    Embedding-similarity lookup from a query to an already-cached exact key.
+
+    Vectors are kept L2-normalized in one matrix per namespace, so a lookup
+    is a single matrix-vector product. Oldest entries are dropped beyond
+    `max_entries` per namespace.
+    """
+
+    def __init__(self, threshold: float, max_entries: int):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._keys: dict[str, List[str]] = {}
+        self._vectors: dict[str, np.ndarray] = {}
+
+    def lookup(self, namespace: str, vector: np.ndarray) -> Optional[str]:
+        matrix = self._vectors.get(namespace)
+        if matrix is None or not len(matrix):
+            return None
+        scores = matrix @ vector
+        best = int(np.argmax(scores))
+        return self._keys[namespace][best] if scores[best] >= self.threshold else None
+
+    def add(self, namespace: str, key: str, vector: np.ndarray) -> None:
+        keys = self._keys.setdefault(namespace, [])
+        if key in keys:
+            return
+        matrix = self._vectors.get(namespace)
+        matrix = vector[None, :] if matrix is None else np.vstack([matrix, vector])
+        keys.append(key)
+        if len(keys) > self.max_entries:
+            del keys[0]
+            matrix = matrix[1:]
+        self._vectors[namespace] = matrix
+
+    def __len__(self) -> int:
+        return sum(len(keys) for keys in self._keys.values())
+
+
+class GenerationCache:
+    """
+    Two-level cache for generated study content.
+
+    1. Exact: keyed on the normalized request within a namespace (e.g.
+       "quiz:intermediate:5" + topic).
+    2. Semantic (opt-in per call): on an exact miss the query is embedded
+       and matched against previously cached queries in the same namespace,
+       so "cardiology basics" can reuse "Basics of Cardiology".
+
+    Each key holds a small pool of up to `max_variants` generated results.
+    Until the pool is full, requests generate a fresh variant and add it;
+    afterwards a random stored variant is served, so repeat learners don't
+    always get the identical quiz.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        ttl_seconds: int = 7 * 24 * 3600,
+        max_variants: int = 3,
+        semantic_threshold: float = 0.92,
+        redis_url: Optional[str] = None,
+        embed: Optional[Callable[[str], Awaitable[List[float]]]] = None,
+    ):
+        self.max_variants = max_variants
+        self.embed = embed
+        self.semantic = SemanticIndex(semantic_threshold, max_entries)
+        if redis_url and REDIS_AVAILABLE:
+            self.backend = RedisBackend(redis_url, ttl_seconds)
+            logger.info("Generation cache using Redis backend.")
+        else:
+            self.backend = LocalBackend(max_entries, ttl_seconds)
+
+        # Metrics
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def get_or_generate(
+        self,
+        namespace: str,
+        text: str,
+        generate: Callable[[], Awaitable[T]],
+        model: Type[T],
+        semantic: bool = False,
+    ) -> T:
+        key = f"{namespace}:{normalize(text)}"
+        variants = await self._get(key)
+
+        vector = None
+        if not variants and semantic and self.embed is not None:
+            try:
+                vector = await self._embed(text)
+                similar = self.semantic.lookup(namespace, vector)
+                if similar is not None:
+                    variants = await self.backend.get(similar)
+                    if variants:
+                        self.semantic_hits += 1
+                        return model(**random.choice(variants))
+            except Exception as e:
+                logger.warning(f"Semantic cache lookup failed: {e}")
+
+        if variants and len(variants) >= self.max_variants:
+            self.exact_hits += 1
+            return model(**random.choice(variants))
+
+        self.misses += 1
+        result = await generate()
+        try:
+            await self.backend.add_variant(key, result.model_dump(), self.max_variants)
+        except Exception as e:
+            # The result is still good; it just isn't cached this time
+            self.errors += 1
+            logger.warning(f"Generation cache write failed: {e}")
+        if vector is not None:
+            self.semantic.add(namespace, key, vector)
+        return result
+
+    async def peek(self, namespace: str, text: str, model: Type[T]) -> Optional[T]:
+        """Any stored variant for an exact key, without generating."""
+        variants = await self._get(f"{namespace}:{normalize(text)}")
+        if not variants:
+            return None
+        self.exact_hits += 1
+        return model(**random.choice(variants))
+
+    async def add(self, namespace: str, text: str, result: BaseModel) -> None:
+        await self.backend.add_variant(f"{namespace}:{normalize(text)}", result.model_dump(), self.max_variants)
+
+    async def _get(self, key: str) -> Optional[List[dict]]:
+        """Stored variants; None (a miss) if the backend is unavailable."""
+        try:
+            return await self.backend.get(key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Generation cache read failed: {e}")
+            return None
+
+    @staticmethod
+    def mnemonic_namespace(context: str) -> str:
+        return f"mnemonic:{normalize(context)}"
+
+    async def _embed(self, text: str) -> np.ndarray:
+        vector = np.asarray(await self.embed(normalize(text)), dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def stats(self) -> dict:
+        return {
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "semantic_entries": len(self.semantic),
+            "backend": type(self.backend).__name__,
+        }
+
+    async def close(self) -> None:
+        if isinstance(self.backend, RedisBackend):
+            await self.backend.close()
+
+
+def create_generation_cache(embed: Optional[Callable[[str], Awaitable[List[float]]]] = None) -> GenerationCache:
+    """GenerationCache configured from STUDY_CACHE_* / REDIS_URL env vars."""
+    return GenerationCache(
+        max_entries=int(os.getenv("STUDY_CACHE_MAX_ENTRIES", "2048")),
+        ttl_seconds=int(os.getenv("STUDY_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+        max_variants=int(os.getenv("STUDY_CACHE_VARIANTS", "3")),
+        semantic_threshold=float(os.getenv("STUDY_SEMANTIC_THRESHOLD", "0.92")),
+        redis_url=os.getenv("REDIS_URL"),
+        embed=embed,
+    )
+
+
+def _embed_with_registry(text: str) -> Awaitable[List[float]]:
+    from app.llm.generators import registry
+    return registry.embed(text)
+
+generation_cache = create_generation_cache(
+    embed=_embed_with_registry if os.getenv("STUDY_SEMANTIC_CACHE", "1") == "1" else None
+)
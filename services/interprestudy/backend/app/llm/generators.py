@@ -1,9 +1,11 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from pydantic import BaseModel, Field
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.exceptions import OutputParserException
+from langchain_core.runnables import Runnable
+import httpx
 import os
 import json
 import logging
@@ -27,38 +29,177 @@ class MnemonicInsight(BaseModel):
     etymology: str = Field(description="1-sentence etymology/origin of the term")
     mnemonic: str = Field(description="Short, funny or memorable mnemonic")
 
+class TermInsight(BaseModel):
+    term: str = Field(description="The term exactly as given")
+    etymology: str = Field(description="1-sentence etymology/origin of the term")
+    mnemonic: str = Field(description="Short, funny or memorable mnemonic")
+
+class MnemonicBatch(BaseModel):
+    insights: List[TermInsight] = Field(description="One entry per requested term")
+
+class ModuleOutline(BaseModel):
+    title: str = Field(description="Module title")
+    lesson_titles: List[str] = Field(description="Titles of the module's lessons")
+
+class CourseOutline(BaseModel):
+    title: str = Field(description="Course title")
+    description: str = Field(description="1-2 sentence course description")
+    modules: List[ModuleOutline] = Field(description="Ordered list of modules")
+
+class Lesson(BaseModel):
+    title: str = Field(description="Lesson title")
+    content: str = Field(description="Lesson content in Markdown")
+    terminology: List[str] = Field(description="Key terminology introduced in the lesson")
+    quiz: List[QuizQuestion] = Field(description="3-question quiz on the lesson")
+
+class ChunkSummary(BaseModel):
+    summary: str = Field(description="2-3 sentence summary of the passage")
+    key_terms: List[str] = Field(description="Key terminology that appears in the passage")
+
+# --- Prompts & Parsers (built once at import) ---
+
+QUIZ_PARSER = JsonOutputParser(pydantic_object=Quiz)
+QUIZ_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are an expert medical interpreter trainer. Create a quiz to test knowledge of medical terminology and interpreting concepts."),
+    ("user", "Create a {difficulty} level quiz with {count} questions about: {topic}.\nFormatting Instructions:\n{format_instructions}")
+]).partial(format_instructions=QUIZ_PARSER.get_format_instructions())
+
+MNEMONIC_PARSER = JsonOutputParser(pydantic_object=MnemonicInsight)
+MNEMONIC_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are a creative medical educator specialized in mnemonics and etymology."),
+    ("user", "For the medical term/root '{term}' (Context: {context}):\n1. Provide a 1-sentence etymology.\n2. Create a short, funny or memorable mnemonic.\n\n{format_instructions}")
+]).partial(format_instructions=MNEMONIC_PARSER.get_format_instructions())
+
+MNEMONIC_BATCH_PARSER = JsonOutputParser(pydantic_object=MnemonicBatch)
+MNEMONIC_BATCH_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are a creative medical educator specialized in mnemonics and etymology."),
+    ("user", "For each of the following medical terms/roots (Context: {context}), provide a 1-sentence etymology and a short, funny or memorable mnemonic. Return exactly one entry per term, with the term copied exactly.\n\nTerms:\n{terms}\n\n{format_instructions}")
+]).partial(format_instructions=MNEMONIC_BATCH_PARSER.get_format_instructions())
+
+OUTLINE_PARSER = JsonOutputParser(pydantic_object=CourseOutline)
+OUTLINE_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are an expert curriculum designer for medical interpreter training."),
+    ("user", "Create a {module_count}-module curriculum for: {topic}.\nEach module should list {lesson_count} lesson titles.\n{source}\n{format_instructions}")
+]).partial(format_instructions=OUTLINE_PARSER.get_format_instructions())
+
+LESSON_PARSER = JsonOutputParser(pydantic_object=Lesson)
+LESSON_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are an expert medical interpreter trainer writing course material."),
+    ("user", "Course: {course_title}\nModule: {module_title}\nWrite the lesson '{lesson_title}'. Include Markdown content, a key terminology list and a 3-question quiz.\n{source}\n{format_instructions}")
+]).partial(format_instructions=LESSON_PARSER.get_format_instructions())
+
+CHUNK_SUMMARY_PARSER = JsonOutputParser(pydantic_object=ChunkSummary)
+CHUNK_SUMMARY_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are an expert medical interpreter trainer preparing source material for a course."),
+    ("user", "Summarize this passage from a textbook and list its key terminology.\n\n{text}\n\n{format_instructions}")
+]).partial(format_instructions=CHUNK_SUMMARY_PARSER.get_format_instructions())
+
+CHAINS = {
+    "quiz": (QUIZ_PROMPT, QUIZ_PARSER),
+    "mnemonic": (MNEMONIC_PROMPT, MNEMONIC_PARSER),
+    "mnemonic_batch": (MNEMONIC_BATCH_PROMPT, MNEMONIC_BATCH_PARSER),
+    "course_outline": (OUTLINE_PROMPT, OUTLINE_PARSER),
+    "lesson": (LESSON_PROMPT, LESSON_PARSER),
+    "chunk_summary": (CHUNK_SUMMARY_PROMPT, CHUNK_SUMMARY_PARSER),
+}
+
+DEFAULT_MODEL = "gpt-3.5-turbo-0125"  # Use 3.5 for speed/cost, or gpt-4-turbo for better quality
+DEFAULT_TEMPERATURE = 0.7
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# --- Registry ---
+
+class GeneratorRegistry:
+    """
+    Process-wide cache of LLM clients and compiled chains.
+
+    One keep-alive HTTP pool is shared by every ChatOpenAI instance, and
+    clients/chains are built once per (model, temperature) instead of on
+    every request. `start()`/`close()` are called from the app lifespan;
+    if used without it (e.g. from a notebook) everything is created lazily.
+    """
+
+    def __init__(self):
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._llms: Dict[Tuple[str, float], ChatOpenAI] = {}
+        self._chains: Dict[Tuple[str, str, float], Runnable] = {}
+        self._embeddings: Optional[OpenAIEmbeddings] = None
+
+    def start(self) -> None:
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "50")),
+                    max_keepalive_connections=int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "20")),
+                    keepalive_expiry=60,
+                ),
+                timeout=httpx.Timeout(float(os.getenv("LLM_HTTP_TIMEOUT_SECONDS", "60"))),
+            )
+
+    async def close(self) -> None:
+        if self._http_client is not None:
+            await self._http_client.aclose()
+        self._http_client = None
+        self._llms.clear()
+        self._chains.clear()
+        self._embeddings = None
+
+    @staticmethod
+    def _api_key() -> str:
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key or "placeholder" in api_key:
+            raise ValueError("OPENAI_API_KEY not set properly.")
+        return api_key
+
+    def llm(self, model: str = DEFAULT_MODEL, temperature: float = DEFAULT_TEMPERATURE) -> ChatOpenAI:
+        key = (model, temperature)
+        if key not in self._llms:
+            api_key = self._api_key()
+            self.start()
+            self._llms[key] = ChatOpenAI(
+                model=model,
+                temperature=temperature,
+                api_key=api_key,
+                http_async_client=self._http_client,
+            )
+        return self._llms[key]
+
+    async def embed(self, text: str) -> List[float]:
+        """Embed a short query (used by the semantic generation cache)."""
+        if self._embeddings is None:
+            api_key = self._api_key()
+            self.start()
+            self._embeddings = OpenAIEmbeddings(
+                model=EMBEDDING_MODEL,
+                api_key=api_key,
+                http_async_client=self._http_client,
+            )
+        return await self._embeddings.aembed_query(text)
+
+    def chain(self, name: str, model: str = DEFAULT_MODEL, temperature: float = DEFAULT_TEMPERATURE) -> Runnable:
+        key = (name, model, temperature)
+        if key not in self._chains:
+            prompt, parser = CHAINS[name]
+            self._chains[key] = prompt | self.llm(model, temperature) | parser
+        return self._chains[key]
+
+registry = GeneratorRegistry()
+
 # --- Generators ---
 
 def get_llm():
     """Get the configured LLM instance."""
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key or "placeholder" in api_key:
-        raise ValueError("OPENAI_API_KEY not set properly.")
-    
-    return ChatOpenAI(
-        model="gpt-3.5-turbo-0125", # Use 3.5 for speed/cost, or gpt-4-turbo for better quality
-        temperature=0.7,
-        api_key=api_key
-    )
+    return registry.llm()
 
 async def generate_quiz(topic: str, difficulty: str = "intermediate", count: int = 5) -> Quiz:
     """Generate a quiz based on a topic."""
-    llm = get_llm()
-    parser = JsonOutputParser(pydantic_object=Quiz)
-
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert medical interpreter trainer. Create a quiz to test knowledge of medical terminology and interpreting concepts."),
-        ("user", "Create a {difficulty} level quiz with {count} questions about: {topic}.\nFormatting Instructions:\n{format_instructions}")
-    ])
-
-    chain = prompt | llm | parser
+    chain = registry.chain("quiz")
 
     try:
         result = await chain.ainvoke({
             "topic": topic,
             "difficulty": difficulty,
             "count": count,
-            "format_instructions": parser.get_format_instructions()
         })
         return Quiz(**result)
     except Exception as e:
@@ -68,23 +209,67 @@ async def generate_quiz(topic: str, difficulty: str = "intermediate", count: int
 
 async def generate_mnemonic(term: str, context: str = "") -> MnemonicInsight:
     """Generate etymology and mnemonic for a medical term."""
-    llm = get_llm()
-    parser = JsonOutputParser(pydantic_object=MnemonicInsight)
-
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", "You are a creative medical educator specialized in mnemonics and etymology."),
-        ("user", "For the medical term/root '{term}' (Context: {context}):\n1. Provide a 1-sentence etymology.\n2. Create a short, funny or memorable mnemonic.\n\n{format_instructions}")
-    ])
-    
-    chain = prompt | llm | parser
+    chain = registry.chain("mnemonic")
 
     try:
         result = await chain.ainvoke({
             "term": term,
             "context": context,
-            "format_instructions": parser.get_format_instructions()
         })
         return MnemonicInsight(**result)
     except Exception as e:
         logger.error(f"Error generating mnemonic: {e}")
         raise e
+
+async def generate_mnemonics_batch(terms: List[str], context: str = "") -> Dict[str, MnemonicInsight]:
+    """
+    Generate insights for many terms with a single structured-output call.
+
+    Returns the insights that parsed, keyed by the requested term; terms the
+    model skipped or mangled are simply absent so callers can retry them.
+    """
+    chain = registry.chain("mnemonic_batch")
+    result = await chain.ainvoke({
+        "terms": "\n".join(f"- {term}" for term in terms),
+        "context": context,
+    })
+
+    by_term = {term.casefold().strip(): term for term in terms}
+    insights = {}
+    for item in result.get("insights", []):
+        try:
+            parsed = TermInsight(**item)
+        except Exception:
+            continue
+        term = by_term.get(parsed.term.casefold().strip())
+        if term is not None:
+            insights[term] = MnemonicInsight(etymology=parsed.etymology, mnemonic=parsed.mnemonic)
+    return insights
+
+async def generate_course_outline(topic: str, module_count: int = 5, lesson_count: int = 3, source: str = "") -> CourseOutline:
+    """Generate the module/lesson outline for a course."""
+    chain = registry.chain("course_outline")
+    result = await chain.ainvoke({
+        "topic": topic,
+        "module_count": module_count,
+        "lesson_count": lesson_count,
+        "source": f"Base the curriculum on this source material:\n{source}" if source else "",
+    })
+    return CourseOutline(**result)
+
+async def generate_lesson(course_title: str, module_title: str, lesson_title: str, source: str = "") -> Lesson:
+    """Generate one lesson (content, terminology and quiz)."""
+    chain = registry.chain("lesson")
+    result = await chain.ainvoke({
+        "course_title": course_title,
+        "module_title": module_title,
+        "lesson_title": lesson_title,
+        "source": f"Use this source material:\n{source}" if source else "",
+    })
+    return Lesson(**result)
+
+async def generate_chunk_summary(text: str) -> ChunkSummary:
+    """Summarize one chunk of an uploaded document."""
+    chain = registry.chain("chunk_summary", temperature=0.2)
+    result = await chain.ainvoke({"text": text})
+    return ChunkSummary(**result)
@@ -12,35 +12,39 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting interpreStudy backend...")
+    from app.llm.generators import registry
+    # Shared keep-alive HTTP pool for all LLM clients
+    registry.start()
     
     # =========================================================================
     # TODO: AGENT IMPLEMENTATION GUIDE - COURSE GENERATION
     # =========================================================================
-    # 1. Initialize Gemini Client:
-    #    - Model: `gemini-1.5-pro` (Good for long context/complex JSON)
+    # 1. Course generation: DONE in `app/jobs/course.py` (outline, then all
+    #    lessons in parallel) behind POST /api/generate/course and
+    #    POST /api/generate/course/upload (PDF) in `app/api/courses.py`.
     #
-    # 2. Implement Course Generator Endpoint (in `app/api/study.py`):
-    #    - Route: POST /api/generate/course
-    #    - Input: `topic: str` (e.g. "Cardiology Basics") or `file: UploadFile` (PDF)
-    #    - Logic:
-    #      a. Generate Outline:
-    #         - Prompt: "Create a 5-module curriculum for {topic}. Return JSON list of module titles."
-    #      b. Generate Content (Loop through modules):
-    #         - Prompt: "For module '{module_title}', generate 3 lessons. Each lesson should have:
-    #           - Title
-    #           - Content (Markdown)
-    #           - Key Terminology List
-    #           - 3-Question Quiz (JSON)"
-    #      c. Construct Full Course JSON.
-    #
-    # 3. Database Persistence:
+    # 2. Database Persistence (NOT implemented yet):
     #    - Insert into Supabase tables: `courses` -> `modules` -> `lessons`.
+    #      (`modules` and `lessons` have no migration yet.)
+    #    - Pass the insert as `persist=` to `CourseJobEngine`; it is awaited
+    #      with the finished job before the job is marked completed.
     #    - Return `course_id` to frontend.
     # =========================================================================
+    from app.jobs.course import course_jobs
+    # Resume course jobs interrupted by the last shutdown
+    await course_jobs.start()
 
     yield
     # Shutdown
     logger.info("Shutting down interpreStudy backend...")
+    await course_jobs.close()
+    from app.ingest.pdf import pdf_ingestor
+    pdf_ingestor.close()
+    from app.tts.transcode import transcoder
+    transcoder.close()
+    await registry.close()
+    from app.llm.cache import generation_cache
+    await generation_cache.close()
 
 # Create FastAPI app
 app = FastAPI(
@@ -81,5 +85,7 @@ async def health_check():
     }
 
 # API Routers
-from app.api import study
+from app.api import study, courses, tts
 app.include_router(study.router, prefix="/api")
+app.include_router(courses.router, prefix="/api")
+app.include_router(tts.router, prefix="/api")
@@ -1,5 +1,19 @@
 """Text-to-Speech module for InterpreStudy backend."""
 
-from .gemini_tts import GeminiTTS, generate_scenario_audio
+from .gemini_tts import GeminiTTS, AudioFormat, WavBuffer, WavFileWriter, generate_scenario_audio, get_tts
+from .cache import AudioCache, audio_cache
+from .segments import TurnSynthesizer, split_turns, turn_synthesizer
 
-__all__ = ["GeminiTTS", "generate_scenario_audio"]
+__all__ = [
+    "GeminiTTS",
+    "AudioFormat",
+    "WavBuffer",
+    "WavFileWriter",
+    "generate_scenario_audio",
+    "get_tts",
+    "AudioCache",
+    "audio_cache",
+    "TurnSynthesizer",
+    "split_turns",
+    "turn_synthesizer",
+]
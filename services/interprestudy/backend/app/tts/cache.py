@@ -0,0 +1,261 @@
+"""
+Content-addressed cache for synthesized scenario audio.
+
+Audio is stored as one file per key, where the key hashes everything that
+affects synthesis (dialogue, voices, model, temperature, tone); transcoded
+variants are stored alongside under keys derived from the WAV's. The
+store is a plain directory, so it can be local disk or a mounted bucket
+standing in for an object store. Total size is bounded with LRU eviction;
+file mtimes record recency so the order survives restarts.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .gemini_tts import DEFAULT_SPEAKER_CONFIGS, WAV_HEADER_SIZE, GeminiTTS
+
+logger = logging.getLogger(__name__)
+
+_KEY_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+class AudioCache:
+    """Size-bounded, content-addressed audio store with single-flight production."""
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> (size in bytes, file suffix), least recently used first
+        self._entries: Optional["OrderedDict[str, Tuple[int, str]]"] = None
+        self._size = 0
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # --- Keys & paths ---
+
+    @staticmethod
+    def key(
+        dialogue_text: str,
+        speaker_configs: Optional[List[Dict[str, str]]],
+        model: str,
+        temperature: float,
+        tone: str,
+        variant: str = "",
+    ) -> str:
+        fields = {
+            "dialogue": dialogue_text.strip(),
+            "speakers": sorted(
+                (c["speaker"], c["voice_name"]) for c in (speaker_configs or DEFAULT_SPEAKER_CONFIGS)
+            ),
+            "model": model,
+            "temperature": temperature,
+            "tone": tone,
+        }
+        if variant:
+            # Alternative renderings (e.g. per-turn stitching) get their own entries
+            fields["variant"] = variant
+        payload = json.dumps(fields, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def key_for(
+        self,
+        tts: GeminiTTS,
+        dialogue_text: str,
+        speaker_configs: Optional[List[Dict[str, str]]] = None,
+        temperature: float = 1.0,
+        variant: str = "",
+    ) -> str:
+        return self.key(dialogue_text, speaker_configs, tts.model, temperature, tts.tone, variant)
+
+    @staticmethod
+    def is_key(value: str) -> bool:
+        return bool(_KEY_PATTERN.match(value))
+
+    def path(self, key: str, suffix: str = ".wav") -> Path:
+        return self.root / key[:2] / f"{key}{suffix}"
+
+    # --- Index ---
+
+    def _load(self) -> "OrderedDict[str, Tuple[int, str]]":
+        """Build the LRU index from disk on first use (caller holds the lock)."""
+        if self._entries is None:
+            found = []
+            for path in self.root.glob("*/*.*"):
+                if not self.is_key(path.stem) or path.parent.name != path.stem[:2]:
+                    continue  # e.g. partial files under tmp/
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                found.append((stat.st_mtime, path.stem, stat.st_size, path.suffix))
+            found.sort()
+            self._entries = OrderedDict((key, (size, suffix)) for _, key, size, suffix in found)
+            self._size = sum(size for size, _ in self._entries.values())
+        return self._entries
+
+    def lookup(self, key: str) -> Optional[Path]:
+        """Path of a cached file, marking it most recently used."""
+        with self._lock:
+            entries = self._load()
+            if key not in entries:
+                self.misses += 1
+                return None
+            path = self.path(key, entries[key][1])
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                self._size -= entries.pop(key)[0]
+                self.misses += 1
+                return None
+            entries.move_to_end(key)
+            self.hits += 1
+        return path
+
+    def temp_dir(self) -> Path:
+        tmp = self.root / "tmp"
+        tmp.mkdir(parents=True, exist_ok=True)
+        return tmp
+
+    def work_dir(self) -> str:
+        """A fresh scratch directory under tmp/ for one production."""
+        return tempfile.mkdtemp(dir=self.temp_dir())
+
+    def adopt(self, key: str, tmp_path: str) -> Path:
+        """Move a finished file into the store and evict down to `max_bytes`."""
+        suffix = Path(tmp_path).suffix
+        # Never cache a silent result under the content key
+        if os.path.getsize(tmp_path) <= (WAV_HEADER_SIZE if suffix == ".wav" else 0):
+            raise ValueError(f"Refusing to cache {Path(tmp_path).name}: it has no audio data")
+        path = self.path(key, suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_path, path)
+        size = path.stat().st_size
+        with self._lock:
+            entries = self._load()
+            self._size += size - entries.get(key, (0, suffix))[0]
+            entries[key] = (size, suffix)
+            entries.move_to_end(key)
+            while self._size > self.max_bytes and len(entries) > 1:
+                old_key, (old_size, old_suffix) = entries.popitem(last=False)
+                self._size -= old_size
+                self.evictions += 1
+                try:
+                    os.unlink(self.path(old_key, old_suffix))
+                except FileNotFoundError:
+                    pass
+        return path
+
+    # --- Synthesis ---
+
+    def get_or_generate(
+        self,
+        tts: GeminiTTS,
+        dialogue_text: str,
+        speaker_configs: Optional[List[Dict[str, str]]] = None,
+        temperature: float = 1.0,
+    ) -> Tuple[str, Path, bool]:
+        """Blocking variant for scripts and notebooks. Returns (key, path, cached)."""
+        key = self.key_for(tts, dialogue_text, speaker_configs, temperature)
+        path = self.lookup(key)
+        if path is not None:
+            return key, path, True
+        work_dir = self.work_dir()
+        try:
+            files = tts.generate_audio(dialogue_text, work_dir, uuid.uuid4().hex, speaker_configs, temperature)
+            # Encoded parts may be saved alongside; the cache stores the WAV
+            wav_path = next((path for path in files if path.endswith(".wav")), None)
+            if wav_path is None:
+                raise ValueError("The TTS model returned no PCM audio")
+            return key, self.adopt(key, wav_path), False
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    async def get_or_synthesize(
+        self,
+        tts: GeminiTTS,
+        dialogue_text: str,
+        speaker_configs: Optional[List[Dict[str, str]]] = None,
+        temperature: float = 1.0,
+    ) -> Tuple[str, Path, bool]:
+        """Return (key, path, cached), synthesizing on a miss."""
+        key = self.key_for(tts, dialogue_text, speaker_configs, temperature)
+        return await self.get_or_produce(
+            key,
+            lambda tmp_dir: tts.generate_audio_async(
+                dialogue_text, tmp_dir, uuid.uuid4().hex, speaker_configs, temperature
+            ),
+        )
+
+    async def get_or_produce(
+        self, key: str, produce: Callable[[str], Awaitable[str]]
+    ) -> Tuple[str, Path, bool]:
+        """
+        Return (key, path, cached) for `key`, calling `produce(tmp_dir)` on a
+        miss; it must write a file under `tmp_dir` and return its path.
+
+        Concurrent requests for the same key share one production, which
+        runs in its own task: a cancelled caller only stops waiting. Each
+        production gets its own scratch directory, removed afterwards, so a
+        failed one leaves no partial files behind.
+        """
+        path = await asyncio.to_thread(self.lookup, key)
+        if path is not None:
+            return key, path, True
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._produce(key, produce))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        return key, await asyncio.shield(task), False
+
+    async def _produce(self, key: str, produce: Callable[[str], Awaitable[str]]) -> Path:
+        work_dir = await asyncio.to_thread(self.work_dir)
+        try:
+            started = time.perf_counter()
+            tmp_path = await produce(work_dir)
+            path = await asyncio.to_thread(self.adopt, key, tmp_path)
+            logger.info(f"Produced audio {key[:12]} in {time.perf_counter() - started:.1f}s")
+            return path
+        finally:
+            await asyncio.to_thread(shutil.rmtree, work_dir, ignore_errors=True)
+
+    def _finished(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._load()
+            return {
+                "entries": len(entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+audio_cache = AudioCache(
+    root=os.getenv("TTS_CACHE_DIR", "/tmp/interprestudy/tts_cache"),
+    max_bytes=int(os.getenv("TTS_CACHE_MAX_MB", "2048")) * 1024 * 1024,
+)
@@ -6,17 +6,178 @@ using Google's Gemini 2.5 Pro TTS model. It's designed specifically for
 creating realistic medical interpreter training scenarios.
 """
 
-import base64
+import asyncio
 import mimetypes
 import os
-import re
+import shutil
 import struct
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import AsyncIterator, BinaryIO, Optional, List, Dict, Tuple
 from google import genai
 from google.genai import types
 
 
+DEFAULT_SPEAKER_CONFIGS = [
+    {"speaker": "Speaker 1", "voice_name": "Charon"},
+    {"speaker": "Speaker 2", "voice_name": "Zephyr"},
+]
+DEFAULT_TONE = "Read aloud in a warm, welcoming tone"
+
+WAV_HEADER_SIZE = 44
+# RIFF/data sizes for a stream whose final length is unknown (accepted by browsers)
+STREAMING_SIZE = 0xFFFFFFFF
+
+
+@dataclass(frozen=True)
+class AudioFormat:
+    """PCM parameters of the audio returned by the model."""
+    rate: int = 24000
+    bits_per_sample: int = 16
+    channels: int = 1
+
+    @classmethod
+    def from_mime_type(cls, mime_type: str) -> "AudioFormat":
+        parameters = GeminiTTS._parse_audio_mime_type(mime_type)
+        return cls(rate=parameters["rate"], bits_per_sample=parameters["bits_per_sample"])
+
+    def wav_header(self, data_size: int) -> bytes:
+        """
+        44-byte PCM WAV header for `data_size` bytes of audio.
+
+        Pass STREAMING_SIZE when the length is not known yet.
+        """
+        block_align = self.channels * self.bits_per_sample // 8
+        riff_size = STREAMING_SIZE if data_size == STREAMING_SIZE else 36 + data_size
+        # http://soundfile.sapp.org/doc/WaveFormat/
+        return struct.pack(
+            "<4sI4s4sIHHIIHH4sI",
+            b"RIFF",                 # ChunkID
+            riff_size,               # ChunkSize (total file size - 8 bytes)
+            b"WAVE",                 # Format
+            b"fmt ",                 # Subchunk1ID
+            16,                      # Subchunk1Size (16 for PCM)
+            1,                       # AudioFormat (1 for PCM)
+            self.channels,           # NumChannels
+            self.rate,               # SampleRate
+            self.rate * block_align, # ByteRate
+            block_align,             # BlockAlign
+            self.bits_per_sample,    # BitsPerSample
+            b"data",                 # Subchunk2ID
+            data_size,               # Subchunk2Size (size of audio data)
+        )
+
+
+class WavBuffer:
+    """
+    In-memory WAV assembly without per-chunk concatenation.
+
+    PCM chunks are copied once into a preallocated bytearray (grown by
+    doubling) behind a reserved header slot; `getvalue()` writes the header
+    in place and returns a memoryview over the finished file.
+    """
+
+    def __init__(self, audio_format: AudioFormat = AudioFormat(), capacity: int = 1 << 20):
+        self.format = audio_format
+        self._buffer = bytearray(WAV_HEADER_SIZE + capacity)
+        self._size = WAV_HEADER_SIZE
+
+    def write(self, data: bytes) -> None:
+        end = self._size + len(data)
+        if end > len(self._buffer):
+            self._buffer.extend(bytes(max(end, 2 * len(self._buffer)) - len(self._buffer)))
+        memoryview(self._buffer)[self._size:end] = data
+        self._size = end
+
+    @property
+    def data_size(self) -> int:
+        return self._size - WAV_HEADER_SIZE
+
+    def getvalue(self) -> memoryview:
+        self._buffer[:WAV_HEADER_SIZE] = self.format.wav_header(self.data_size)
+        return memoryview(self._buffer)[:self._size]
+
+
+class WavFileWriter:
+    """
+    Single WAV file written incrementally.
+
+    A placeholder header is written first and PCM chunks are appended as
+    they arrive; `close()` seeks back and patches the RIFF/data sizes.
+    """
+
+    def __init__(self, path: str, audio_format: AudioFormat = AudioFormat()):
+        self.path = path
+        self.format = audio_format
+        self.data_size = 0
+        self._file: BinaryIO = open(path, "wb")
+        self._file.write(audio_format.wav_header(0))
+
+    def write(self, data: bytes) -> None:
+        self._file.write(memoryview(data))
+        self.data_size += len(data)
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self._file.seek(0)
+        self._file.write(self.format.wav_header(self.data_size))
+        self._file.close()
+
+    def __enter__(self) -> "WavFileWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class AudioFileSink:
+    """
+    Files for one generate_audio call.
+
+    Raw PCM parts are appended to `<prefix>.wav`. Parts already in an
+    encoded format (one `mimetypes` knows an extension for) can't be
+    merged into it, so each is saved as-is to `<prefix>_<n><ext>`.
+    """
+
+    def __init__(self, output_dir: str, file_prefix: str):
+        self.output_path = Path(output_dir)
+        self.output_path.mkdir(parents=True, exist_ok=True)
+        self.file_prefix = file_prefix
+        self.files: List[str] = []
+        self._writer: Optional[WavFileWriter] = None
+        self._index = 0
+
+    def write(self, inline_data: types.Blob) -> None:
+        file_extension = mimetypes.guess_extension(inline_data.mime_type)
+        if file_extension is not None:
+            file_path = str(self.output_path / f"{self.file_prefix}_{self._index}{file_extension}")
+            self._index += 1
+            GeminiTTS._save_binary_file(file_path, inline_data.data)
+            self.files.append(file_path)
+            return
+        if self._writer is None:
+            file_path = str(self.output_path / f"{self.file_prefix}.wav")
+            self._writer = WavFileWriter(file_path, AudioFormat.from_mime_type(inline_data.mime_type))
+            self.files.append(file_path)
+        self._writer.write(inline_data.data)
+
+    @property
+    def wav_path(self) -> Optional[str]:
+        return self._writer.path if self._writer is not None else None
+
+    def close(self) -> None:
+        """Finish the WAV, if any PCM arrived."""
+        if self._writer is not None:
+            self._writer.close()
+
+    def check(self) -> List[str]:
+        """All paths written; raises ValueError if the model sent no audio."""
+        if not self.files:
+            raise ValueError("The TTS model returned no audio")
+        return self.files
+
+
 class GeminiTTS:
     """
     A wrapper class for Google's Gemini TTS API with multi-speaker support.
@@ -39,159 +200,238 @@ class GeminiTTS:
             )
         self.client = genai.Client(api_key=self.api_key)
         self.model = "gemini-2.5-pro-preview-tts"
+        self.tone = DEFAULT_TONE
     
-    def generate_audio(
+    def _build_request(
         self,
         dialogue_text: str,
-        output_dir: str = "output",
-        file_prefix: str = "scenario",
-        speaker_configs: Optional[List[Dict[str, str]]] = None,
-        temperature: float = 1.0,
-    ) -> List[str]:
+        speaker_configs: Optional[List[Dict[str, str]]],
+        temperature: float,
+    ) -> Tuple[List[types.Content], types.GenerateContentConfig]:
         """
-        Generate audio from dialogue text with multiple speakers.
-        
-        Args:
-            dialogue_text: The dialogue text with speaker labels (e.g., "Speaker 1:", "Speaker 2:")
-            output_dir: Directory to save output files
-            file_prefix: Prefix for output file names
-            speaker_configs: List of dicts with 'speaker' and 'voice_name' keys.
-                           If None, defaults to Speaker 1 (Charon) and Speaker 2 (Zephyr)
-            temperature: Generation temperature (0-1)
+        Build the contents and generation config for a dialogue.
         
-        Returns:
-            List of file paths to generated audio files
+        With a single speaker config the text is read by that one voice
+        (used for per-turn synthesis); otherwise multi-speaker mode is used.
         """
-        # Create output directory if it doesn't exist
-        output_path = Path(output_dir)
-        output_path.mkdir(parents=True, exist_ok=True)
-        
         # Default speaker configuration
         if speaker_configs is None:
-            speaker_configs = [
-                {"speaker": "Speaker 1", "voice_name": "Charon"},
-                {"speaker": "Speaker 2", "voice_name": "Zephyr"},
-            ]
-        
-        # Build speaker voice configs
-        voice_configs = []
-        for config in speaker_configs:
-            voice_configs.append(
-                types.SpeakerVoiceConfig(
-                    speaker=config["speaker"],
-                    voice_config=types.VoiceConfig(
-                        prebuilt_voice_config=types.PrebuiltVoiceConfig(
-                            voice_name=config["voice_name"]
-                        )
-                    ),
-                )
-            )
+            speaker_configs = DEFAULT_SPEAKER_CONFIGS
         
         # Prepare content
         contents = [
             types.Content(
                 role="user",
-                parts=[types.Part.from_text(text=f"Read aloud in a warm, welcoming tone\n{dialogue_text}")],
+                parts=[types.Part.from_text(text=f"{self.tone}\n{dialogue_text}")],
             ),
         ]
         
+        if len(speaker_configs) == 1:
+            # Single turn/narrator: plain text read with one voice
+            speech_config = types.SpeechConfig(
+                voice_config=types.VoiceConfig(
+                    prebuilt_voice_config=types.PrebuiltVoiceConfig(
+                        voice_name=speaker_configs[0]["voice_name"]
+                    )
+                ),
+            )
+        else:
+            # Build speaker voice configs
+            voice_configs = []
+            for config in speaker_configs:
+                voice_configs.append(
+                    types.SpeakerVoiceConfig(
+                        speaker=config["speaker"],
+                        voice_config=types.VoiceConfig(
+                            prebuilt_voice_config=types.PrebuiltVoiceConfig(
+                                voice_name=config["voice_name"]
+                            )
+                        ),
+                    )
+                )
+            speech_config = types.SpeechConfig(
+                multi_speaker_voice_config=types.MultiSpeakerVoiceConfig(
+                    speaker_voice_configs=voice_configs
+                ),
+            )
+        
         # Configure generation
         generate_content_config = types.GenerateContentConfig(
             temperature=temperature,
             response_modalities=["audio"],
-            speech_config=types.SpeechConfig(
-                multi_speaker_voice_config=types.MultiSpeakerVoiceConfig(
-                    speaker_voice_configs=voice_configs
-                ),
-            ),
+            speech_config=speech_config,
         )
+        return contents, generate_content_config
+    
+    @staticmethod
+    def _audio_part(chunk) -> Optional[types.Blob]:
+        """Return the inline audio of a streamed chunk, if it carries any."""
+        if (
+            chunk.candidates is None
+            or chunk.candidates[0].content is None
+            or chunk.candidates[0].content.parts is None
+        ):
+            return None
+        inline_data = chunk.candidates[0].content.parts[0].inline_data
+        if inline_data and inline_data.data:
+            return inline_data
+        return None
+    
+    async def stream_audio(
+        self,
+        dialogue_text: str,
+        speaker_configs: Optional[List[Dict[str, str]]] = None,
+        temperature: float = 1.0,
+    ) -> AsyncIterator[Tuple[AudioFormat, bytes]]:
+        """
+        Yield (format, pcm_bytes) as audio chunks arrive from the model.
         
-        # Generate and save audio
-        generated_files = []
-        file_index = 0
+        Uses the async client, so the event loop is never blocked while
+        waiting on the stream.
         
-        for chunk in self.client.models.generate_content_stream(
+        Args:
+            dialogue_text: The dialogue text with speaker labels
+            speaker_configs: Custom speaker configurations (see generate_audio)
+            temperature: Generation temperature (0-1)
+        """
+        contents, config = self._build_request(dialogue_text, speaker_configs, temperature)
+        stream = await self.client.aio.models.generate_content_stream(
             model=self.model,
             contents=contents,
-            config=generate_content_config,
-        ):
-            if (
-                chunk.candidates is None
-                or chunk.candidates[0].content is None
-                or chunk.candidates[0].content.parts is None
-            ):
+            config=config,
+        )
+        async for chunk in stream:
+            inline_data = self._audio_part(chunk)
+            if inline_data is None:
                 continue
-            
-            if (
-                chunk.candidates[0].content.parts[0].inline_data 
-                and chunk.candidates[0].content.parts[0].inline_data.data
-            ):
-                file_name = f"{file_prefix}_{file_index}"
-                file_index += 1
-                inline_data = chunk.candidates[0].content.parts[0].inline_data
-                data_buffer = inline_data.data
-                file_extension = mimetypes.guess_extension(inline_data.mime_type)
-                
-                if file_extension is None:
-                    file_extension = ".wav"
-                    data_buffer = self._convert_to_wav(inline_data.data, inline_data.mime_type)
-                
-                file_path = output_path / f"{file_name}{file_extension}"
-                self._save_binary_file(str(file_path), data_buffer)
-                generated_files.append(str(file_path))
-            else:
-                if hasattr(chunk, 'text') and chunk.text:
-                    print(chunk.text)
+            if mimetypes.guess_extension(inline_data.mime_type) is not None:
+                # Only raw PCM (audio/L16) can be streamed as one WAV
+                raise ValueError(f"Unsupported TTS audio format for streaming: {inline_data.mime_type}")
+            yield AudioFormat.from_mime_type(inline_data.mime_type), inline_data.data
+    
+    async def stream_wav(
+        self,
+        dialogue_text: str,
+        speaker_configs: Optional[List[Dict[str, str]]] = None,
+        temperature: float = 1.0,
+    ) -> AsyncIterator[bytes]:
+        """
+        Yield a playable WAV byte stream for an HTTP response.
         
-        return generated_files
+        The header is sent ahead of the first chunk with streaming
+        (unknown) sizes, then PCM is forwarded as it arrives.
+        """
+        header_sent = False
+        async for audio_format, data in self.stream_audio(dialogue_text, speaker_configs, temperature):
+            if not header_sent:
+                yield audio_format.wav_header(STREAMING_SIZE)
+                header_sent = True
+            yield data
     
-    @staticmethod
-    def _save_binary_file(file_path: str, data: bytes) -> None:
-        """Save binary data to a file."""
-        with open(file_path, "wb") as f:
-            f.write(data)
-        print(f"File saved to: {file_path}")
+    async def synthesize(
+        self,
+        dialogue_text: str,
+        speaker_configs: Optional[List[Dict[str, str]]] = None,
+        temperature: float = 1.0,
+    ) -> memoryview:
+        """Generate a complete WAV in memory."""
+        buffer: Optional[WavBuffer] = None
+        async for audio_format, data in self.stream_audio(dialogue_text, speaker_configs, temperature):
+            if buffer is None:
+                buffer = WavBuffer(audio_format)
+            buffer.write(data)
+        return (buffer or WavBuffer()).getvalue()
     
-    @staticmethod
-    def _convert_to_wav(audio_data: bytes, mime_type: str) -> bytes:
+    async def generate_audio_async(
+        self,
+        dialogue_text: str,
+        output_dir: str = "output",
+        file_prefix: str = "scenario",
+        speaker_configs: Optional[List[Dict[str, str]]] = None,
+        temperature: float = 1.0,
+    ) -> str:
         """
-        Generates a WAV file header for the given audio data and parameters.
+        Async version of generate_audio, using the async client.
+        
+        Returns:
+            Path to the generated WAV file (encoded parts, if any, are saved
+            alongside it as in generate_audio)
+        
+        Raises:
+            ValueError: If the model returned no PCM audio
+        """
+        contents, config = self._build_request(dialogue_text, speaker_configs, temperature)
+        sink = await asyncio.to_thread(AudioFileSink, output_dir, file_prefix)
+        try:
+            stream = await self.client.aio.models.generate_content_stream(
+                model=self.model,
+                contents=contents,
+                config=config,
+            )
+            async for chunk in stream:
+                inline_data = self._audio_part(chunk)
+                if inline_data is not None:
+                    await asyncio.to_thread(sink.write, inline_data)
+        finally:
+            await asyncio.to_thread(sink.close)
+        sink.check()
+        if sink.wav_path is None:
+            raise ValueError("The TTS model returned no PCM audio")
+        return sink.wav_path
+    
+    def generate_audio(
+        self,
+        dialogue_text: str,
+        output_dir: str = "output",
+        file_prefix: str = "scenario",
+        speaker_configs: Optional[List[Dict[str, str]]] = None,
+        temperature: float = 1.0,
+    ) -> List[str]:
+        """
+        Generate audio from dialogue text with multiple speakers.
+        
+        Streamed PCM chunks are appended to a single WAV file whose header
+        is patched once the stream ends; encoded audio parts (e.g. MP3) are
+        saved alongside it with their own extension.
         
         Args:
-            audio_data: The raw audio data as a bytes object.
-            mime_type: Mime type of the audio data.
+            dialogue_text: The dialogue text with speaker labels (e.g., "Speaker 1:", "Speaker 2:")
+            output_dir: Directory to save output files
+            file_prefix: Prefix for output file names
+            speaker_configs: List of dicts with 'speaker' and 'voice_name' keys.
+                           If None, defaults to Speaker 1 (Charon) and Speaker 2 (Zephyr)
+            temperature: Generation temperature (0-1)
         
         Returns:
-            A bytes object representing the WAV file with header.
+            List of generated file paths, in the order they were started
+        
+        Raises:
+            ValueError: If the model returned no audio
         """
-        parameters = GeminiTTS._parse_audio_mime_type(mime_type)
-        bits_per_sample = parameters["bits_per_sample"]
-        sample_rate = parameters["rate"]
-        num_channels = 1
-        data_size = len(audio_data)
-        bytes_per_sample = bits_per_sample // 8
-        block_align = num_channels * bytes_per_sample
-        byte_rate = sample_rate * block_align
-        chunk_size = 36 + data_size  # 36 bytes for header fields before data chunk size
+        contents, config = self._build_request(dialogue_text, speaker_configs, temperature)
+        sink = AudioFileSink(output_dir, file_prefix)
+        try:
+            for chunk in self.client.models.generate_content_stream(
+                model=self.model,
+                contents=contents,
+                config=config,
+            ):
+                inline_data = self._audio_part(chunk)
+                if inline_data is not None:
+                    sink.write(inline_data)
+        finally:
+            sink.close()
         
-        # http://soundfile.sapp.org/doc/WaveFormat/
-        header = struct.pack(
-            "<4sI4s4sIHHIIHH4sI",
-            b"RIFF",          # ChunkID
-            chunk_size,       # ChunkSize (total file size - 8 bytes)
-            b"WAVE",          # Format
-            b"fmt ",          # Subchunk1ID
-            16,               # Subchunk1Size (16 for PCM)
-            1,                # AudioFormat (1 for PCM)
-            num_channels,     # NumChannels
-            sample_rate,      # SampleRate
-            byte_rate,        # ByteRate
-            block_align,      # BlockAlign
-            bits_per_sample,  # BitsPerSample
-            b"data",          # Subchunk2ID
-            data_size         # Subchunk2Size (size of audio data)
-        )
-        return header + audio_data
+        files = sink.check()
+        for file_path in files:
+            print(f"File saved to: {file_path}")
+        return files
+    
+    @staticmethod
+    def _save_binary_file(file_path: str, data: bytes) -> None:
+        """Save binary data to a file."""
+        with open(file_path, "wb") as f:
+            f.write(data)
     
     @staticmethod
     def _parse_audio_mime_type(mime_type: str) -> Dict[str, int]:
@@ -228,6 +468,17 @@ class GeminiTTS:
         return {"bits_per_sample": bits_per_sample, "rate": rate}
 
 
+_default_tts: Optional[GeminiTTS] = None
+
+
+def get_tts() -> GeminiTTS:
+    """Process-wide GeminiTTS instance (one client and connection pool)."""
+    global _default_tts
+    if _default_tts is None:
+        _default_tts = GeminiTTS()
+    return _default_tts
+
+
 def generate_scenario_audio(
     dialogue_text: str,
     output_dir: str = "output",
@@ -244,7 +495,7 @@ def generate_scenario_audio(
         api_key: Optional API key. If not provided, will use GEMINI_API_KEY env var.
     
     Returns:
-        List of file paths to generated audio files
+        List containing the path of the generated WAV file
     
     Example:
         >>> dialogue = '''
@@ -253,5 +504,14 @@ def generate_scenario_audio(
         ... '''
         >>> files = generate_scenario_audio(dialogue, output_dir="./audio")
     """
-    tts = GeminiTTS(api_key=api_key)
-    return tts.generate_audio(dialogue_text, output_dir, file_prefix)
+    from .cache import audio_cache
+
+    tts = GeminiTTS(api_key=api_key) if api_key else get_tts()
+    # Repeated scenarios are served from the audio cache instead of re-synthesized
+    _, cached_path, _ = audio_cache.get_or_generate(tts, dialogue_text)
+    
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    file_path = str(output_path / f"{file_prefix}.wav")
+    shutil.copyfile(cached_path, file_path)
+    return [file_path]
@@ -0,0 +1,153 @@
+"""
+Per-turn parallel synthesis for long multi-speaker dialogues.
+
+The dialogue is split at speaker turns, each turn is synthesized with its
+speaker's voice (concurrently, up to a limit) and the PCM is stitched back
+together in order. Turns are cached individually in the audio cache, so
+editing one line of a scenario re-synthesizes only that line.
+"""
+
+import asyncio
+import os
+import re
+import uuid
+import wave
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .cache import AudioCache, audio_cache
+from .gemini_tts import DEFAULT_SPEAKER_CONFIGS, AudioFormat, GeminiTTS, WavFileWriter
+
+
+@dataclass
+class Turn:
+    speaker: str
+    voice_name: str
+    text: str
+
+
+def split_turns(dialogue_text: str, speaker_configs: Optional[List[Dict[str, str]]] = None) -> List[Turn]:
+    """
+    Split a dialogue into speaker turns.
+
+    A turn starts at a line beginning with a configured speaker label
+    ("Speaker 1: ..."); following unlabeled lines belong to it. Text before
+    the first label is read by the first speaker.
+    """
+    speaker_configs = speaker_configs or DEFAULT_SPEAKER_CONFIGS
+    voices = {config["speaker"]: config["voice_name"] for config in speaker_configs}
+    label = re.compile(
+        r"^\s*(" + "|".join(re.escape(speaker) for speaker in voices) + r")\s*:\s*(.*)$"
+    )
+
+    turns: List[Turn] = []
+    current: Optional[Turn] = None
+    for line in dialogue_text.splitlines():
+        match = label.match(line)
+        if match:
+            current = Turn(match.group(1), voices[match.group(1)], match.group(2).strip())
+            turns.append(current)
+        elif line.strip():
+            if current is None:
+                first = speaker_configs[0]
+                current = Turn(first["speaker"], first["voice_name"], "")
+                turns.append(current)
+            current.text = f"{current.text}\n{line.strip()}" if current.text else line.strip()
+    return [turn for turn in turns if turn.text]
+
+
+class TurnSynthesizer:
+    """Synthesize turns concurrently and stitch them into one WAV."""
+
+    def __init__(self, cache: AudioCache, max_concurrency: int = 4, silence_ms: int = 300):
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+        self.silence_ms = silence_ms
+
+    async def get_or_synthesize(
+        self,
+        tts: GeminiTTS,
+        dialogue_text: str,
+        speaker_configs: Optional[List[Dict[str, str]]] = None,
+        temperature: float = 1.0,
+        silence_ms: Optional[int] = None,
+    ) -> Tuple[str, Path, bool]:
+        """Return (key, path, cached) for the stitched scenario."""
+        silence_ms = self.silence_ms if silence_ms is None else silence_ms
+        key = self.cache.key_for(tts, dialogue_text, speaker_configs, temperature, variant=f"turns:{silence_ms}")
+        return await self.cache.get_or_produce(
+            key,
+            lambda tmp_dir: self._render(tts, dialogue_text, speaker_configs, temperature, silence_ms, tmp_dir),
+        )
+
+    async def _synthesize_turn(self, tts: GeminiTTS, turn: Turn, temperature: float) -> Path:
+        # Keyed on voice, not speaker label, so renaming a speaker keeps its audio
+        voice = [{"speaker": "", "voice_name": turn.voice_name}]
+        key = self.cache.key_for(tts, turn.text, voice, temperature, variant="turn")
+        _, path, _ = await self.cache.get_or_produce(
+            key,
+            lambda tmp_dir: tts.generate_audio_async(turn.text, tmp_dir, uuid.uuid4().hex, voice, temperature),
+        )
+        return path
+
+    async def _render(
+        self,
+        tts: GeminiTTS,
+        dialogue_text: str,
+        speaker_configs: Optional[List[Dict[str, str]]],
+        temperature: float,
+        silence_ms: int,
+        tmp_dir: str,
+    ) -> str:
+        turns = split_turns(dialogue_text, speaker_configs)
+        if not turns:
+            raise ValueError("Dialogue has no speaker turns to synthesize")
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def bounded(turn: Turn) -> Path:
+            async with semaphore:
+                return await self._synthesize_turn(tts, turn, temperature)
+
+        paths = await asyncio.gather(*(bounded(turn) for turn in turns))
+        output_path = os.path.join(tmp_dir, f"{uuid.uuid4().hex}.wav")
+        await asyncio.to_thread(self._stitch, paths, output_path, silence_ms)
+        return output_path
+
+    @staticmethod
+    def _stitch(paths: List[Path], output_path: str, silence_ms: int) -> None:
+        """Concatenate segment PCM in order with `silence_ms` between turns."""
+        audio_format: Optional[AudioFormat] = None
+        silence = b""
+        writer: Optional[WavFileWriter] = None
+        try:
+            for index, path in enumerate(paths):
+                with wave.open(str(path), "rb") as segment:
+                    segment_format = AudioFormat(
+                        rate=segment.getframerate(),
+                        bits_per_sample=segment.getsampwidth() * 8,
+                        channels=segment.getnchannels(),
+                    )
+                    if audio_format is None:
+                        audio_format = segment_format
+                        block_align = audio_format.channels * audio_format.bits_per_sample // 8
+                        # Whole frames only, so every turn starts on a sample boundary
+                        silence = bytes(audio_format.rate * silence_ms // 1000 * block_align)
+                        writer = WavFileWriter(output_path, audio_format)
+                    elif segment_format != audio_format:
+                        raise ValueError(f"Segment format {segment_format} differs from {audio_format}")
+                    if index and silence:
+                        writer.write(silence)
+                    # readframes() returns whole frames; a trailing partial sample is dropped
+                    writer.write(segment.readframes(segment.getnframes()))
+        finally:
+            if writer is not None:
+                writer.close()
+
+
+turn_synthesizer = TurnSynthesizer(
+    audio_cache,
+    max_concurrency=int(os.getenv("TTS_SEGMENT_CONCURRENCY", "4")),
+    silence_ms=int(os.getenv("TTS_TURN_SILENCE_MS", "300")),
+)
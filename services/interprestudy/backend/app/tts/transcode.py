@@ -0,0 +1,254 @@
+"""
+Optional compression stage for synthesized audio.
+
+Cached WAVs are transcoded to Opus (OGG) or MP3 in a process pool, with
+optional loudness normalization and downsampling. Encoded variants are
+stored in the audio cache next to the source WAV, so each variant is
+encoded once and then served as a static file.
+"""
+
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .cache import AudioCache, audio_cache
+
+try:
+    import soundfile as sf
+    import soxr
+    TRANSCODE_AVAILABLE = True
+except ImportError:
+    TRANSCODE_AVAILABLE = False
+
+
+@dataclass(frozen=True)
+class AudioEncoding:
+    media_type: str
+    suffix: str
+    format: str
+    subtype: str
+
+
+ENCODINGS: Dict[str, AudioEncoding] = {
+    "opus": AudioEncoding("audio/ogg", ".ogg", "OGG", "OPUS"),
+    "mp3": AudioEncoding("audio/mpeg", ".mp3", "MP3", "MPEG_LAYER_III"),
+    "wav": AudioEncoding("audio/wav", ".wav", "WAV", "PCM_16"),
+}
+
+# Accept media types -> encoding, with the server's preference order for ties
+MEDIA_TYPES = {
+    "audio/ogg": "opus",
+    "audio/opus": "opus",
+    "application/ogg": "opus",
+    "audio/mpeg": "mp3",
+    "audio/mp3": "mp3",
+    "audio/wav": "wav",
+    "audio/x-wav": "wav",
+    "audio/wave": "wav",
+}
+PREFERENCE = ["opus", "mp3", "wav"]
+
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+TARGET_RMS_DBFS = -20.0
+PEAK_CEILING_DBFS = -1.0
+
+
+def negotiate(accept: Optional[str], default: str = "wav") -> Optional[str]:
+    """
+    Pick an encoding from an Accept header.
+
+    Wildcards resolve to `default`; explicit types with equal q-values are
+    resolved in PREFERENCE order. Returns None if nothing acceptable.
+    """
+    if not accept:
+        return default
+    best: Dict[str, float] = {}
+    for item in accept.split(","):
+        media_type, *params = [part.strip() for part in item.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        media_type = media_type.lower()
+        if media_type in ("*/*", "audio/*"):
+            encoding = default
+            q -= 1e-3  # explicit types win ties over wildcards
+        else:
+            encoding = MEDIA_TYPES.get(media_type)
+        if encoding is not None and q > 0:
+            best[encoding] = max(best.get(encoding, 0.0), q)
+    if not best:
+        return None
+    return max(best, key=lambda encoding: (best[encoding], -PREFERENCE.index(encoding)))
+
+
+@dataclass(frozen=True)
+class TranscodeOptions:
+    encoding: str = "opus"
+    sample_rate: Optional[int] = None
+    normalize: bool = False
+    # libsndfile scale: 0 = highest bitrate, 1 = smallest; ~0.85 is ~32 kbps, plenty for speech
+    compression_level: float = 0.85
+
+    @property
+    def variant(self) -> str:
+        return f"{self.encoding}:{self.sample_rate or 'src'}:{int(self.normalize)}:{self.compression_level}"
+
+    def derived_key(self, source_key: str) -> str:
+        return hashlib.sha256(f"{source_key}:{self.variant}".encode("utf-8")).hexdigest()
+
+
+def _normalize_loudness(samples: np.ndarray) -> np.ndarray:
+    """Scale to TARGET_RMS_DBFS, backing off so peaks stay under PEAK_CEILING_DBFS."""
+    rms = float(np.sqrt(np.mean(np.square(samples, dtype=np.float64))))
+    peak = float(np.max(np.abs(samples)))
+    if rms == 0.0 or peak == 0.0:
+        return samples
+    gain = min(10 ** (TARGET_RMS_DBFS / 20) / rms, 10 ** (PEAK_CEILING_DBFS / 20) / peak)
+    return samples * np.float32(gain)
+
+
+def encode_file(source_path: str, output_path: str, options: TranscodeOptions) -> Tuple[int, int, float, float]:
+    """
+    Encode one file (runs in a worker process).
+
+    Returns (input_bytes, output_bytes, audio_seconds, encode_seconds).
+    """
+    started = time.perf_counter()
+    samples, rate = sf.read(source_path, dtype="float32", always_2d=True)
+    audio_seconds = len(samples) / rate
+
+    if options.normalize:
+        samples = _normalize_loudness(samples)
+
+    target_rate = options.sample_rate or rate
+    if options.encoding == "opus" and target_rate not in OPUS_SAMPLE_RATES:
+        # Opus only runs at fixed rates; use the next supported one up
+        target_rate = next((r for r in OPUS_SAMPLE_RATES if r >= target_rate), 48000)
+    if target_rate != rate:
+        samples = soxr.resample(samples, rate, target_rate, quality="HQ")
+
+    encoding = ENCODINGS[options.encoding]
+    with sf.SoundFile(
+        output_path,
+        "w",
+        samplerate=target_rate,
+        channels=samples.shape[1],
+        format=encoding.format,
+        subtype=encoding.subtype,
+        compression_level=None if options.encoding == "wav" else options.compression_level,
+    ) as f:
+        f.write(samples)
+    return (
+        os.path.getsize(source_path),
+        os.path.getsize(output_path),
+        audio_seconds,
+        time.perf_counter() - started,
+    )
+
+
+class Transcoder:
+    """Encode cached WAVs in a process pool and cache the results."""
+
+    def __init__(self, cache: AudioCache, workers: int = 2):
+        self.cache = cache
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.jobs = 0
+        self.input_bytes = 0
+        self.output_bytes = 0
+        self.audio_seconds = 0.0
+        self.encode_seconds = 0.0
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # Never fork the threaded server process: a child could inherit held locks
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context(method),
+                )
+            return self._pool
+
+    def close(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def get_or_transcode(self, source_key: str, source_path: Path, options: TranscodeOptions) -> Path:
+        """Path of `source_path` encoded with `options`, encoding on a miss."""
+        if not TRANSCODE_AVAILABLE:
+            raise RuntimeError("soundfile/soxr are not installed")
+
+        async def produce(tmp_dir: str) -> str:
+            output_path = os.path.join(tmp_dir, f"{uuid.uuid4().hex}{ENCODINGS[options.encoding].suffix}")
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.pool, encode_file, str(source_path), output_path, options)
+            self._record(*result)
+            return output_path
+
+        _, path, _ = await self.cache.get_or_produce(options.derived_key(source_key), produce)
+        return path
+
+    def _record(self, input_bytes: int, output_bytes: int, audio_seconds: float, encode_seconds: float) -> None:
+        self.jobs += 1
+        self.input_bytes += input_bytes
+        self.output_bytes += output_bytes
+        self.audio_seconds += audio_seconds
+        self.encode_seconds += encode_seconds
+
+    def stats(self) -> dict:
+        """Compression ratio and encode throughput (seconds of audio per second) so far."""
+        return {
+            "jobs": self.jobs,
+            "input_bytes": self.input_bytes,
+            "output_bytes": self.output_bytes,
+            "compression_ratio": round(self.input_bytes / self.output_bytes, 2) if self.output_bytes else None,
+            "audio_seconds": round(self.audio_seconds, 2),
+            "encode_seconds": round(self.encode_seconds, 3),
+            "realtime_factor": round(self.audio_seconds / self.encode_seconds, 1) if self.encode_seconds else None,
+        }
+
+
+transcoder = Transcoder(audio_cache, workers=int(os.getenv("TTS_TRANSCODE_WORKERS", "2")))
+DEFAULT_ENCODING = os.getenv("TTS_DEFAULT_ENCODING", "wav")
+
+
+if __name__ == "__main__":
+    # Benchmark: python -m app.tts.transcode scenario.wav [more.wav ...]
+    import sys
+    import tempfile
+
+    profiles = [
+        TranscodeOptions("opus"),
+        TranscodeOptions("opus", sample_rate=16000, normalize=True),
+        TranscodeOptions("mp3"),
+        TranscodeOptions("mp3", sample_rate=16000, normalize=True),
+    ]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for options in profiles:
+            totals = np.zeros(4)
+            for index, source in enumerate(sys.argv[1:]):
+                output = os.path.join(tmp_dir, f"{index}{ENCODINGS[options.encoding].suffix}")
+                totals += encode_file(source, output, options)
+            input_bytes, output_bytes, audio_seconds, encode_seconds = totals
+            print(
+                f"{options.variant:<22} ratio {input_bytes / output_bytes:6.1f}x  "
+                f"{output_bytes / 1024:9.1f} KiB  {audio_seconds / encode_seconds:7.1f}x realtime"
+            )
@@ -0,0 +1,223 @@
+"""
+Per-request LLM client construction vs. the shared GeneratorRegistry.
+
+A stub OpenAI-compatible server (its own process, /v1/chat/completions
+answering a valid MnemonicInsight after --latency-ms) stands in for the
+LLM. Clients call generate_mnemonic for --seconds at each concurrency:
+
+  per-call  the original code: a new ChatOpenAI, parser, prompt and
+            chain on every request (recent langchain-openai versions share
+            a default HTTP client between instances, so connections may
+            still be reused)
+  registry  generate_mnemonic as it is now: chains compiled once, every
+            client sharing one keep-alive httpx pool
+
+Reported per level: throughput, client-side latency p50/p99 minus the
+stub's latency (i.e. our own overhead), and how many TCP connections the
+stub saw opened; per mode, the time to get a ready chain before any call
+is made. No OpenAI key or network access is needed.
+
+    python -m loadtest.generator_registry --concurrency 1 8 32
+    python -m loadtest.generator_registry --latency-ms 0 --seconds 3
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+
+STUB_REPLY = {"etymology": "From Greek kardia, heart.", "mnemonic": "Cardio keeps the heart going."}
+
+
+def serve_stub(port: int, latency_seconds: float) -> None:
+    import uvicorn
+    from fastapi import FastAPI, Request
+
+    app = FastAPI()
+    connections = set()
+
+    @app.get("/stats")
+    async def stats():
+        return {"connections": len(connections)}
+
+    @app.post("/stats/reset")
+    async def reset():
+        connections.clear()
+        return {}
+
+    @app.post("/v1/chat/completions")
+    async def completions(request: Request):
+        connections.add(request.client.port)
+        body = await request.json()
+        await asyncio.sleep(latency_seconds)
+        return {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": json.dumps(STUB_REPLY)},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 50, "completion_tokens": 20, "total_tokens": 70},
+        }
+
+    uvicorn.run(app, port=port, log_level="warning", backlog=4096)
+
+
+def stub_request(port: int, path: str, method: str = "GET") -> dict:
+    request = urllib.request.Request(f"http://127.0.0.1:{port}{path}", method=method)
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return json.loads(response.read())
+
+
+def wait_ready(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            stub_request(port, "/stats")
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("stub server did not start")
+
+
+def build_per_call():
+    """(chain, format_instructions) built the way the original generate_mnemonic did."""
+    from langchain_core.output_parsers import JsonOutputParser
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_openai import ChatOpenAI
+
+    from app.llm.generators import DEFAULT_MODEL, DEFAULT_TEMPERATURE, MnemonicInsight
+
+    llm = ChatOpenAI(model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE, api_key=os.environ["OPENAI_API_KEY"])
+    parser = JsonOutputParser(pydantic_object=MnemonicInsight)
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", "You are a creative medical educator specialized in mnemonics and etymology."),
+        ("user", "For the medical term/root '{term}' (Context: {context}):\n1. Provide a 1-sentence etymology.\n2. Create a short, funny or memorable mnemonic.\n\n{format_instructions}")
+    ])
+    return prompt | llm | parser, parser.get_format_instructions()
+
+
+def build_cost_us(mode: str, repeat: int = 200) -> float:
+    """Mean time to get a ready chain, without calling it."""
+    from app.llm.generators import registry
+
+    build = build_per_call if mode == "per-call" else lambda: registry.chain("mnemonic")
+    build()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        build()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+async def run_level(mode: str, concurrency: int, args) -> dict:
+    from app.llm.generators import MnemonicInsight, generate_mnemonic
+
+    async def per_call(term: str) -> MnemonicInsight:
+        chain, format_instructions = build_per_call()
+        result = await chain.ainvoke({"term": term, "context": "", "format_instructions": format_instructions})
+        return MnemonicInsight(**result)
+
+    generate = per_call if mode == "per-call" else generate_mnemonic
+    latencies = []
+    deadline = time.perf_counter() + args.seconds
+
+    async def client(worker: int) -> None:
+        count = 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            await generate(f"cardiology-{worker}-{count}")
+            latencies.append(time.perf_counter() - started)
+            count += 1
+
+    stub_request(args.port, "/stats/reset", "POST")
+    await generate("warm-up")
+    started = time.perf_counter()
+    await asyncio.gather(*(client(worker) for worker in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    overhead_ms = (np.array(latencies) - args.latency_ms / 1000) * 1000
+    return {
+        "throughput": len(latencies) / elapsed,
+        "overhead_p50_ms": float(np.percentile(overhead_ms, 50)),
+        "overhead_p99_ms": float(np.percentile(overhead_ms, 99)),
+        "connections": stub_request(args.port, "/stats")["connections"],
+        "requests": len(latencies),
+    }
+
+
+def measure(args, mode: str) -> dict:
+    """All concurrency levels for one mode, in a fresh interpreter."""
+    output = subprocess.run(
+        [sys.executable, "-m", "loadtest.generator_registry", "--single", mode, "--port", str(args.port),
+         "--latency-ms", str(args.latency_ms), "--seconds", str(args.seconds),
+         "--concurrency", *map(str, args.concurrency)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+async def run_single(args) -> dict:
+    from app.llm.generators import registry
+
+    registry.start()
+    try:
+        return {
+            "build_us": build_cost_us(args.single),
+            "levels": [await run_level(args.single, concurrency, args) for concurrency in args.concurrency],
+        }
+    finally:
+        await registry.close()
+
+
+def main(args) -> None:
+    # Point every OpenAI client at the stub; nothing leaves the machine
+    os.environ["OPENAI_API_KEY"] = "loadtest"
+    os.environ["OPENAI_BASE_URL"] = os.environ["OPENAI_API_BASE"] = f"http://127.0.0.1:{args.port}/v1"
+    if args.serve_stub:
+        serve_stub(args.port, args.latency_ms / 1000)
+        return
+    if args.single:
+        print(json.dumps(asyncio.run(run_single(args))))
+        return
+
+    stub = subprocess.Popen([
+        sys.executable, "-m", "loadtest.generator_registry", "--serve-stub",
+        "--port", str(args.port), "--latency-ms", str(args.latency_ms),
+    ])
+    try:
+        wait_ready(args.port)
+        print(f"stub llm: {args.latency_ms:.0f} ms/call  {args.seconds:.0f} s per level")
+        for mode in args.modes:
+            measured = measure(args, mode)
+            print(f"{mode:8s} chain setup per request: {measured['build_us']:9.1f} us")
+            for concurrency, result in zip(args.concurrency, measured["levels"]):
+                print(f"{mode:8s} c={concurrency:3d}: {result['throughput']:7.1f} req/s  "
+                      f"overhead p50 {result['overhead_p50_ms']:6.1f} ms  p99 {result['overhead_p99_ms']:6.1f} ms  "
+                      f"{result['connections']:5d} connections for {result['requests']} requests")
+    finally:
+        stub.terminate()
+        stub.wait()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--modes", nargs="+", default=["per-call", "registry"], choices=["per-call", "registry"])
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="stub LLM latency per call")
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration of each level")
+    parser.add_argument("--port", type=int, default=8091)
+    parser.add_argument("--serve-stub", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--single", choices=["per-call", "registry"], help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
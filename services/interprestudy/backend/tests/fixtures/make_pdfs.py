@@ -0,0 +1,87 @@
+"""
+Regenerate the fixture PDFs used by test_pdf_ingest.py.
+
+    python tests/fixtures/make_pdfs.py
+
+Writes a minimal text-only PDF (Helvetica, one line per text row) so the
+fixtures need no PDF library to build:
+
+  glossary.pdf         four pages of interpreting glossary notes
+  glossary_edited.pdf  the same document with one line on page 3 changed
+"""
+
+from pathlib import Path
+from typing import List
+
+HERE = Path(__file__).parent
+
+TERMS = [
+    ("chest pain", "dolor de pecho"), ("shortness of breath", "falta de aire"),
+    ("blood pressure", "presión arterial"), ("allergy", "alergia"),
+    ("prescription", "receta"), ("fever", "fiebre"), ("dizziness", "mareo"),
+    ("stitches", "puntos de sutura"), ("fracture", "fractura"), ("nausea", "náusea"),
+    ("informed consent", "consentimiento informado"), ("discharge", "alta médica"),
+]
+
+
+def pages() -> List[List[str]]:
+    result = []
+    for page in range(4):
+        lines = [f"Unit {page + 1}: terminology review"]
+        for row in range(18):
+            term, translation = TERMS[(page * 18 + row) % len(TERMS)]
+            lines.append(
+                f"Entry {page * 18 + row + 1}. The interpreter renders {term} as {translation} "
+                f"and confirms the meaning with the patient before continuing."
+            )
+        result.append(lines)
+    return result
+
+
+def escape(text: str) -> bytes:
+    raw = text.encode("latin-1")
+    return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def write_pdf(path: Path, page_lines: List[List[str]]) -> None:
+    objects: List[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # pages, filled in below
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    kids = []
+    for lines in page_lines:
+        stream = b"BT /F1 9 Tf 11 TL 36 800 Td " + b" ".join(b"(" + escape(line) + b") '" for line in lines) + b" ET"
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % kid for kid in kids), len(kids)
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(bytes(out))
+
+
+def main() -> None:
+    original = pages()
+    write_pdf(HERE / "glossary.pdf", original)
+    edited = [list(lines) for lines in original]
+    edited[2][9] = "Entry 45. Revised: always ask the patient to repeat the dosage instructions back."
+    write_pdf(HERE / "glossary_edited.pdf", edited)
+
+
+if __name__ == "__main__":
+    main()
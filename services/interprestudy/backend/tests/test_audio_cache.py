@@ -0,0 +1,87 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+from app.tts.cache import AudioCache
+from app.tts.gemini_tts import AudioFormat, WAV_HEADER_SIZE
+
+KEY = "ab" * 32
+
+
+def wav_producer(calls: list, delay: float = 0.0, fail: bool = False):
+    async def produce(tmp_dir: str) -> str:
+        calls.append(tmp_dir)
+        path = os.path.join(tmp_dir, "out.wav")
+        with open(path, "wb") as f:
+            f.write(AudioFormat().wav_header(4) + b"\1\0\1\0")
+        await asyncio.sleep(delay)
+        if fail:
+            raise RuntimeError("tts failed")
+        return path
+    return produce
+
+
+def scratch_files(cache: AudioCache) -> list:
+    return [name for _, _, files in os.walk(cache.temp_dir()) for name in files]
+
+
+def test_failed_production_leaves_no_partial_files(tmp_path):
+    cache = AudioCache(str(tmp_path), 1 << 20)
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.get_or_produce(KEY, wav_producer([], fail=True)))
+    assert scratch_files(cache) == []
+    assert list(cache.temp_dir().iterdir()) == []
+
+
+def test_cancelled_caller_does_not_cancel_shared_production(tmp_path):
+    cache = AudioCache(str(tmp_path), 1 << 20)
+    calls = []
+
+    async def scenario():
+        produce = wav_producer(calls, delay=0.1)
+        first = asyncio.create_task(cache.get_or_produce(KEY, produce))
+        await asyncio.sleep(0.02)
+        second = asyncio.create_task(cache.get_or_produce(KEY, produce))
+        await asyncio.sleep(0.02)
+        first.cancel()  # e.g. the producing client disconnected
+        _, path, cached = await second
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return path, cached
+
+    path, cached = asyncio.run(scenario())
+    assert len(calls) == 1 and not cached
+    assert path.exists() and cache.lookup(KEY) == path
+
+
+def test_scratch_dir_failure_does_not_wedge_the_key(tmp_path, monkeypatch):
+    cache = AudioCache(str(tmp_path), 1 << 20)
+
+    def broken_mkdtemp(*args, **kwargs):
+        raise OSError("disk full")
+
+    async def scenario():
+        with monkeypatch.context() as patch:
+            patch.setattr(tempfile, "mkdtemp", broken_mkdtemp)
+            with pytest.raises(OSError):
+                await cache.get_or_produce(KEY, wav_producer([]))
+        return await asyncio.wait_for(cache.get_or_produce(KEY, wav_producer([])), timeout=2)
+
+    _, path, cached = asyncio.run(scenario())
+    assert path.exists() and not cached
+
+
+def test_silent_audio_is_not_cached(tmp_path):
+    cache = AudioCache(str(tmp_path), 1 << 20)
+
+    async def silent(tmp_dir: str) -> str:
+        path = os.path.join(tmp_dir, "out.wav")
+        with open(path, "wb") as f:
+            f.write(bytes(WAV_HEADER_SIZE))
+        return path
+
+    with pytest.raises(ValueError):
+        asyncio.run(cache.get_or_produce(KEY, silent))
+    assert cache.lookup(KEY) is None
@@ -0,0 +1,77 @@
+import asyncio
+import os
+import time
+
+from app.jobs.course import CourseJob, CourseJobEngine
+
+TTL = 3600
+
+
+def write_job(engine: CourseJobEngine, job_id: str, status: str, finished_ago: float, document_path=None) -> None:
+    now = time.time()
+    job = CourseJob(id=job_id, topic="Cardiology", status=status, created_at=now - finished_ago - 60,
+                    finished_at=now - finished_ago, document_path=document_path)
+    engine._write_json(engine.checkpoint_dir / job_id / "job.json", engine._job_meta(job))
+
+
+def test_finished_jobs_expire_with_their_checkpoints(tmp_path):
+    engine = CourseJobEngine(str(tmp_path), job_ttl_seconds=TTL)
+    write_job(engine, "old-completed", "completed", TTL + 60)
+    write_job(engine, "old-failed", "failed", TTL + 60)
+    write_job(engine, "recent", "completed", 60)
+
+    async def scenario():
+        await engine.start()
+        try:
+            assert set(engine.jobs) == {"recent"}
+            assert sorted(p.name for p in tmp_path.iterdir()) == ["recent"]
+
+            assert await engine.evict_expired(now=time.time() + TTL) == 1
+            assert engine.jobs == {}
+            assert list(tmp_path.iterdir()) == []
+        finally:
+            await engine.close()
+
+    asyncio.run(scenario())
+
+
+def test_eviction_removes_uploads_no_live_job_uses(tmp_path):
+    uploads = tmp_path / "uploads"
+    uploads.mkdir()
+    old = time.time() - TTL - 120
+    paths = {}
+    for name in ("alone", "shared", "reuploaded"):
+        paths[name] = uploads / f"{name}.pdf"
+        paths[name].write_bytes(b"%PDF-1.4")
+        os.utime(paths[name], (old, old))
+    os.utime(paths["reuploaded"])  # saved again after its job finished
+
+    engine = CourseJobEngine(str(tmp_path / "checkpoints"), job_ttl_seconds=TTL)
+    write_job(engine, "alone", "completed", TTL + 60, str(paths["alone"]))
+    write_job(engine, "shared-old", "completed", TTL + 60, str(paths["shared"]))
+    write_job(engine, "shared-recent", "completed", 60, str(paths["shared"]))
+    write_job(engine, "reuploaded", "failed", TTL + 60, str(paths["reuploaded"]))
+
+    async def scenario():
+        await engine.start()
+        await engine.close()
+
+    asyncio.run(scenario())
+    assert set(engine.jobs) == {"shared-recent"}
+    assert sorted(p.name for p in uploads.iterdir()) == ["reuploaded.pdf", "shared.pdf"]
+
+
+def test_zero_ttl_keeps_jobs(tmp_path):
+    engine = CourseJobEngine(str(tmp_path), job_ttl_seconds=0)
+    write_job(engine, "old", "completed", 30 * 24 * 3600)
+
+    async def scenario():
+        await engine.start()
+        try:
+            assert await engine.evict_expired() == 0
+        finally:
+            await engine.close()
+
+    asyncio.run(scenario())
+    assert set(engine.jobs) == {"old"}
+    assert (tmp_path / "old" / "job.json").exists()
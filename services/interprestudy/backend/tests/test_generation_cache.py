@@ -0,0 +1,43 @@
+import asyncio
+
+from app.llm.cache import GenerationCache
+from app.llm.generators import MnemonicInsight
+
+INSIGHT = MnemonicInsight(etymology="From Greek kardia, heart.", mnemonic="Cardio keeps the heart going.")
+
+
+class UnavailableBackend:
+    async def get(self, key):
+        raise ConnectionError("redis down")
+
+    async def add_variant(self, key, value, max_variants):
+        raise ConnectionError("redis down")
+
+
+def test_backend_outage_falls_through_to_generate():
+    cache = GenerationCache()
+    cache.backend = UnavailableBackend()
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        return INSIGHT
+
+    result = asyncio.run(cache.get_or_generate("mnemonic:", "cardiology", generate, MnemonicInsight))
+    assert result == INSIGHT and calls == [1]
+    assert asyncio.run(cache.peek("mnemonic:", "cardiology", MnemonicInsight)) is None
+    assert cache.stats()["errors"] == 3
+
+
+def test_variants_are_served_once_the_pool_is_full():
+    cache = GenerationCache(max_variants=1)
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        return INSIGHT
+
+    for _ in range(3):
+        assert asyncio.run(cache.get_or_generate("mnemonic:", "Cardiology ", generate, MnemonicInsight)) == INSIGHT
+    assert calls == [1]
+    assert cache.stats()["exact_hits"] == 2
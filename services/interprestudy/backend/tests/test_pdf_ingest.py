@@ -0,0 +1,108 @@
+import asyncio
+import io
+from pathlib import Path
+
+import pytest
+
+from app.ingest.pdf import PdfIngestor, UploadTooLargeError, chunk_pages, estimate_tokens, extractive_summary, iter_pages
+
+FIXTURES = Path(__file__).parent / "fixtures"
+GLOSSARY = str(FIXTURES / "glossary.pdf")
+GLOSSARY_EDITED = str(FIXTURES / "glossary_edited.pdf")
+
+MIN_TOKENS, MAX_TOKENS = 40, 120
+
+
+class CountingSummarizer:
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self, text: str):
+        self.calls += 1
+        return await extractive_summary(text)
+
+
+class Upload:
+    """Just enough of fastapi.UploadFile for save_upload."""
+
+    def __init__(self, data: bytes):
+        self.file = io.BytesIO(data)
+
+    async def read(self, size: int) -> bytes:
+        return self.file.read(size)
+
+
+def make_ingestor(tmp_path: Path, **kwargs) -> PdfIngestor:
+    return PdfIngestor(
+        index_path=str(tmp_path / "chunks.sqlite3"),
+        upload_dir=str(tmp_path / "uploads"),
+        min_chunk_tokens=MIN_TOKENS,
+        max_chunk_tokens=MAX_TOKENS,
+        **kwargs,
+    )
+
+
+def test_chunks_cover_every_line_within_budget():
+    pages = list(iter_pages(GLOSSARY))
+    chunks = list(chunk_pages(iter(pages), MIN_TOKENS, MAX_TOKENS))
+
+    lines = [" ".join(line.split()) for _, text in pages for line in text.splitlines() if line.strip()]
+    assert [line for chunk in chunks for line in chunk.text.split("\n")] == lines
+    # Budgets are counted per line, as the chunker does
+    assert all(sum(map(estimate_tokens, chunk.text.split("\n"))) <= MAX_TOKENS for chunk in chunks)
+    assert chunks[0].page_start == 1 and chunks[-1].page_end == len(pages) == 4
+    assert all(a.page_end <= b.page_start for a, b in zip(chunks, chunks[1:]))
+
+
+def test_edit_only_changes_nearby_chunks():
+    original = [chunk.hash for chunk in chunk_pages(iter_pages(GLOSSARY), MIN_TOKENS, MAX_TOKENS)]
+    edited = [chunk.hash for chunk in chunk_pages(iter_pages(GLOSSARY_EDITED), MIN_TOKENS, MAX_TOKENS)]
+    assert len(set(edited) - set(original)) <= 2
+    assert len(set(original) & set(edited)) >= len(original) - 2
+
+
+def test_ingest_reuses_index(tmp_path):
+    summarizer = CountingSummarizer()
+    ingestor = make_ingestor(tmp_path, summarizer=summarizer)
+    try:
+        first = asyncio.run(ingestor.ingest_file(GLOSSARY))
+        assert first.pages == 4
+        assert first.summarized == summarizer.calls == len(set(first.chunk_hashes))
+        assert "Key terms" in first.course_source(max_tokens=10_000)
+
+        # Same file: answered from the documents table, nothing summarized
+        again = asyncio.run(ingestor.ingest_file(GLOSSARY))
+        assert again.chunk_hashes == first.chunk_hashes
+        assert again.summarized == 0 and summarizer.calls == first.summarized
+
+        # Edited file: unchanged chunks come from the chunks table
+        edited = asyncio.run(ingestor.ingest_file(GLOSSARY_EDITED))
+        assert 1 <= edited.summarized <= 2
+        assert edited.reused == len(set(edited.chunk_hashes)) - edited.summarized
+    finally:
+        ingestor.close()
+
+    # The index survives a restart
+    reopened = make_ingestor(tmp_path, summarizer=summarizer)
+    try:
+        calls = summarizer.calls
+        assert asyncio.run(reopened.ingest_file(GLOSSARY_EDITED)).summarized == 0
+        assert summarizer.calls == calls
+    finally:
+        reopened.close()
+
+
+def test_save_upload_spools_by_content_hash(tmp_path):
+    ingestor = make_ingestor(tmp_path)
+    data = Path(GLOSSARY).read_bytes()
+    path = asyncio.run(ingestor.save_upload(Upload(data), chunk_size=1024))
+    assert Path(path).read_bytes() == data
+    assert Path(path).name == f"{PdfIngestor._file_hash(GLOSSARY)}.pdf"
+    assert sorted(p.name for p in (tmp_path / "uploads").iterdir()) == [Path(path).name]
+
+
+def test_save_upload_rejects_oversized(tmp_path):
+    ingestor = make_ingestor(tmp_path, max_upload_bytes=4096)
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(ingestor.save_upload(Upload(Path(GLOSSARY).read_bytes()), chunk_size=1024))
+    assert list((tmp_path / "uploads").iterdir()) == []
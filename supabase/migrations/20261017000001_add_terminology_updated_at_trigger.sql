@@ -0,0 +1,10 @@
+-- Keep terminology.updated_at current on every edit; interpreCoach pulls
+-- changed terms with updated_at >= its last cursor
+DROP TRIGGER IF EXISTS update_terminology_updated_at ON public.terminology;
+CREATE TRIGGER update_terminology_updated_at
+BEFORE UPDATE ON public.terminology
+FOR EACH ROW
+EXECUTE FUNCTION public.update_updated_at_column();
+
+-- Keyset pagination of the delta pull orders by (updated_at, id)
+CREATE INDEX IF NOT EXISTS terminology_updated_at_id_idx ON public.terminology (updated_at, id);